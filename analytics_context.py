@@ -0,0 +1,125 @@
+"""
+Konteks analisa bersama untuk satu versi data histori.
+
+Histori di-parse (Tanggal -> datetime) dan di-sort per (Nama_Saham, Tanggal)
+sekali saja. Artefak turunan (harga awal/akhir, panel return, indikator
+teknikal, pivot harga, cube simulasi) di-memo di dalam konteks dan dibuang lewat invalidasi() atau saat
+versi DataStore berubah.
+
+Histori boleh harian: bar mingguan/bulanan di-resample sekali per versi
+(ohlcv()), dan panel return (heatmap, return sektor) dihitung dari konteks
+bulanan tersebut. Harga awal/akhir, pivot harga, cube simulasi, indikator dan
+lookup per saham tetap memakai bar asli, supaya harga entry/exit simulasi sama
+dengan jalur tanpa konteks.
+"""
+import pandas as pd
+
+from lookup_index import IndeksSaham
+from resample_ohlcv import deteksi_frekuensi, resample_ohlcv
+from returns_panel import ReturnsPanel
+
+
+class AnalyticsContext:
+    def __init__(self, histori_df, versi=0):
+        df = histori_df.copy()
+        df["Tanggal"] = pd.to_datetime(df["Tanggal"])
+        self.histori = df.sort_values(["Nama_Saham", "Tanggal"], kind="stable").reset_index(drop=True)
+        self.versi = versi
+        self._memo = {}
+
+        # offset baris per ticker (histori sudah urut per ticker) untuk lookup tanpa scan
+        self.indeks = IndeksSaham(self.histori, sudah_urut=True)
+        self.tickers = self.indeks.tickers
+        self.frekuensi = deteksi_frekuensi(self.histori, sudah_urut=True)
+
+    # --- memo ---
+    def memo(self, key, builder):
+        """Hitung artefak sekali per versi data"""
+        if key not in self._memo:
+            self._memo[key] = builder()
+        return self._memo[key]
+
+    def invalidasi(self, key=None):
+        """Buang satu artefak (atau semua kalau key kosong)"""
+        if key is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(key, None)
+
+    # --- akses per saham ---
+    def saham(self, stock_code):
+        """Histori satu saham (urut Tanggal) lewat offset, tanpa boolean scan"""
+        return self.indeks.saham(stock_code)
+
+    # --- frekuensi ---
+    def ohlcv(self, freq="M"):
+        """Bar OHLCV "W"/"M" semua saham, di-resample sekali per versi data"""
+        if freq == self.frekuensi:
+            return self.histori
+        return self.memo(("ohlcv", freq), lambda: resample_ohlcv(self.histori, freq, sudah_urut=True))
+
+    def bulanan(self):
+        """Konteks di atas bar bulanan (self kalau histori memang sudah bulanan)"""
+        if self.frekuensi == "M":
+            return self
+        return self.memo("bulanan", lambda: AnalyticsContext(self.ohlcv("M"), versi=self.versi))
+
+    # --- artefak turunan ---
+    def harga_awal_akhir(self):
+        """Tabel Harga_Awal / Harga_Akhir per saham (sama dengan main.harga_awal_akhir)"""
+        return self.memo("harga_awal_akhir", lambda: (
+            self.histori.groupby("Nama_Saham")
+            .agg(Harga_Awal=("Terakhir", "first"), Harga_Akhir=("Terakhir", "last"))
+            .reset_index()
+        ))
+
+    # --- artefak turunan (berbasis bulan) ---
+    def returns_panel(self):
+        """ReturnsPanel (Month x ticker) untuk heatmap & analisa berbasis return"""
+        if self.frekuensi != "M":
+            return self.bulanan().returns_panel()
+        return self.memo("returns_panel", lambda: ReturnsPanel(self.histori, sudah_urut=True))
+
+    # --- artefak turunan (bar asli) ---
+    def price_pivot(self):
+        """Harga Terakhir dalam bentuk Tanggal x saham"""
+        return self.memo("price_pivot", lambda: self.histori.pivot_table(
+            index="Tanggal", columns="Nama_Saham", values="Terakhir", aggfunc="last"
+        ))
+
+    def simulasi_cube(self):
+        """SimulasiCube atas bar asli: entry = bar pertama di bulan entry, exit = tanggal persis"""
+        from simulasi_batch import SimulasiCube
+        return self.memo("simulasi_cube", lambda: SimulasiCube(self.histori))
+
+    def indikator(self):
+        """SMA/EMA/RSI/MACD/Bollinger/ATR/Vol_MA sejajar self.histori (lihat indikator.py)"""
+        from indikator import hitung_indikator
+        return self.memo("indikator", lambda: hitung_indikator(self.histori, self.indeks.starts, self.indeks.ends))
+
+    def indikator_saham(self, stock_code):
+        """Baris indikator satu saham (urut Tanggal), sejajar dengan saham()"""
+        rentang = self.indeks.rentang(stock_code)
+        ind = self.indikator()
+        return ind.iloc[0:0] if rentang is None else ind.iloc[rentang[0]:rentang[1]]
+
+
+def konteks_untuk(store, ctx=None):
+    """
+    Pakai ulang ctx kalau versinya masih sama dengan store, kalau tidak bangun baru.
+
+    Kalau perubahan terakhir store hanya menambah histori (append), panel return
+    dari ctx lama di-update inkremental alih-alih dihitung ulang.
+    """
+    if ctx is not None and ctx.versi == store.versi:
+        return ctx
+
+    baru = AnalyticsContext(store.histori, versi=store.versi)
+    delta = store.delta_terakhir
+    panel = ctx._memo.get("returns_panel") if ctx is not None else None
+    if (panel is not None and delta is not None and baru.frekuensi == "M"
+            and delta[0] == ctx.versi + 1 == store.versi):
+        panel = panel.tambah(delta[1])
+        if panel is not None:
+            baru._memo["returns_panel"] = panel
+    return baru
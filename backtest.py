@@ -0,0 +1,236 @@
+"""
+Backtest DCA (setoran bulanan) & rebalance berkala untuk banyak strategi sekaligus.
+
+Harga beli diambil dari SimulasiCube: baris pertama tiap bulan, sama dengan
+harga entry simulate_investment / simulate_portfolio. Titik terakhir equity
+curve dinilai dengan harga di target_date. Setiap bulan mulai bulan entry:
+
+  1. modal_awal (bulan pertama saja) + setoran dibelikan sesuai bobot strategi
+  2. tiap `rebalance_setiap` bulan, seluruh nilai portofolio dibagi ulang ke bobot
+
+Saham yang belum punya harga di suatu bulan tidak bisa dibeli; porsinya
+disimpan sebagai kas sampai rebalance berikutnya. Lembar saham boleh pecahan
+seperti di simulate_portfolio.
+
+Di antara dua rebalance, lembar strategi s di saham n = bobot[s, n] x (lembar
+hasil rebalance terakhir + kumulatif lembar dari setoran), jadi nilai semua
+strategi di semua bulan satu segmen cukup dua perkalian matriks
+(strategi x saham) @ (saham x bulan). Loop Python hanya per segmen rebalance.
+"""
+import numpy as np
+import pandas as pd
+
+from metrik_risiko import risiko_kurva
+from simulasi_batch import SimulasiCube
+
+KOLOM_LEDGER = ["Tanggal", "Strategi", "Nama_Saham", "Aksi", "Lembar", "Harga", "Nilai", "Keterangan"]
+
+
+# ===============================
+# STRATEGI
+# ===============================
+
+def bobot_strategi(strategi, tickers):
+    """
+    dict {nama: {saham: bobot}} atau DataFrame (strategi x saham) -> DataFrame
+    bobot strategi x tickers, tiap baris dinormalisasi jadi total 1. Saham tanpa
+    histori dan strategi tanpa saham valid dilewati dengan peringatan.
+    """
+    if not isinstance(strategi, pd.DataFrame):
+        strategi = pd.DataFrame.from_dict(strategi, orient="index").reindex(list(strategi))
+    tidak_ada = strategi.columns.difference(tickers)
+    if len(tidak_ada):
+        print(f"⚠️ Saham tanpa histori dilewati: {', '.join(map(str, tidak_ada))}")
+
+    bobot = strategi.reindex(columns=tickers).fillna(0.0).astype("float64")
+    total = bobot.sum(axis=1)
+    if (total <= 0).any():
+        print(f"⚠️ Strategi tanpa saham valid dilewati: {', '.join(map(str, total.index[total <= 0]))}")
+    return bobot[total > 0].div(total[total > 0], axis=0)
+
+
+def strategi_per_saham(tickers):
+    """Satu strategi 100% per saham, untuk membandingkan DCA di seluruh universe"""
+    return pd.DataFrame(np.eye(len(tickers)), index=tickers, columns=tickers)
+
+
+# ===============================
+# HASIL
+# ===============================
+
+class HasilBacktest:
+    """
+    equity : DataFrame Tanggal x strategi, nilai portofolio (Rp)
+    modal  : Series Tanggal, kumulatif uang yang disetor
+    """
+
+    def __init__(self, bobot, tanggal, harga, valid, setoran, lembar_kum, kas_kum, segmen, awal_segmen,
+                 nilai_rebalance, equity):
+        self.bobot = bobot
+        self.tanggal = tanggal = pd.DatetimeIndex(tanggal, name="Tanggal")
+        self.equity = pd.DataFrame(equity.T, index=tanggal, columns=bobot.index)
+        self.modal = pd.Series(np.cumsum(setoran), index=tanggal, name="Modal")
+        self._harga, self._valid, self._setoran = harga, valid, setoran
+        self._lembar_kum, self._kas_kum = lembar_kum, kas_kum
+        self._segmen, self._awal_segmen, self._nilai_rebalance = segmen, awal_segmen, nilai_rebalance
+
+    def _posisi(self, s, n):
+        """Lembar & kas (Rp) untuk pasangan (strategi s[p], saham n[p]): array pasangan x tanggal"""
+        segmen, r = self._segmen, self._awal_segmen[self._segmen]
+        w = self.bobot.to_numpy()[s, n][:, None]
+        nilai_rebalance = self._nilai_rebalance[s][:, segmen]
+        dibeli = self._valid[n][:, r]
+        lembar_kum, kas_kum = self._lembar_kum, self._kas_kum
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dari_rebalance = np.where(dibeli, nilai_rebalance / self._harga[n][:, r], 0.0)
+        # kumulatif sebelum bulan awal segmen = kolom sebelumnya (0 untuk segmen pertama)
+        sebelum = np.concatenate([np.zeros((len(n), 1)), lembar_kum[n][:, :-1]], axis=1)[:, r]
+        kas_sebelum = np.concatenate([np.zeros((len(n), 1)), kas_kum[n][:, :-1]], axis=1)[:, r]
+        lembar = w * (dari_rebalance + lembar_kum[n] - sebelum)
+        kas = w * (np.where(dibeli, 0.0, nilai_rebalance) + kas_kum[n] - kas_sebelum)
+        return lembar, kas
+
+    def holdings(self, strategi):
+        """Lembar per saham (kolom saham berbobot > 0) + kas (Rp) per tanggal untuk satu strategi"""
+        s = self.bobot.index.get_loc(strategi)
+        n = np.flatnonzero(self.bobot.iloc[s].to_numpy() > 0)
+        lembar, kas = self._posisi(np.full(len(n), s), n)
+        df = pd.DataFrame(lembar.T, index=self.tanggal, columns=self.bobot.columns[n])
+        df["Kas"] = kas.sum(axis=0)
+        return df
+
+    def ledger(self, strategi=None):
+        """Transaksi beli/jual (semua strategi kalau strategi kosong), urut Tanggal"""
+        w = self.bobot.to_numpy()
+        if strategi is not None:
+            w = np.where(self.bobot.index == strategi, 1, 0)[:, None] * w
+        s, n = np.nonzero(w > 0)
+        lembar, _ = self._posisi(s, n)
+
+        trade = np.diff(lembar, axis=1, prepend=0.0)
+        p, t = np.nonzero(np.abs(trade) > 1e-9)
+        harga = self._harga[n[p], t]
+        rebalance = np.isin(t, self._awal_segmen[1:])
+        df = pd.DataFrame({
+            "Tanggal": self.tanggal[t],
+            "Strategi": self.bobot.index[s[p]],
+            "Nama_Saham": self.bobot.columns[n[p]],
+            "Aksi": np.where(trade[p, t] > 0, "BELI", "JUAL"),
+            "Lembar": np.abs(trade[p, t]),
+            "Harga": harga,
+            "Nilai": np.round(np.abs(trade[p, t]) * harga, 2),
+            "Keterangan": np.where(rebalance, "rebalance", "setoran"),
+        }, columns=KOLOM_LEDGER)
+        return df.sort_values(["Tanggal", "Strategi", "Nama_Saham"], kind="stable").reset_index(drop=True)
+
+    def ringkasan(self, risk_free=0.0):
+        """
+        Per strategi: Total_Modal, Final_Value, Return (%) terhadap total setoran,
+        plus metrik risiko (metrik_risiko.py) atas return time-weighted bulanan
+        (setoran tidak dihitung sebagai kenaikan nilai).
+        """
+        nilai = self.equity.to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tumbuh = (nilai[1:] - self._setoran[1:, None]) / nilai[:-1]
+        indeks = pd.DataFrame(np.vstack([np.ones((1, nilai.shape[1])), np.cumprod(tumbuh, axis=0)]),
+                              index=self.tanggal, columns=self.equity.columns)
+
+        total_modal = self.modal.iloc[-1]
+        final = self.equity.iloc[-1]
+        df = pd.DataFrame({
+            "Total_Modal": total_modal,
+            "Final_Value": final.round(2),
+            "Return (%)": ((final - total_modal) / total_modal * 100).round(2),
+        })
+        df.index.name = "Strategi"
+        return df.join(risiko_kurva(indeks, 12, risk_free))
+
+
+# ===============================
+# BACKTEST
+# ===============================
+
+def backtest(histori_df, strategi, month, year, modal_awal=0.0, setoran=0.0, rebalance_setiap=0,
+             target_date=None, ctx=None, cube=None):
+    """
+    Backtest semua strategi dari bulan entry (month, year) sampai target_date.
+
+    strategi        : dict {nama: {saham: bobot}} atau DataFrame bobot strategi x saham
+                      (lihat strategi_per_saham untuk DCA per saham di seluruh universe)
+    modal_awal      : uang yang dibelikan di bulan pertama
+    setoran         : uang yang dibelikan setiap bulan (termasuk bulan pertama)
+    rebalance_setiap: bagi ulang ke bobot tiap n bulan (0 = tidak pernah)
+    ctx / cube      : AnalyticsContext / SimulasiCube yang sudah ada (opsional)
+
+    Mengembalikan HasilBacktest, atau None kalau periode / strategi tidak valid.
+    """
+    if cube is None:
+        cube = ctx.simulasi_cube() if ctx is not None else SimulasiCube(histori_df)
+    target_date = cube.max_date if target_date is None else pd.to_datetime(target_date)
+    i0 = cube.periods.get_indexer([pd.Period(year=year, month=month, freq="M")])[0]
+    i1 = cube.periods.get_indexer([target_date.to_period("M")])[0]
+    j = cube.dates.get_indexer([target_date])[0]
+    if i0 < 0 or j < 0 or i1 < i0:
+        print(f"⚠️ Tidak ada data untuk periode {month}/{year} → {target_date.date()}.")
+        return None
+    if modal_awal + setoran <= 0:
+        print("⚠️ Modal awal dan setoran bulanan sama-sama 0.")
+        return None
+
+    bobot = bobot_strategi(strategi, cube.tickers)
+    if bobot.empty:
+        return None
+    # hanya saham yang dipakai minimal satu strategi
+    dipakai = np.flatnonzero((bobot.to_numpy() > 0).any(axis=0))
+    bobot = bobot.iloc[:, dipakai]
+
+    # kolom waktu: awal tiap bulan entry..target, ditambah target_date sebagai titik penilaian akhir
+    harga = cube.entry_prices[dipakai, i0:i1 + 1]
+    tanggal = cube.periods[i0:i1 + 1].to_timestamp()
+    if target_date > tanggal[-1]:
+        harga = np.concatenate([harga, np.full((len(dipakai), 1), np.nan)], axis=1)
+        tanggal = tanggal.append(pd.DatetimeIndex([target_date]))
+    n_bulan = i1 - i0 + 1
+
+    setoran_t = np.zeros(len(tanggal))
+    setoran_t[:n_bulan] = setoran
+    setoran_t[0] += modal_awal
+
+    valid = ~np.isnan(harga)
+    # harga penilaian: harga terakhir yang diketahui, kolom terakhir = harga di target_date
+    harga_nilai = pd.DataFrame(harga).ffill(axis=1).to_numpy(copy=True)
+    harga_target = cube.exit_prices[dipakai, j]
+    harga_nilai[:, -1] = np.where(np.isnan(harga_target), harga_nilai[:, -1], harga_target)
+    harga_nilai = np.nan_to_num(harga_nilai)
+
+    # per satuan bobot: kumulatif lembar dari setoran, dan setoran yang tertahan jadi kas
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lembar_kum = np.cumsum(np.where(valid, setoran_t / harga, 0.0), axis=1)
+    kas_kum = np.cumsum(np.where(valid, 0.0, setoran_t), axis=1)
+    lembar_sebelum = np.concatenate([np.zeros((len(dipakai), 1)), lembar_kum[:, :-1]], axis=1)
+    kas_sebelum = np.concatenate([np.zeros((len(dipakai), 1)), kas_kum[:, :-1]], axis=1)
+
+    awal_segmen = np.arange(0, n_bulan, rebalance_setiap) if rebalance_setiap > 0 else np.array([0])
+    batas = np.r_[awal_segmen[1:], len(tanggal)]
+    segmen = np.repeat(np.arange(len(awal_segmen)), np.diff(np.r_[awal_segmen, len(tanggal)]))
+
+    W = bobot.to_numpy()
+    equity = np.zeros((len(W), len(tanggal)))
+    nilai_rebalance = np.zeros((len(W), len(awal_segmen)))
+    for k, (r, e) in enumerate(zip(awal_segmen, batas)):
+        dibeli = valid[:, r:r + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # nilai 1 Rp yang di-rebalance ke saham n di bulan r, dinilai di bulan r..e
+            tumbuh = np.where(dibeli, harga_nilai[:, r:e + 1] / harga[:, r:r + 1], 1.0)
+        # kolom e (kalau ada): posisi sebelum setoran & rebalance bulan e, untuk nilai rebalance berikutnya
+        lembar = np.concatenate([lembar_kum[:, r:e], lembar_sebelum[:, e:e + 1]], axis=1) - lembar_sebelum[:, r:r + 1]
+        kas = np.concatenate([kas_kum[:, r:e], kas_sebelum[:, e:e + 1]], axis=1) - kas_sebelum[:, r:r + 1]
+
+        nilai = nilai_rebalance[:, k:k + 1] * (W @ tumbuh) + W @ (harga_nilai[:, r:r + tumbuh.shape[1]] * lembar + kas)
+        equity[:, r:e] = nilai[:, :e - r]
+        if k + 1 < len(awal_segmen):
+            nilai_rebalance[:, k + 1] = nilai[:, -1]
+
+    return HasilBacktest(bobot, tanggal, harga, valid, setoran_t, lembar_kum, kas_kum,
+                         segmen, awal_segmen, nilai_rebalance, equity)
@@ -0,0 +1,198 @@
+"""
+Import banyak export Investing.com sekaligus dari satu direktori / glob.
+
+File dibaca dan dibersihkan (clean_dataframe) paralel di process pool, lalu
+hasilnya dialirkan ke satu penulis bulk (bulk_writer.upsert_histori) dengan
+kebijakan konflik yang sudah ditentukan di awal, tanpa prompt per file.
+"""
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import pandas as pd
+from sqlalchemy import select, text
+
+from bulk_writer import DEFAULT_BATCH_SIZE, histori_table, tabel_staging, upsert_histori
+from clean_utils import RENAME_INVESTING, baca_csv_investing, clean_dataframe, kode_saham_dari_file
+import snapshot_cache
+from pool_utils import map_bertahap
+from rollup import perbarui_rollup
+
+# kebijakan kalau histori saham sudah ada di database
+POLICIES = ("replace", "append", "skip")
+
+
+def daftar_file(sumber):
+    """Direktori -> semua *.csv di dalamnya; selain itu dianggap pola glob"""
+    if os.path.isdir(sumber):
+        sumber = os.path.join(sumber, "*.csv")
+    return sorted(glob.glob(sumber))
+
+
+def _parse_file(file_path):
+    """Worker: baca + bersihkan satu file, error dikembalikan sebagai teks"""
+    try:
+        return file_path, baca_csv_investing(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def import_direktori(engine, sumber, policy="replace", n_workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import semua CSV dari `sumber` (direktori atau glob) ke histori_saham.
+
+    policy : "replace" / "append" / "skip" untuk saham yang historinya sudah ada
+    Mengembalikan (laporan, df_baru):
+        laporan : DataFrame per file (File, Nama_Saham, Status, Baris, Ditulis, Dihapus, Pesan)
+        df_baru : gabungan baris yang berhasil di-import (untuk DataStore)
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"policy harus salah satu dari {POLICIES}")
+
+    files = daftar_file(sumber)
+    if not files:
+        print(f"⚠️ Tidak ada file CSV di {sumber}.")
+        return pd.DataFrame(), pd.DataFrame()
+
+    with engine.connect() as conn:
+        existing = set(conn.execute(text("SELECT DISTINCT Nama_Saham FROM histori_saham")).scalars())
+
+    report, imported = [], []
+    n_workers = n_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        for file_path, df_clean, error in map_bertahap(pool, _parse_file, files, max_pending=2 * n_workers):
+            stock_code = kode_saham_dari_file(file_path)
+            row = {"File": os.path.basename(file_path), "Nama_Saham": stock_code,
+                   "Status": "OK", "Baris": 0, "Ditulis": 0, "Dihapus": 0, "Pesan": ""}
+
+            if error is None and policy == "skip" and stock_code in existing:
+                row.update(Status="SKIP", Pesan="histori sudah ada")
+            elif error is None:
+                try:
+                    stats = upsert_histori(engine, df_clean, replace=policy == "replace",
+                                           batch_size=batch_size)
+                    row.update(Baris=stats["rows"], Ditulis=stats["written"], Dihapus=stats["deleted"])
+                    imported.append(df_clean)
+                except Exception as e:
+                    error = str(e)
+
+            if error is not None:
+                row.update(Status="ERROR", Pesan=error)
+            report.append(row)
+
+    report = pd.DataFrame(report).sort_values("File").reset_index(drop=True)
+    ok = (report["Status"] == "OK").sum()
+    print(f"✅ {ok}/{len(report)} file berhasil di-import ke histori_saham")
+
+    df_baru = pd.concat(imported, ignore_index=True) if imported else pd.DataFrame()
+    return report, df_baru
+
+
+# ===============================
+# STREAMING IMPORT (FILE BESAR)
+# ===============================
+
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def _path_checkpoint(file_path):
+    """Checkpoint di direktori cache (bukan di samping CSV, yang bisa read-only)"""
+    kunci = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:12]
+    folder = os.path.join(snapshot_cache.CACHE_DIR, "import")
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{os.path.basename(file_path)}.{kunci}.json")
+
+
+def _baca_checkpoint(file_path, signature):
+    try:
+        with open(_path_checkpoint(file_path)) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # checkpoint hanya dipakai kalau file & pengaturan chunk masih sama
+    return state if state.get("signature") == signature else None
+
+
+def _tulis_checkpoint(file_path, state):
+    tmp = _path_checkpoint(file_path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, _path_checkpoint(file_path))
+
+
+def _swap_staging(engine, staging, stock_code):
+    """Ganti histori satu saham dengan isi staging dalam satu transaksi"""
+    kolom = [c.name for c in histori_table.columns]
+    with engine.begin() as conn:
+        conn.execute(histori_table.delete().where(histori_table.c.Nama_Saham == stock_code))
+        conn.execute(histori_table.insert().from_select(
+            kolom, select(*[staging.c[c] for c in kolom]).where(staging.c.Nama_Saham == stock_code)))
+        conn.execute(staging.delete().where(staging.c.Nama_Saham == stock_code))
+        perbarui_rollup(conn, {stock_code: None})
+
+
+def import_csv_streaming(engine, file_path, replace=False, chunk_rows=DEFAULT_CHUNK_ROWS,
+                         batch_size=DEFAULT_BATCH_SIZE, resume=True):
+    """
+    Import satu CSV besar per chunk dengan memori puncak terbatas.
+
+    Tiap chunk dibersihkan (clean_dataframe) lalu di-upsert dalam transaksinya
+    sendiri, dan posisinya dicatat di checkpoint <CACHE_DIR>/import/. Kalau
+    import gagal di tengah, pemanggilan berikutnya melanjutkan dari chunk
+    terakhir yang sudah commit: baris yang sudah selesai dilewati per baris
+    file (tanpa di-parse). replace=True menulis chunk ke tabel staging dulu; histori lama
+    saham itu baru diganti isi staging dalam satu transaksi setelah semua chunk
+    selesai, jadi import yang gagal di tengah tidak menghapus apa pun.
+
+    Mengembalikan dict {"rows": baris ter-import, "chunks": jumlah chunk, "resumed_from": baris}.
+    """
+    stock_code = kode_saham_dari_file(file_path)
+    stat = os.stat(file_path)
+    signature = {"size": stat.st_size, "mtime": stat.st_mtime, "chunk_rows": chunk_rows, "replace": replace}
+
+    state = _baca_checkpoint(file_path, signature) if resume else None
+    if state is None:
+        state = {"signature": signature, "rows_done": 0, "chunks_done": 0}
+    elif state["rows_done"]:
+        print(f"↩️ Melanjutkan import {stock_code} dari baris {state['rows_done']:,}")
+    resumed_from = state["rows_done"]
+
+    tabel = histori_table
+    if replace:
+        tabel = tabel_staging(engine)
+        if not state["rows_done"]:
+            # sisa staging dari import yang ditinggalkan
+            with engine.begin() as conn:
+                conn.execute(tabel.delete().where(tabel.c.Nama_Saham == stock_code))
+
+    with open(file_path, "rb") as fh:
+        kolom = pd.read_csv(io.BytesIO(fh.readline())).columns
+        # lewati baris yang sudah commit tanpa membangun daftar skiprows (satu record = satu baris)
+        next(islice(fh, state["rows_done"], state["rows_done"]), None)
+        reader = pd.read_csv(fh, chunksize=chunk_rows, header=None, names=kolom)
+        for chunk in reader:
+            if chunk.empty:
+                break
+            df_clean = clean_dataframe(chunk.rename(columns=RENAME_INVESTING))
+            df_clean["Nama_Saham"] = stock_code
+            upsert_histori(engine, df_clean, batch_size=batch_size, tabel=tabel)
+
+            state["rows_done"] += len(chunk)
+            state["chunks_done"] += 1
+            _tulis_checkpoint(file_path, state)
+
+            pct = min(fh.tell() / max(stat.st_size, 1) * 100, 100)
+            print(f"⏳ {stock_code}: chunk {state['chunks_done']} | {state['rows_done']:,} baris | {pct:5.1f}%")
+
+    if replace and state["rows_done"]:
+        _swap_staging(engine, tabel, stock_code)
+    # CSV tanpa baris data: tidak ada chunk yang commit, checkpoint tidak pernah ditulis
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(_path_checkpoint(file_path))
+    print(f"✅ Import streaming {stock_code} selesai ({state['rows_done']:,} baris)")
+    return {"rows": state["rows_done"], "chunks": state["chunks_done"], "resumed_from": resumed_from}
@@ -0,0 +1,852 @@
+"""
+Benchmark sederhana untuk fungsi-fungsi berat di main.py.
+
+Jalankan: python benchmark.py
+Suite   : python benchmark.py --suite [--ukuran kecil,sedang,besar] [--report bench_report.json]
+                                      [--baseline baseline.json] [--ambang 0.25]
+"""
+import contextlib
+import io
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import main
+from clean_utils import RENAME_INVESTING
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan, ke_format_investing, tulis_csv_investing
+
+
+# ===============================
+# DATA SINTETIS (lihat data_sintetis.py)
+# ===============================
+
+def buat_investing_sintetis(n_rows=10_000, seed=0):
+    """Export Investing.com mentah satu saham (kolom sudah di-rename), dengan sel Vol kosong"""
+    raw = ke_format_investing(buat_histori(1, n_rows, freq="D", start="1990-01-01", seed=seed))
+    raw.loc[::997, "Vol."] = None
+    return raw.rename(columns=RENAME_INVESTING)
+
+
+# ===============================
+# UTIL
+# ===============================
+
+def ukur_waktu(func, *args, repeat=3, **kwargs):
+    """Mengembalikan waktu terbaik (detik) dari beberapa kali pemanggilan"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cek_paritas(expected, actual, nama):
+    """Memastikan hasil versi cepat sama dengan versi lama"""
+    pd.testing.assert_frame_equal(
+        expected.reset_index(drop=True),
+        actual.reset_index(drop=True),
+        check_dtype=False,
+    )
+    print(f"✅ Paritas {nama} OK")
+
+
+# ===============================
+# BENCHMARK
+# ===============================
+
+def bench_potensi_upside(sizes=(100, 300, 900)):
+    print("\n=== BENCHMARK POTENSI UPSIDE ===")
+    for n in sizes:
+        kumpulan = buat_kumpulan(n_saham=n)
+
+        for top_n in (None, 5):
+            cek_paritas(
+                main.potensi_upside(kumpulan, top_n=top_n),
+                main.potensi_upside_vectorized(kumpulan, top_n=top_n),
+                f"potensi_upside (n={n}, top_n={top_n})",
+            )
+
+        t_loop = ukur_waktu(main.potensi_upside, kumpulan, repeat=1)
+        t_vec = ukur_waktu(main.potensi_upside_vectorized, kumpulan)
+        print(f"n={n:>5}: loop {t_loop*1000:9.1f} ms | vectorized {t_vec*1000:7.1f} ms "
+              f"| speedup {t_loop / t_vec:6.1f}x")
+
+
+def bench_tampilkan_tabel(sizes=(1_000, 10_000, 100_000), page_size=25):
+    """Waktu render satu halaman harus tetap datar berapapun ukuran DataFrame"""
+    print("\n=== BENCHMARK RENDER HALAMAN TABEL ===")
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        df = pd.DataFrame({
+            "Nama_Saham": rng.choice(["BBCA", "BBRI", "BUMI"], n),
+            "Terakhir": rng.uniform(50, 10_000, n).round(2),
+            "Vol": rng.integers(1_000, 10**10, n),
+            "Return (%)": rng.normal(0, 10, n).round(2),
+        })
+        t_page = ukur_waktu(main._render_halaman, df.iloc[:page_size], None)
+        print(f"n={n:>7}: render 1 halaman {t_page*1000:6.2f} ms")
+
+
+def bench_simulasi_cube(n_queries=50):
+    """Banyak pertanyaan simulate_investment: loop per query vs lookup ke cube"""
+    from simulasi_batch import SimulasiCube
+
+    print("\n=== BENCHMARK SIMULASI CUBE ===")
+    histori = pd.read_csv("histori_saham.csv")
+    cube = SimulasiCube(histori)
+    months = [(p.month, p.year) for p in cube.periods]
+
+    for month, year in months:
+        cek_paritas(
+            main.simulate_investment(histori, month, year, 1e7, show_plot=False),
+            main.simulate_investment(histori, month, year, 1e7, show_plot=False, cube=cube),
+            f"simulate_investment {month}/{year}",
+        )
+
+    queries = [months[i % len(months)] for i in range(n_queries)]
+    t_loop = ukur_waktu(lambda: [main._simulate_investment_loop(histori, m, y, 1e7) for m, y in queries], repeat=1)
+    t_build = ukur_waktu(SimulasiCube, histori)
+    t_cube = ukur_waktu(lambda: [cube.simulate(m, y, 1e7) for m, y in queries])
+    t_full = ukur_waktu(cube.return_cube)
+    print(f"{n_queries} query: loop {t_loop*1000:.1f} ms | cube build {t_build*1000:.1f} ms "
+          f"+ lookup {t_cube*1000:.1f} ms | full cube {cube.return_cube().shape} {t_full*1000:.2f} ms")
+
+
+def bench_monte_carlo(n_samples=(10_000, 100_000, 1_000_000)):
+    """Jumlah alokasi portofolio yang dievaluasi per detik"""
+    from simulasi_batch import monte_carlo_portfolio
+
+    print("\n=== BENCHMARK MONTE CARLO PORTOFOLIO ===")
+    histori = pd.read_csv("histori_saham.csv")
+    tickers = list(pd.unique(histori["Nama_Saham"]))
+    for n in n_samples:
+        for workers in (1, None):
+            t = ukur_waktu(monte_carlo_portfolio, histori, tickers, 1, 2024, 1e7,
+                           n_samples=n, n_workers=workers, seed=0, repeat=1)
+            print(f"n={n:>9} workers={workers or 'auto':>4}: {t*1000:8.1f} ms ({n / t:,.0f} alokasi/detik)")
+
+
+def bench_clean_dataframe(sizes=(10_000, 100_000, 500_000)):
+    """Paritas parser vectorized vs convert_num, dan throughput dalam baris/detik"""
+    from clean_utils import clean_dataframe
+
+    print("\n=== BENCHMARK CLEAN_DATAFRAME ===")
+    # kasus format Indonesia (1.234,5 / 41,27M / -5,52% / kosong / teks) ada di tests/test_clean_utils.py
+    for n in sizes:
+        raw = buat_investing_sintetis(n)
+        cek_paritas(clean_dataframe(raw.copy(), vectorized=False),
+                    clean_dataframe(raw.copy()), f"clean_dataframe (n={n})")
+
+        # parsing Tanggal (to_datetime) sama di kedua jalur, jadi diukur juga tanpa kolom itu
+        for label, frame in (("semua kolom", raw), ("kolom angka", raw.drop(columns="Tanggal"))):
+            t_old = ukur_waktu(lambda: clean_dataframe(frame.copy(), vectorized=False), repeat=1)
+            t_new = ukur_waktu(lambda: clean_dataframe(frame.copy()))
+            print(f"n={n:>7} {label}: per sel {n / t_old:11,.0f} baris/detik | "
+                  f"vectorized {n / t_new:11,.0f} baris/detik | speedup {t_old / t_new:4.1f}x")
+
+
+def bench_upsert_histori(sizes=(10_000, 100_000), batch_size=1000):
+    """to_sql append (jalur lama) vs upsert bulk, di SQLite file sebagai stand-in MySQL"""
+    from bulk_writer import upsert_histori
+    from clean_utils import clean_dataframe
+
+    print("\n=== BENCHMARK IMPORT HISTORI (SQLITE STAND-IN) ===")
+    for n in sizes:
+        df = clean_dataframe(buat_investing_sintetis(n))
+        df["Nama_Saham"] = "BENCH"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = buat_engine(url=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                conn.exec_driver_sql("DELETE FROM histori_saham WHERE Nama_Saham = 'BENCH'")
+            df.to_sql("histori_saham", engine, if_exists="append", index=False)
+            t_old = time.perf_counter() - start
+
+            t_insert = ukur_waktu(upsert_histori, engine, df, replace=True, batch_size=batch_size, repeat=1)
+            t_noop = ukur_waktu(upsert_histori, engine, df, batch_size=batch_size, repeat=1)
+            engine.dispose()
+
+        print(f"n={n:>7}: to_sql {n / t_old:10,.0f} baris/detik | upsert {n / t_insert:10,.0f} baris/detik "
+              f"| upsert ulang (tanpa perubahan) {n / t_noop:10,.0f} baris/detik")
+
+
+def bench_import_direktori(n_files=40, rows_per_file=2_000):
+    """Wall time import satu direktori CSV dengan 1 proses vs semua core"""
+    from batch_import import import_direktori
+
+    print("\n=== BENCHMARK IMPORT DIREKTORI ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        tulis_csv_investing(buat_histori(n_files, rows_per_file, freq="D", start="1990-01-01"), tmp)
+
+        for workers in (1, os.cpu_count()):
+            engine = buat_engine()
+            t = ukur_waktu(import_direktori, engine, tmp, n_workers=workers, repeat=1)
+            print(f"{n_files} file x {rows_per_file} baris, workers={workers}: {t:.2f} s")
+
+
+def bench_harga_awal_akhir():
+    """Paritas & waktu: first/last di pandas vs ROW_NUMBER() di database"""
+    from data_loader import muat_tabel
+    from sql_analytics import harga_awal_akhir_sql
+
+    print("\n=== BENCHMARK HARGA AWAL/AKHIR (SQL PUSHDOWN) ===")
+    engine = buat_engine()
+    kumpulan = muat_tabel(engine, "kumpulan_saham")
+    kumpulan["Nama_Saham"] = kumpulan["Nama_Saham"].str.strip()
+
+    def versi_pandas():
+        histori = muat_tabel(engine, "histori_saham")
+        return main.harga_awal_akhir(histori)
+
+    expected = versi_pandas()
+    actual = harga_awal_akhir_sql(engine)
+    cek_paritas(expected, actual, "harga_awal_akhir")
+    cek_paritas(main.stock_growth(None, kumpulan, expected),
+                main.stock_growth(None, kumpulan, actual), "stock_growth")
+    cek_paritas(main.owner_performance(None, kumpulan, expected)[0],
+                main.owner_performance(None, kumpulan, actual)[0], "owner_performance")
+
+    t_pandas = ukur_waktu(versi_pandas)
+    t_sql = ukur_waktu(harga_awal_akhir_sql, engine)
+    print(f"load + pandas {t_pandas*1000:.1f} ms | SQL pushdown {t_sql*1000:.1f} ms")
+
+
+def bench_migrasi(n_saham=1000, n_hari=2500):
+    """EXPLAIN query panas + waktu sebelum/sesudah migrasi index (histori jutaan baris)"""
+    from migrasi import QUERY_PANAS, cek_explain, jalankan_migrasi
+    from sql_analytics import harga_pada_tanggal_sql
+
+    print(f"\n=== BENCHMARK MIGRASI INDEX ({n_saham} saham x {n_hari} hari) ===")
+    kumpulan = buat_kumpulan(n_saham=n_saham)
+    histori = buat_histori(kumpulan, n_hari, freq="D", start="2015-01-01")
+    engine = buat_engine(kumpulan, histori)
+    tanggal = histori["Tanggal"].iloc[n_hari // 2]
+    print(f"histori_saham: {len(histori):,} baris")
+
+    def query_panas():
+        with engine.connect() as conn:
+            for nama, (sql, params, _) in QUERY_PANAS.items():
+                if not sql.startswith("DELETE"):
+                    params = {k: (tanggal.date() if k == "tanggal" else v) for k, v in params.items()}
+                    conn.execute(text(sql), params).all()
+
+    expected = harga_pada_tanggal_sql(engine, tanggal)
+    t_sebelum = ukur_waktu(query_panas, repeat=1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        jalankan_migrasi(engine)
+    t_sesudah = ukur_waktu(query_panas)
+    cek_paritas(expected, harga_pada_tanggal_sql(engine, tanggal), "harga_pada_tanggal_sql")
+
+    report = cek_explain(engine)
+    print(report.to_string(index=False))
+    print(f"query panas: tanpa index {t_sebelum*1000:.1f} ms | dengan index {t_sesudah*1000:.1f} ms")
+    print("✅ Semua query panas memakai index" if report["OK"].all() else "❌ Ada query panas tanpa index")
+    return bool(report["OK"].all())
+
+
+def bench_rollup(n_saham=500, n_hari=2500):
+    """Rollup di database: build penuh, update inkremental per import, dan waktu baca"""
+    import rollup
+    from analytics_context import AnalyticsContext
+    from bulk_writer import upsert_histori
+    from migrasi import jalankan_migrasi
+
+    print(f"\n=== BENCHMARK ROLLUP DATABASE ({n_saham} saham x {n_hari} hari) ===")
+    kumpulan = buat_kumpulan(n_saham=n_saham)
+    histori = buat_histori(kumpulan, n_hari, freq="D", start="2015-01-01")
+    engine = buat_engine(kumpulan, histori)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_build = ukur_waktu(jalankan_migrasi, engine, repeat=1)
+    ctx = AnalyticsContext(histori)
+    cek_paritas(main.harga_awal_akhir(histori), rollup.harga_awal_akhir_rollup(engine), "harga_awal_akhir_rollup")
+    cek_paritas(ctx.returns_panel().mean(), rollup.returns_panel_rollup(engine).mean(), "returns_panel_rollup")
+    cek_paritas(ctx.returns_panel().sektor(kumpulan), rollup.return_sektor_rollup(engine), "return_sektor_rollup")
+
+    # import harian: satu hari baru untuk satu saham, rollup ikut di-update
+    stock = kumpulan["Nama_Saham"].iloc[0]
+    hari = iter(pd.bdate_range(histori["Tanggal"].max() + pd.Timedelta(days=1), periods=50))
+
+    def import_satu_hari():
+        baris = histori[histori["Nama_Saham"] == stock].tail(1).assign(Tanggal=next(hari))
+        upsert_histori(engine, baris)
+
+    t_inkremental = ukur_waktu(import_satu_hari)
+    with engine.begin() as conn:
+        t_penuh = ukur_waktu(rollup.bangun_ulang, conn, repeat=1)
+
+    print(f"{len(histori):,} baris histori | build awal (migrasi) {t_build:.1f} s | bangun ulang {t_penuh:.1f} s")
+    print(f"import 1 hari 1 saham + update rollup: {t_inkremental*1000:.1f} ms")
+    for nama, func in (("harga_awal_akhir", rollup.harga_awal_akhir_rollup),
+                       ("returns_panel", rollup.returns_panel_rollup),
+                       ("return_sektor", rollup.return_sektor_rollup),
+                       ("marketcap_sektor", rollup.marketcap_sektor_sql)):
+        print(f"baca {nama:<17}: {ukur_waktu(func, engine)*1000:7.1f} ms")
+    t_pandas = ukur_waktu(lambda: AnalyticsContext(histori).returns_panel().mean(), repeat=1)
+    print(f"pembanding: panel return dari histori penuh di pandas {t_pandas*1000:.0f} ms (tanpa waktu load)")
+
+
+def bench_resample(n_saham=900, n_hari=2500):
+    """Histori harian: biaya resample bulanan (sekali per versi) vs view bulanan dari cache"""
+    from analytics_context import AnalyticsContext
+    from resample_ohlcv import resample_ohlcv
+
+    print(f"\n=== BENCHMARK RESAMPLE OHLCV ({n_saham} saham x {n_hari} hari) ===")
+    kumpulan = buat_kumpulan(n_saham=n_saham)
+    harian = buat_histori(kumpulan, n_hari, freq="D", start="2015-01-01")
+    bulanan = resample_ohlcv(harian, "M")
+    print(f"{len(harian):,} baris harian -> {len(bulanan):,} bar bulanan")
+
+    ctx_harian = AnalyticsContext(harian)
+    ctx_bulanan = AnalyticsContext(bulanan)
+    for stock in kumpulan["Nama_Saham"].sample(5, random_state=0):
+        expected = harian[harian["Nama_Saham"] == stock].set_index("Tanggal").resample("MS").agg(
+            {"Pembukaan": "first", "Tertinggi": "max", "Terendah": "min", "Terakhir": "last", "Vol": "sum"})
+        actual = bulanan[bulanan["Nama_Saham"] == stock].set_index("Tanggal")[list(expected.columns)]
+        cek_paritas(expected, actual, f"resample {stock}")
+    cek_paritas(ctx_bulanan.returns_panel().mean(), ctx_harian.returns_panel().mean(), "returns_panel harian vs bulanan")
+
+    t_resample = ukur_waktu(resample_ohlcv, ctx_harian.histori, "M", sudah_urut=True, repeat=1)
+
+    def view_bulanan(ctx):
+        ctx.returns_panel().mean()
+        ctx.harga_awal_akhir()
+        return ctx.simulasi_cube()
+
+    # konteks baru: termasuk parse/sort histori + resample; berikutnya dari memo
+    t_harian = ukur_waktu(lambda: view_bulanan(AnalyticsContext(harian)), repeat=1)
+    t_bulanan = ukur_waktu(lambda: view_bulanan(AnalyticsContext(bulanan)), repeat=1)
+    t_cache = ukur_waktu(view_bulanan, ctx_harian)
+    print(f"resample_ohlcv M: {t_resample*1000:.0f} ms")
+    print(f"view bulanan, konteks baru: dari harian {t_harian*1000:.0f} ms | dari tabel bulanan "
+          f"{t_bulanan*1000:.0f} ms | berikutnya (cache) {t_cache*1000:.2f} ms")
+
+
+def bench_analytics_context():
+    """Waktu per pemanggilan tanpa vs dengan AnalyticsContext yang sudah hangat"""
+    import contextlib
+    import io
+
+    from analytics_context import AnalyticsContext
+    from data_loader import muat_tabel
+
+    print("\n=== BENCHMARK ANALYTICS CONTEXT ===")
+    engine = buat_engine()
+    kumpulan = muat_tabel(engine, "kumpulan_saham")
+    histori = muat_tabel(engine, "histori_saham")
+    kumpulan["Nama_Saham"] = kumpulan["Nama_Saham"].str.strip()
+    histori["Nama_Saham"] = histori["Nama_Saham"].str.strip()
+
+    t_build = ukur_waktu(AnalyticsContext, histori)
+    ctx = AnalyticsContext(histori)
+    periode = ctx.simulasi_cube().periods[0]
+    stock = ctx.tickers[0]
+    allocations = {t: 1 / 3 for t in ctx.tickers[:3]}
+
+    def urut(df):
+        return df.sort_values("Nama_Saham").reset_index(drop=True)
+
+    kasus = {
+        "harga_awal_akhir": (lambda: main.harga_awal_akhir(histori), lambda: ctx.harga_awal_akhir()),
+        "stock_growth": (lambda: main.stock_growth(histori, kumpulan),
+                         lambda: main.stock_growth(histori, kumpulan, ctx=ctx)),
+        "simulate_investment": (
+            lambda: urut(main.simulate_investment(histori, periode.month, periode.year, 1e7, show_plot=False)),
+            lambda: urut(main.simulate_investment(histori, periode.month, periode.year, 1e7, show_plot=False, ctx=ctx))),
+        "simulate_portfolio": (
+            lambda: main.simulate_portfolio(histori, allocations, periode.month, periode.year, 1e7, show_plot=False),
+            lambda: main.simulate_portfolio(histori, allocations, periode.month, periode.year, 1e7,
+                                            show_plot=False, ctx=ctx)),
+        "cari_saham": (lambda: main.cari_saham(histori, stock, periode.year, periode.month).to_frame().T,
+                       lambda: main.cari_saham(histori, stock, periode.year, periode.month, ctx=ctx).to_frame().T),
+        "heatmap saham": (lambda: main._pivot_return_saham_baris(histori),
+                          lambda: main._pivot_return_saham(histori, ctx)),
+        "heatmap sektor": (lambda: main._pivot_return_sektor_baris(histori, kumpulan),
+                           lambda: main._pivot_return_sektor(histori, kumpulan, ctx)),
+    }
+
+    print(f"build ctx {t_build*1000:.1f} ms (sekali per versi data)")
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        hasil = {}
+        for nama, (tanpa, dengan) in kasus.items():
+            hasil[nama] = (tanpa(), dengan(), ukur_waktu(tanpa), ukur_waktu(dengan))
+    for nama, (expected, actual, t_tanpa, t_dengan) in hasil.items():
+        cek_paritas(expected.reset_index(drop=nama.startswith("heatmap")),
+                    actual.reset_index(drop=nama.startswith("heatmap")), nama)
+        print(f"{nama:<20}: tanpa ctx {t_tanpa*1000:8.2f} ms | dengan ctx {t_dengan*1000:8.2f} ms")
+
+
+def bench_returns_panel(n_saham=300, n_hari=750, n_append=20):
+    """Heatmap per baris vs ReturnsPanel, dan append inkremental vs bangun ulang"""
+    from data_store import DataStore
+    from analytics_context import konteks_untuk
+    from returns_panel import ReturnsPanel
+
+    print("\n=== BENCHMARK RETURNS PANEL ===")
+    rng = np.random.default_rng(1)
+    kumpulan = buat_kumpulan(n_saham=n_saham)
+    tanggal = pd.bdate_range("2022-01-03", periods=n_hari + n_append)
+    harga = 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(tanggal), n_saham)), axis=0))
+    histori_full = pd.DataFrame({
+        "Nama_Saham": np.tile(kumpulan["Nama_Saham"].to_numpy(), len(tanggal)),
+        "Tanggal": np.repeat(tanggal, n_saham),
+        "Terakhir": harga.ravel().round(2),
+    })
+    lama = histori_full["Tanggal"] < tanggal[n_hari]
+    histori, append = histori_full[lama].reset_index(drop=True), histori_full[~lama]
+
+    panel = ReturnsPanel(histori)
+    cek_paritas(main._pivot_return_saham_baris(histori), panel.mean().T, "heatmap saham")
+    cek_paritas(main._pivot_return_sektor_baris(histori, kumpulan), panel.sektor(kumpulan).T, "heatmap sektor")
+
+    t_baris = ukur_waktu(main._pivot_return_saham_baris, histori)
+    t_sektor_baris = ukur_waktu(main._pivot_return_sektor_baris, histori, kumpulan)
+    t_build = ukur_waktu(ReturnsPanel, histori)
+    t_mean = ukur_waktu(lambda: panel.sums / panel.counts.where(panel.counts > 0))
+    t_sektor = ukur_waktu(panel.sektor, kumpulan)
+    print(f"{len(histori)} baris: per baris saham {t_baris*1000:.1f} ms, sektor {t_sektor_baris*1000:.1f} ms | "
+          f"panel build {t_build*1000:.1f} ms + mean {t_mean*1000:.2f} ms, sektor {t_sektor*1000:.2f} ms")
+
+    # append periode baru lewat DataStore -> konteks_untuk memakai panel lama
+    store = DataStore(kumpulan, histori)
+    ctx = konteks_untuk(store)
+    ctx.returns_panel()
+    store.tambah_histori(append)
+    ctx = konteks_untuk(store, ctx)
+    cek_paritas(ReturnsPanel(histori_full).mean(), ctx.returns_panel().mean(), "append inkremental")
+
+    t_inc = ukur_waktu(panel.tambah, append)
+    t_full = ukur_waktu(ReturnsPanel, histori_full)
+    print(f"append {len(append)} baris: inkremental {t_inc*1000:.1f} ms | bangun ulang {t_full*1000:.1f} ms")
+
+
+def bench_lookup_index(n_saham=900, n_hari=500, n_queries=200):
+    """Pencarian harga: scan boolean per query vs binary search di IndeksSaham"""
+    from lookup_index import IndeksSaham
+
+    print("\n=== BENCHMARK LOOKUP INDEX ===")
+    rng = np.random.default_rng(2)
+    kode = buat_kumpulan(n_saham=n_saham)["Nama_Saham"].to_numpy()
+    tanggal = pd.bdate_range("2023-01-02", periods=n_hari)
+    histori = pd.DataFrame({
+        "Nama_Saham": np.repeat(kode, n_hari),
+        "Tanggal": np.tile(tanggal, n_saham),
+        "Terakhir": rng.uniform(50, 10_000, n_saham * n_hari).round(2),
+    }).sample(frac=1, random_state=0)
+    queries = [(kode[i % n_saham], tanggal[(i * 7) % n_hari]) for i in range(n_queries)]
+
+    def scan(stock, tgl):
+        df = histori[histori["Nama_Saham"] == stock]
+        entry = df[(df["Tanggal"].dt.year == tgl.year) & (df["Tanggal"].dt.month == tgl.month)]
+        return entry.sort_values("Tanggal").iloc[0]
+
+    t_build = ukur_waktu(IndeksSaham, histori)
+    indeks = IndeksSaham(histori)
+    for stock, tgl in queries[:20]:
+        assert scan(stock, tgl).equals(indeks.harga_bulan(stock, tgl.year, tgl.month)), stock
+    print("✅ Paritas harga_bulan OK")
+
+    t_scan = ukur_waktu(lambda: [scan(s, t) for s, t in queries], repeat=1)
+    t_idx = ukur_waktu(lambda: [indeks.harga_bulan(s, t.year, t.month) for s, t in queries])
+    t_saran = ukur_waktu(lambda: [indeks.saran(s[:-1] + "X") for s, _ in queries[:50]])
+    print(f"{n_queries} query di {len(histori)} baris: scan {t_scan*1000:.1f} ms | "
+          f"indeks build {t_build*1000:.1f} ms + lookup {t_idx*1000:.2f} ms | 50 saran {t_saran*1000:.1f} ms")
+
+
+def bench_indikator(sizes=((15, 500), (100, 1_000), (1_000, 5_000))):
+    """Indikator teknikal: panel lebar (semua ticker sekaligus) vs loop per ticker"""
+    import indikator
+    from lookup_index import IndeksSaham
+
+    print("\n=== BENCHMARK INDIKATOR TEKNIKAL ===")
+
+    def per_ticker(histori):
+        # referensi: fungsi yang sama dijalankan per ticker pada Series
+        frames = []
+        for _, g in histori.groupby("Nama_Saham", sort=True):
+            close = g["Terakhir"].reset_index(drop=True)
+            out = {"SMA_20": indikator.sma(close, 20), "RSI_14": indikator.rsi(close, 14),
+                   "MACD": indikator.macd(close)[0], "BB_Upper": indikator.bollinger(close)[1],
+                   "ATR_14": indikator.atr(g["Tertinggi"].reset_index(drop=True),
+                                           g["Terendah"].reset_index(drop=True), close)}
+            frames.append(pd.DataFrame(out))
+        return pd.concat(frames, ignore_index=True)
+
+    for n_saham, n_hari in sizes:
+        histori = buat_histori(n_saham, n_hari, freq="D", start="2005-01-03")
+        indeks = IndeksSaham(histori, sudah_urut=True)
+
+        t_panel = ukur_waktu(indikator.hitung_indikator, histori, indeks.starts, indeks.ends, repeat=1)
+        teks = f"{n_saham:>5} ticker x {n_hari:>5} hari: panel {t_panel*1000:8.1f} ms"
+        if n_saham * n_hari <= 100_000:
+            hasil = indikator.hitung_indikator(histori, indeks.starts, indeks.ends)
+            expected = per_ticker(histori)
+            cek_paritas(expected, hasil[expected.columns], f"indikator ({n_saham} ticker)")
+            t_loop = ukur_waktu(per_ticker, histori, repeat=1)
+            teks += f" | loop per ticker (5 indikator) {t_loop*1000:8.1f} ms"
+        print(teks)
+        del histori, indeks
+
+
+def bench_risiko(sizes=((15, 500), (100, 1_000), (1_000, 5_000))):
+    """Metrik risiko: panel (semua ticker sekaligus) vs loop pandas per ticker"""
+    from metrik_risiko import KOLOM_RISIKO, risiko_portofolio, risiko_saham
+
+    print("\n=== BENCHMARK METRIK RISIKO ===")
+
+    def per_ticker(histori):
+        # referensi: definisi yang sama dihitung per ticker pada Series
+        rows = []
+        for stock, g in histori.groupby("Nama_Saham", sort=True):
+            p = g.set_index("Tanggal")["Terakhir"].astype("float64")
+            r = p.pct_change().iloc[1:]
+            dd = p / p.cummax() - 1
+            lembah = dd.idxmin()
+            sebelum = p[:lembah]
+            cagr = (p.iloc[-1] / p.iloc[0]) ** (252 / len(r)) - 1
+            downside = np.sqrt((np.minimum(r, 0) ** 2).mean())
+            rows.append([stock, r.std() * np.sqrt(252) * 100, dd.min() * 100,
+                         sebelum[sebelum == sebelum.max()].index[-1], lembah,
+                         r.mean() / r.std() * np.sqrt(252), r.mean() / downside * np.sqrt(252), cagr / -dd.min()])
+        df = pd.DataFrame(rows, columns=["Nama_Saham"] + KOLOM_RISIKO).set_index("Nama_Saham")
+        return df.round({c: 2 for c in KOLOM_RISIKO if not c.endswith("_Date")})
+
+    for n_saham, n_hari in sizes:
+        histori = buat_histori(n_saham, n_hari, freq="D", start="2005-01-03")
+
+        t_panel = ukur_waktu(risiko_saham, histori, sudah_urut=True, repeat=1)
+        cek_paritas(per_ticker(histori), risiko_saham(histori, sudah_urut=True), f"risiko ({n_saham} ticker)")
+        t_loop = ukur_waktu(per_ticker, histori, repeat=1)
+        modal = {t: 1e6 for t in histori["Nama_Saham"].unique()[:10]}
+        t_porto = ukur_waktu(risiko_portofolio, histori, modal, sudah_urut=True)
+        print(f"{n_saham:>5} ticker x {n_hari:>5} hari: panel {t_panel*1000:8.1f} ms | "
+              f"loop per ticker {t_loop*1000:8.1f} ms | portofolio 10 saham {t_porto*1000:6.1f} ms")
+        del histori
+
+
+def bench_backtest(n_saham=1_000, n_hari=5_000, n_strategi=1_000):
+    """Backtest DCA/rebalance: paritas vs loop per bulan, lalu DCA seluruh universe sekaligus"""
+    from analytics_context import AnalyticsContext
+    from backtest import backtest, strategi_per_saham
+
+    print("\n=== BENCHMARK BACKTEST DCA ===")
+
+    def per_bulan(cube, strategi, modal_awal, setoran, rebalance_setiap):
+        # referensi: simulasi bulan demi bulan, satu strategi & satu saham per iterasi
+        kolom = {}
+        for nama, alokasi in strategi.items():
+            total = sum(alokasi.values())
+            lembar, kas, terakhir, nilai = {}, {}, {}, []
+            for t in range(len(cube.periods)):
+                harga = {k: cube.entry_prices[cube.tickers.get_loc(k), t] for k in alokasi}
+                terakhir.update({k: p for k, p in harga.items() if not np.isnan(p)})
+                if rebalance_setiap and t and t % rebalance_setiap == 0:
+                    v = sum(lembar.get(k, 0) * terakhir.get(k, 0) + kas.get(k, 0) for k in alokasi)
+                    lembar = {k: 0 if np.isnan(harga[k]) else alokasi[k] / total * v / harga[k] for k in alokasi}
+                    kas = {k: alokasi[k] / total * v if np.isnan(harga[k]) else 0 for k in alokasi}
+                uang = setoran + (modal_awal if t == 0 else 0)
+                for k, w in alokasi.items():
+                    if np.isnan(harga[k]):
+                        kas[k] = kas.get(k, 0) + w / total * uang
+                    else:
+                        lembar[k] = lembar.get(k, 0) + w / total * uang / harga[k]
+                nilai.append(sum(lembar.get(k, 0) * terakhir.get(k, 0) + kas.get(k, 0) for k in alokasi))
+            kolom[nama] = nilai
+        return pd.DataFrame(kolom, index=cube.periods.to_timestamp().rename("Tanggal"))
+
+    # histori bulanan kecil dengan saham yang baru listing & bulan yang bolong
+    histori = buat_histori(30, 60, freq="M", start="2018-01-01", seed=5)
+    histori = histori[~((histori["Nama_Saham"] == histori["Nama_Saham"].iloc[0]) & (histori["Tanggal"] < "2019-03-01"))]
+    histori = histori.drop(histori.sample(80, random_state=2).index)
+    ctx = AnalyticsContext(histori)
+    cube = ctx.simulasi_cube()
+    t = list(cube.tickers)
+    strategi = {"60/40": {t[0]: 0.6, t[1]: 0.4}, "tunggal": {t[2]: 1}, "rata": {k: 1 for k in t[:10]}}
+    awal = cube.periods[0]
+    for rebalance in (0, 1, 3, 12):
+        hasil = backtest(histori, strategi, awal.month, awal.year, 1e7, 1e6, rebalance, ctx=ctx)
+        cek_paritas(per_bulan(cube, strategi, 1e7, 1e6, rebalance), hasil.equity,
+                    f"backtest rebalance {rebalance} bulan")
+
+    histori = buat_histori(n_saham, n_hari, freq="D", start="2005-01-03")
+    t_ctx = ukur_waktu(lambda: AnalyticsContext(histori).simulasi_cube(), repeat=1)
+    ctx = AnalyticsContext(histori)
+    cube = ctx.simulasi_cube()
+    universe = strategi_per_saham(cube.tickers)
+    acak = pd.DataFrame(np.random.default_rng(0).dirichlet(np.ones(n_saham), n_strategi),
+                        index=[f"S{i}" for i in range(n_strategi)], columns=cube.tickers)
+    print(f"{n_saham} ticker x {n_hari} hari ({len(cube.periods)} bulan), build ctx + cube {t_ctx*1000:.0f} ms")
+
+    for nama, strategi, rebalance in (("DCA universe", universe, 0), ("DCA universe, rebalance 3 bln", universe, 3),
+                                      (f"{n_strategi} strategi acak, rebalance 3 bln", acak, 3)):
+        t_run = ukur_waktu(backtest, histori, strategi, 1, 2005, 0, 1e6, rebalance, ctx=ctx, repeat=1)
+        hasil = backtest(histori, strategi, 1, 2005, 0, 1e6, rebalance, ctx=ctx)
+        t_ringkas = ukur_waktu(hasil.ringkasan, repeat=1)
+        teks = f"{nama:<40}: backtest {t_run*1000:7.1f} ms | ringkasan {t_ringkas*1000:6.1f} ms"
+        if strategi is universe:
+            t_ledger = ukur_waktu(hasil.ledger, repeat=1)
+            teks += f" | ledger {len(hasil.ledger())} baris {t_ledger*1000:6.1f} ms"
+        print(teks)
+
+
+def bench_chart_pack(n_workers=(1, 2)):
+    """Chart pack: render penuh per jumlah worker, lalu render ulang tanpa perubahan (semua dilewati)"""
+    from chart_pack import render_chart_pack
+    from data_loader import muat_tabel
+
+    print("\n=== BENCHMARK CHART PACK ===")
+    engine = buat_engine()
+    kumpulan = muat_tabel(engine, "kumpulan_saham")
+    histori = muat_tabel(engine, "histori_saham")
+    kumpulan["Nama_Saham"] = kumpulan["Nama_Saham"].str.strip()
+    histori["Nama_Saham"] = histori["Nama_Saham"].str.strip()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in n_workers:
+            t_full = ukur_waktu(render_chart_pack, histori, kumpulan, tmp, n_workers=n, force=True, repeat=1)
+            print(f"{n} worker: render penuh {t_full*1000:.0f} ms")
+        t_skip = ukur_waktu(render_chart_pack, histori, kumpulan, tmp)
+        status = render_chart_pack(histori, kumpulan, tmp)["Status"].value_counts().to_dict()
+        print(f"tanpa perubahan data: {t_skip*1000:.1f} ms {status}")
+
+
+# batas waktu `import main` (ms, kumulatif menurut -X importtime) dan modul yang
+# tidak boleh ikut ter-import saat start. pyarrow inti sudah di-import pandas 3
+# sendiri (dtype str), jadi yang dijaga hanya modul IO-nya (snapshot_cache).
+STARTUP_BUDGET_MS = 900
+STARTUP_DILARANG = ("matplotlib", "seaborn", "rich", "tabulate", "pyarrow.feather", "pyarrow.parquet",
+                    "sqlalchemy", "chart_pack", "rollup", "metrik_risiko", "backtest", "batch_import", "bulk_writer")
+
+
+def ukur_startup(repeat=5):
+    """(ms terbaik, 5 import terberat, modul terlarang yang ter-import) untuk `import main`"""
+    repo = os.path.dirname(os.path.abspath(__file__))
+    waktu = []
+    for _ in range(repeat):
+        log = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                             capture_output=True, text=True, check=True, cwd=repo).stderr
+        baris = [line.split("|") for line in log.splitlines() if line.startswith("import time:")]
+        # kolom 2 = kumulatif (us); import langsung dari main diawali tepat tiga spasi
+        waktu.append(next(int(b[1]) for b in baris if b[2].strip() == "main") / 1000)
+        teratas = sorted(((int(b[1]), b[2].strip()) for b in baris if re.match(r"^   \S", b[2])), reverse=True)[:5]
+
+    cek = "import main, sys; print(','.join(m for m in %r if m in sys.modules))" % (STARTUP_DILARANG,)
+    dilarang = subprocess.run([sys.executable, "-c", cek], capture_output=True, text=True, check=True,
+                              cwd=repo).stdout.strip()
+    return min(waktu), teratas, dilarang
+
+
+def bench_startup(repeat=5, budget_ms=STARTUP_BUDGET_MS):
+    """Waktu `import main` di proses baru (python -X importtime) vs budget"""
+    print("\n=== BENCHMARK STARTUP (import main) ===")
+    best, teratas, dilarang = ukur_startup(repeat)
+    print("modul terberat: " + ", ".join(f"{nama} {us/1000:.0f} ms" for us, nama in teratas))
+    print(f"import main: {best:.0f} ms (terbaik dari {repeat}, budget {budget_ms} ms)")
+    ok = best <= budget_ms and not dilarang
+    if dilarang:
+        print(f"❌ Modul berat ter-import saat start: {dilarang}")
+    print("✅ Startup dalam budget" if ok else "❌ Startup melewati budget")
+    return ok
+
+
+def bench_snapshot_cache():
+    """Cold start dari database vs dari snapshot Arrow lokal (fixture DumpDataSaham.sql)"""
+    import snapshot_cache
+    from data_loader import muat_tabel
+
+    print("\n=== BENCHMARK SNAPSHOT CACHE ===")
+    engine = buat_engine()
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_cache.CACHE_DIR = tmp
+        for nama_tabel in ("kumpulan_saham", "histori_saham"):
+            t_db = ukur_waktu(muat_tabel, engine, nama_tabel)
+            snapshot_cache.muat_dengan_cache(engine, nama_tabel)   # tulis snapshot
+            t_cache = ukur_waktu(snapshot_cache.muat_dengan_cache, engine, nama_tabel)
+
+            cek_paritas(muat_tabel(engine, nama_tabel),
+                        snapshot_cache.muat_snapshot(nama_tabel), f"snapshot {nama_tabel}")
+            print(f"{nama_tabel}: database {t_db*1000:.1f} ms | snapshot {t_cache*1000:.1f} ms")
+
+
+# ===============================
+# SUITE: report JSON + cek regresi
+# ===============================
+
+UKURAN_SUITE = {
+    # n_saham ticker; histori bulanan n_bulan & harian n_hari; n_baris = export CSV satu saham
+    "kecil": {"n_saham": 15, "n_bulan": 24, "n_hari": 500, "n_baris": 10_000},
+    "sedang": {"n_saham": 200, "n_bulan": 60, "n_hari": 1_000, "n_baris": 100_000},
+    "besar": {"n_saham": 1_000, "n_bulan": 120, "n_hari": 5_000, "n_baris": 500_000},
+}
+AMBANG_REGRESI = 0.25        # lebih lambat > 25% dari baseline = regresi
+MIN_SELISIH_DETIK = 0.005    # selisih di bawah ini dianggap noise
+
+
+def _ukur(func):
+    """Waktu terbaik: 3x untuk kasus cepat, 1x untuk kasus > 1 detik"""
+    t = ukur_waktu(func, repeat=1)
+    return t if t > 1 else min(t, ukur_waktu(func, repeat=3))
+
+
+def kasus_suite(u, tmp):
+    """(nama kasus, fungsi tanpa argumen) untuk satu ukuran; data disiapkan di luar pengukuran"""
+    from analytics_context import AnalyticsContext
+    from batch_import import import_direktori
+    from bulk_writer import upsert_histori
+    from clean_utils import clean_dataframe
+    from data_loader import muat_tabel
+    from indikator import hitung_indikator
+    from backtest import backtest, strategi_per_saham
+    from metrik_risiko import risiko_saham
+    from resample_ohlcv import resample_ohlcv
+    from returns_panel import ReturnsPanel
+    from simulasi_batch import SimulasiCube
+    from sql_analytics import harga_awal_akhir_sql
+
+    kumpulan = buat_kumpulan(n_saham=u["n_saham"])
+    bulanan = buat_histori(kumpulan, u["n_bulan"], freq="M", start="2015-01-01")
+    harian = buat_histori(kumpulan, u["n_hari"], freq="D", start="2005-01-03")
+    ctx_bulanan = AnalyticsContext(bulanan)
+    ctx_harian = AnalyticsContext(harian)
+    entry = ctx_bulanan.simulasi_cube().periods[0]
+    raw = buat_investing_sintetis(u["n_baris"])
+    clean = clean_dataframe(raw.copy()).assign(Nama_Saham="BENCH")
+
+    engine = buat_engine(kumpulan, bulanan, url=f"sqlite:///{os.path.join(tmp, 'suite.db')}")
+    csv_dir = os.path.join(tmp, "csv")
+    tulis_csv_investing(harian[harian["Nama_Saham"].isin(kumpulan["Nama_Saham"][:10])], csv_dir)
+
+    yield "potensi_upside_vectorized", lambda: main.potensi_upside_vectorized(kumpulan)
+    yield "stock_growth", lambda: main.stock_growth(bulanan, kumpulan)
+    yield "owner_performance", lambda: main.owner_performance(bulanan, kumpulan)
+    yield "simulate_investment (loop)", lambda: main._simulate_investment_loop(bulanan, entry.month, entry.year, 1e7)
+    yield "simulasi_cube build", lambda: SimulasiCube(bulanan)
+    yield "simulate_investment (ctx)", lambda: main.simulate_investment(
+        bulanan, entry.month, entry.year, 1e7, show_plot=False, ctx=ctx_bulanan)
+    yield "analytics_context build (harian)", lambda: AnalyticsContext(harian)
+    yield "returns_panel (harian)", lambda: ReturnsPanel(harian)
+    yield "resample_ohlcv bulanan (harian)", lambda: resample_ohlcv(ctx_harian.histori, "M", sudah_urut=True)
+    yield "indikator (harian)", lambda: hitung_indikator(
+        ctx_harian.histori, ctx_harian.indeks.starts, ctx_harian.indeks.ends)
+    yield "risiko_saham (harian)", lambda: risiko_saham(ctx_harian.histori, sudah_urut=True)
+    yield "backtest DCA universe (harian)", lambda: backtest(
+        harian, strategi_per_saham(ctx_harian.tickers), 1, 2005, 0, 1e6, 3, ctx=ctx_harian)
+    yield "cari_saham (ctx)", lambda: ctx_harian.indeks.harga_bulan(ctx_harian.tickers[-1], 2005, 6)
+    yield "render 1 halaman tabel", lambda: main._render_halaman(harian.iloc[:25], None)
+    yield "format_kolom semua baris (harian)", lambda: [main.format_kolom(harian[c]) for c in ("Terakhir", "Vol")]
+    yield "clean_dataframe", lambda: clean_dataframe(raw.copy())
+    yield "upsert_histori (sqlite)", lambda: upsert_histori(engine, clean, replace=True)
+    yield "muat_tabel histori (sqlite)", lambda: muat_tabel(engine, "histori_saham")
+    yield "harga_awal_akhir_sql (sqlite)", lambda: harga_awal_akhir_sql(engine)
+    yield "import_direktori 10 file (sqlite)", lambda: import_direktori(engine, csv_dir, policy="replace", n_workers=1)
+    engine.dispose()
+
+
+def jalankan_suite(ukuran=("kecil", "sedang")):
+    """Menjalankan semua kasus untuk tiap ukuran; mengembalikan report (dict, siap JSON)"""
+    import platform
+
+    hasil = []
+    best, _, dilarang = ukur_startup()
+    hasil.append({"kasus": "import main", "ukuran": "-", "detik": round(best / 1000, 6)})
+    print(f"{'import main':<38} {'-':>7} {best:10.1f} ms" + (f"  ❌ {dilarang}" if dilarang else ""))
+
+    for nama_ukuran in ukuran:
+        with tempfile.TemporaryDirectory() as tmp:
+            for kasus, func in kasus_suite(UKURAN_SUITE[nama_ukuran], tmp):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    t = _ukur(func)
+                hasil.append({"kasus": kasus, "ukuran": nama_ukuran, "detik": round(t, 6)})
+                print(f"{kasus:<38} {nama_ukuran:>7} {t*1000:10.1f} ms")
+
+    return {
+        "meta": {
+            "waktu": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu": os.cpu_count(),
+            "ukuran": {u: UKURAN_SUITE[u] for u in ukuran},
+        },
+        "hasil": hasil,
+    }
+
+
+def cek_regresi(report, baseline, ambang=AMBANG_REGRESI, min_selisih=MIN_SELISIH_DETIK):
+    """Daftar kasus yang lebih lambat dari baseline melebihi ambang"""
+    lama = {(r["kasus"], r["ukuran"]): r["detik"] for r in baseline["hasil"]}
+    regresi = []
+    for r in report["hasil"]:
+        base = lama.get((r["kasus"], r["ukuran"]))
+        if base and r["detik"] > base * (1 + ambang) and r["detik"] - base > min_selisih:
+            regresi.append({**r, "baseline": base, "rasio": round(r["detik"] / base, 2)})
+    return regresi
+
+
+def main_suite(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark suite semua jalur panas")
+    parser.add_argument("--ukuran", default="kecil,sedang", help=f"pilihan: {','.join(UKURAN_SUITE)}")
+    parser.add_argument("--report", default="bench_report.json", help="file JSON hasil")
+    parser.add_argument("--baseline", help="report JSON pembanding untuk cek regresi")
+    parser.add_argument("--ambang", type=float, default=AMBANG_REGRESI, help="batas perlambatan, 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    print("=== BENCHMARK SUITE ===")
+    report = jalankan_suite([u.strip() for u in args.ukuran.split(",")])
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"📄 Report ditulis ke {args.report}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        regresi = cek_regresi(report, json.load(f), args.ambang)
+    for r in regresi:
+        print(f"❌ Regresi {r['kasus']} ({r['ukuran']}): {r['baseline']*1000:.1f} -> {r['detik']*1000:.1f} ms "
+              f"({r['rasio']}x)")
+    if not regresi:
+        print(f"✅ Tidak ada regresi > {args.ambang:.0%} dibanding {args.baseline}")
+    return 1 if regresi else 0
+
+
+if __name__ == "__main__":
+    # python benchmark.py --suite [--ukuran ...] [--baseline ...]: report JSON + cek regresi
+    if "--suite" in sys.argv:
+        sys.exit(main_suite([a for a in sys.argv[1:] if a != "--suite"]))
+
+    bench_startup()
+    bench_potensi_upside()
+    bench_tampilkan_tabel()
+    bench_snapshot_cache()
+    bench_simulasi_cube()
+    bench_monte_carlo()
+    bench_clean_dataframe()
+    bench_upsert_histori()
+    bench_import_direktori()
+    bench_harga_awal_akhir()
+    index_ok = bench_migrasi()
+    bench_resample()
+    bench_rollup()
+    bench_analytics_context()
+    bench_returns_panel()
+    bench_lookup_index()
+    bench_chart_pack()
+    bench_indikator()
+    bench_risiko()
+    bench_backtest()
+    # query panas tanpa index = gagal (exit code non-zero untuk CI)
+    sys.exit(0 if index_ok else 1)
@@ -0,0 +1,141 @@
+"""
+Penulis bulk untuk histori_saham.
+
+Baris ditulis per batch (INSERT multi-baris) + ON DUPLICATE KEY UPDATE
+(MySQL) / ON CONFLICT DO UPDATE (SQLite, untuk stand-in lokal), semuanya di
+dalam satu transaksi. Mode replace menghapus hanya tanggal lama yang tidak ada
+lagi di data baru, jadi replace dan append sama-sama menjadi satu upsert atomik.
+Tabel rollup (rollup.py) ikut di-update di transaksi yang sama.
+"""
+import pandas as pd
+from sqlalchemy import (BigInteger, Column, Date, MetaData, Numeric, String, Table,
+                        bindparam, or_, text)
+
+from rollup import perbarui_rollup
+
+DEFAULT_BATCH_SIZE = 1000
+
+metadata = MetaData()
+histori_table = Table(
+    "histori_saham", metadata,
+    Column("Nama_Saham", String(20), primary_key=True),
+    Column("Tanggal", Date, primary_key=True),
+    Column("Terakhir", Numeric(15, 2)),
+    Column("Pembukaan", Numeric(15, 2)),
+    Column("Tertinggi", Numeric(15, 2)),
+    Column("Terendah", Numeric(15, 2)),
+    Column("Vol", BigInteger),
+    Column("PerubahanPercent", Numeric(8, 2)),
+)
+PRIMARY_KEY = ["Nama_Saham", "Tanggal"]
+
+
+def tabel_staging(engine, nama="histori_saham_staging"):
+    """Tabel berskema sama dengan histori_saham untuk menampung baris sebelum di-swap (dibuat kalau belum ada)"""
+    tabel = metadata.tables[nama] if nama in metadata.tables else histori_table.to_metadata(metadata, name=nama)
+    tabel.create(engine, checkfirst=True)
+    return tabel
+
+
+def _siapkan_rows(df):
+    """DataFrame hasil clean_dataframe -> list dict siap insert (NaN jadi NULL)"""
+    cols = [c.name for c in histori_table.columns if c.name in df.columns]
+    df = df[cols].copy()
+    df["Tanggal"] = pd.to_datetime(df["Tanggal"]).dt.date
+    if "Vol" in df.columns:
+        df["Vol"] = df["Vol"].round().astype("Int64")
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records"), cols
+
+
+def _upsert_stmt(engine, cols, tabel=histori_table):
+    """
+    INSERT yang meng-update baris lama dengan key sama.
+
+    Statement dibangun sekali lalu dieksekusi dengan executemany per batch;
+    driver MySQL menulis ulang executemany INSERT menjadi satu INSERT multi-baris.
+    """
+    update_cols = [c for c in cols if c not in PRIMARY_KEY]
+
+    if engine.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(tabel)
+        # MySQL tidak menghitung baris yang nilainya tidak berubah
+        return stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_cols})
+
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise NotImplementedError(f"Upsert belum didukung untuk {engine.dialect.name}")
+
+    stmt = insert(tabel)
+    return stmt.on_conflict_do_update(
+        index_elements=PRIMARY_KEY,
+        set_={c: stmt.excluded[c] for c in update_cols},
+        # hanya tulis baris yang nilainya benar-benar berubah
+        where=or_(*[tabel.c[c].is_distinct_from(stmt.excluded[c]) for c in update_cols]),
+    )
+
+
+def _hapus_tanggal_lama(conn, df, batch_size):
+    """Mode replace: hapus tanggal lama per saham yang tidak ada di data baru"""
+    deleted = 0
+    for stock, group in df.groupby("Nama_Saham"):
+        existing = conn.execute(
+            text("SELECT Tanggal FROM histori_saham WHERE Nama_Saham = :saham"),
+            {"saham": stock},
+        ).scalars().all()
+        new_dates = set(pd.to_datetime(group["Tanggal"]).dt.date)
+        stale = [d for d in pd.to_datetime(pd.Series(existing, dtype=object)).dt.date if d not in new_dates]
+
+        stmt = text(
+            "DELETE FROM histori_saham WHERE Nama_Saham = :saham AND Tanggal IN :tanggal"
+        ).bindparams(bindparam("tanggal", expanding=True))
+        for start in range(0, len(stale), batch_size):
+            result = conn.execute(stmt, {"saham": stock, "tanggal": stale[start:start + batch_size]})
+            deleted += result.rowcount
+    return deleted
+
+
+def upsert_histori(engine, df, replace=False, batch_size=DEFAULT_BATCH_SIZE, conn=None, tabel=histori_table):
+    """
+    Menulis df ke histori_saham sebagai upsert bulk dalam satu transaksi.
+
+    replace   : True = histori saham di df disamakan persis dengan df
+                (tanggal lama yang tidak ada di df ikut dihapus)
+    batch_size: jumlah baris per statement INSERT
+    conn      : koneksi yang sudah berada dalam transaksi (opsional); kalau
+                kosong dibuat transaksi baru lewat engine.begin()
+    tabel     : tabel tujuan; selain histori_saham (mis. tabel_staging()) hanya
+                upsert, tanpa replace dan tanpa update rollup
+
+    Mengembalikan dict {"rows": baris di df, "written": affected rows menurut
+    database (baris yang tidak berubah tidak dihitung), "deleted": baris dihapus}.
+    """
+    if conn is None:
+        with engine.begin() as conn:
+            return upsert_histori(engine, df, replace, batch_size, conn, tabel)
+
+    rows, cols = _siapkan_rows(df)
+    stats = {"rows": len(rows), "written": 0, "deleted": 0}
+    if not rows:
+        return stats
+
+    if replace and tabel is histori_table:
+        stats["deleted"] = _hapus_tanggal_lama(conn, df, batch_size)
+
+    stmt = _upsert_stmt(engine, cols, tabel)
+    conn = conn.execution_options(insertmanyvalues_page_size=batch_size)
+    for start in range(0, len(rows), batch_size):
+        result = conn.execute(stmt, rows[start:start + batch_size])
+        stats["written"] += max(result.rowcount, 0)
+    if tabel is not histori_table:
+        return stats
+
+    # replace bisa menghapus tanggal di luar rentang df: rollup saham itu dihitung ulang penuh
+    tanggal = pd.to_datetime(df["Tanggal"]).groupby(df["Nama_Saham"]).agg(["min", "max"])
+    perbarui_rollup(conn, {stock: None if replace else (row["min"], row["max"])
+                           for stock, row in tanggal.iterrows()})
+    return stats
@@ -0,0 +1,217 @@
+"""
+Chart pack headless: satu grafik tren harga per ticker + grafik sektor, ditulis
+ke direktori sebagai PNG/SVG tanpa jendela interaktif.
+
+Grafik digambar ke matplotlib.figure.Figure dengan canvas Agg (tanpa pyplot),
+dirender paralel di process pool. Tiap worker memakai ulang satu Figure/Axes
+per jenis grafik alih-alih membuat figure baru per grafik. Sidik (hash) data
+input tiap grafik disimpan di chart_pack.json; grafik yang datanya tidak
+berubah sejak render terakhir dilewati.
+"""
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pool_utils import map_bertahap
+
+MANIFEST = "chart_pack.json"
+FORMAT_GAMBAR = ("png", "svg")
+UKURAN = {"trend": (10, 5), "bar": (10, 6), "pie": (8, 8), "heatmap": (14, 8)}
+
+
+# ===============================
+# GAMBAR KE AXES (dipakai juga oleh plot_* di main.py)
+# ===============================
+
+def gambar_price_trend(ax, tanggal, harga, stock, indikator=None):
+    """indikator: DataFrame sejajar tanggal (SMA_*, BB_Upper/BB_Lower), opsional"""
+    ax.plot(tanggal, harga, marker="o", label="Terakhir")
+    if indikator is not None:
+        for col in [c for c in indikator.columns if c.startswith("SMA_")]:
+            ax.plot(tanggal, indikator[col], linewidth=1.2, label=col.replace("_", " "))
+        if {"BB_Upper", "BB_Lower"} <= set(indikator.columns):
+            ax.fill_between(tanggal, indikator["BB_Lower"], indikator["BB_Upper"],
+                            alpha=0.15, color="gray", label="Bollinger")
+        ax.legend(loc="upper left")
+    ax.set_title(f"📈 Price Trend of {stock} (2Y)", fontsize=14, weight="bold")
+    ax.set_xlabel("Tanggal")
+    ax.set_ylabel("Harga Terakhir")
+    ax.grid(True)
+
+
+def gambar_marketcap_sektor(ax, sector_mcap):
+    """sector_mcap: DataFrame Sektor, Market_Cap"""
+    import seaborn as sns
+
+    sns.barplot(data=sector_mcap, x="Sektor", y="Market_Cap", hue="Sektor", palette="Set2", legend=False, ax=ax)
+    ax.set_title("📊 Market Cap per Sector", fontsize=14, weight="bold")
+    ax.tick_params(axis="x", rotation=45)
+
+
+def gambar_pie_sektor(ax, sector_cap):
+    """sector_cap: Series Market_Cap per Sektor"""
+    ax.pie(sector_cap, labels=sector_cap.index, autopct="%1.1f%%", startangle=140, pctdistance=0.85)
+    ax.set_title("🥧 Proporsi Market Cap per Sektor", fontsize=14, weight="bold")
+
+
+def gambar_heatmap(ax, pivot, title, ylabel):
+    import seaborn as sns
+
+    sns.heatmap(pivot, cmap="RdYlGn", center=0, annot=False, cbar_kws={"label": "Return"}, ax=ax)
+    ax.set_title(title, fontsize=16, weight="bold")
+    ax.set_xlabel("Month")
+    ax.set_ylabel(ylabel)
+
+
+def _gambar_trend(ax, data, stock):
+    """data: Tanggal, Terakhir + kolom indikator (kalau ada)"""
+    indikator = data.drop(columns=["Tanggal", "Terakhir"])
+    gambar_price_trend(ax, data["Tanggal"], data["Terakhir"], stock,
+                       indikator if len(indikator.columns) else None)
+
+
+GAMBAR = {
+    "trend": _gambar_trend,
+    "bar": lambda ax, data, label: gambar_marketcap_sektor(ax, data),
+    "pie": lambda ax, data, label: gambar_pie_sektor(ax, data),
+    "heatmap": lambda ax, data, label: gambar_heatmap(ax, data, *label),
+}
+
+
+# ===============================
+# WORKER
+# ===============================
+
+_FIGUR = {}   # per proses: jenis grafik -> (Figure, Axes)
+
+
+def _figur(jenis):
+    """Figure/Axes milik worker ini untuk jenis grafik tsb, dipakai ulang antar grafik"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if jenis not in _FIGUR:
+        fig = Figure(figsize=UKURAN[jenis])
+        FigureCanvasAgg(fig)
+        _FIGUR[jenis] = (fig, fig.add_subplot())
+        return _FIGUR[jenis]
+
+    fig, ax = _FIGUR[jenis]
+    if jenis == "heatmap":
+        # colorbar menambah axes sendiri, jadi figure dikosongkan seluruhnya
+        fig.clf()
+        ax = fig.add_subplot()
+        _FIGUR[jenis] = (fig, ax)
+    else:
+        ax.clear()
+    return fig, ax
+
+
+def _render(task):
+    """task: (jenis, path, data, label) -> (path, error)"""
+    jenis, path, data, label = task
+    # judul memakai emoji; font default Agg tidak punya glyph-nya
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+    try:
+        fig, ax = _figur(jenis)
+        GAMBAR[jenis](ax, data, label)
+        fig.tight_layout()
+        fig.savefig(path)
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+
+# ===============================
+# CHART PACK
+# ===============================
+
+def sidik_data(jenis, data, label):
+    """Hash isi data input grafik (nilai, index & nama kolom)"""
+    h = hashlib.sha1(f"{jenis}|{label}".encode())
+    if isinstance(data, pd.DataFrame):
+        h.update(repr(list(data.columns)).encode())
+    h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def daftar_grafik(histori_df, kumpulan_df, ctx=None):
+    """(nama file tanpa ekstensi, jenis, data, label) untuk semua grafik di chart pack"""
+    from analytics_context import AnalyticsContext
+
+    ctx = ctx or AnalyticsContext(histori_df)
+    panel = ctx.returns_panel()
+
+    kolom_indikator = [c for c in ctx.indikator().columns if c.startswith(("SMA_", "BB_Upper", "BB_Lower"))]
+    for stock in ctx.tickers:
+        data = pd.concat([ctx.saham(stock)[["Tanggal", "Terakhir"]],
+                          ctx.indikator_saham(stock)[kolom_indikator]], axis=1).reset_index(drop=True)
+        yield f"trend_{stock}", "trend", data, stock
+
+    yield ("marketcap_sektor", "bar",
+           kumpulan_df.groupby("Sektor")["Market_Cap"].sum().reset_index(), None)
+    yield "marketcap_pie", "pie", kumpulan_df.groupby("Sektor")["Market_Cap"].sum(), None
+    yield ("heatmap_saham", "heatmap", panel.mean().T,
+           ("🔥 Monthly Return Heatmap per Stock", "Stock"))
+    yield ("heatmap_sektor", "heatmap", panel.sektor(kumpulan_df).T,
+           ("🔥 Monthly Return Heatmap per Sector", "Sector"))
+
+
+def render_chart_pack(histori_df, kumpulan_df, out_dir, fmt="png", n_workers=None, ctx=None, force=False):
+    """
+    Render semua grafik ke out_dir.
+
+    fmt       : "png" atau "svg"
+    n_workers : jumlah proses; 1 = render di proses ini saja
+    force     : True = render ulang walaupun data tidak berubah
+
+    Mengembalikan DataFrame laporan (Chart, Status, Path).
+    """
+    if fmt not in FORMAT_GAMBAR:
+        raise ValueError(f"Format {fmt} tidak didukung (pilih {', '.join(FORMAT_GAMBAR)})")
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    report, tasks, sidik = [], [], {}
+    for nama, jenis, data, label in daftar_grafik(histori_df, kumpulan_df, ctx):
+        file_name = f"{nama}.{fmt}"
+        path = os.path.join(out_dir, file_name)
+        sidik[path] = (file_name, sidik_data(jenis, data, label))
+        if not force and manifest.get(file_name) == sidik[path][1] and os.path.exists(path):
+            report.append({"Chart": nama, "Status": "dilewati", "Path": path})
+        else:
+            tasks.append((jenis, path, data, label))
+
+    def catat(results):
+        for path, error in results:
+            file_name, hash_ = sidik[path]
+            if error:
+                manifest.pop(file_name, None)
+                status = f"gagal: {error}"
+            else:
+                manifest[file_name] = hash_
+                status = "dirender"
+            report.append({"Chart": os.path.splitext(file_name)[0], "Status": status, "Path": path})
+
+    try:
+        if n_workers == 1:
+            catat(map(_render, tasks))
+        else:
+            n_workers = n_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                catat(map_bertahap(pool, _render, tasks, max_pending=4 * n_workers))
+    finally:
+        # grafik yang sudah selesai tetap tercatat walaupun ada yang error di tengah
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    return pd.DataFrame(report, columns=["Chart", "Status", "Path"])
@@ -1,12 +1,67 @@
+import os
 import pandas as pd
 import re
 
-def clean_dataframe(df):
-    """Membersihkan dataframe saham agar siap masuk DB"""
-    
+NUMERIC_COLUMNS = ["Harga", "Volume", "Market_Cap", "Terakhir", "Pembukaan", "Tertinggi", "Terendah", "Vol"]
+MULTIPLIERS = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+
+def _is_teks(series):
+    """Kolom teks: dtype object (pandas 2) atau str (pandas 3)"""
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+
+def parse_angka(series):
+    """
+    Versi vectorized dari convert_num untuk satu kolom sekaligus.
+
+    Format Indonesia: "1.234,5" -> 1234.5, "41,27M" -> 41270000.0.
+    Nilai yang tidak diawali angka (mis. "-5,52") menjadi NaN, sama seperti convert_num.
+    """
+    text = (
+        series.astype(str)
+        .str.replace(".", "", regex=False)
+        .str.replace(",", ".", regex=False)
+    )
+
+    # jalur cepat: angka polos + satu huruf suffix opsional, tanpa regex
+    suffix = text.str[-1].str.upper()
+    has_suffix = suffix.isin(list(MULTIPLIERS))
+    body = text.where(~has_suffix, text.str[:-1])
+    simple = body.str.replace(".", "", n=1, regex=False).str.isdigit().fillna(False).astype(bool)
+
+    # body yang lolos `simple` pasti angka valid, jadi cukup astype (lebih cepat dari to_numeric)
+    number = body.where(simple).astype("float64")
+    multiplier = suffix.where(has_suffix).map(MULTIPLIERS).fillna(1).astype("float64")
+
+    # sisanya (jarang: ada teks tambahan di belakang angka) lewat regex seperti convert_num
+    rest = ~simple & series.notna()
+    if rest.any():
+        parts = text[rest].str.extract(r"^([\d\.]+)([KMBT]?)", flags=re.IGNORECASE)
+        number[rest] = pd.to_numeric(parts[0], errors="coerce")
+        multiplier[rest] = parts[1].str.upper().map(MULTIPLIERS).fillna(1).astype("float64")
+
+    return (number * multiplier).where(series.notna()).astype("float64")
+
+
+def parse_persen(series):
+    """"-5,52%" -> -5.52"""
+    text = series.str.replace("%", "", regex=False).str.replace(",", ".", regex=False)
+    return pd.to_numeric(text, errors="coerce")
+
+
+def clean_dataframe(df, vectorized=True):
+    """
+    Membersihkan dataframe saham agar siap masuk DB
+
+    vectorized=False memakai parser lama per sel (convert_num), dipertahankan
+    sebagai pembanding paritas.
+    """
+
     # Strip semua string
-    for col in df.select_dtypes(include=["object"]).columns:
-        df[col] = df[col].str.strip()
+    for col in df.columns:
+        if _is_teks(df[col]):
+            df[col] = df[col].str.strip()
 
     # Konversi angka dengan K/M/B/T
     def convert_num(val):
@@ -18,12 +73,11 @@ def clean_dataframe(df):
             return float(val) if val.replace(".", "", 1).isdigit() else None
         number, suffix = match.groups()
         number = float(number)
-        multipliers = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
-        return number * multipliers.get(suffix.upper(), 1)
+        return number * MULTIPLIERS.get(suffix.upper(), 1)
 
-    for col in ["Harga", "Volume", "Market_Cap", "Terakhir", "Pembukaan", "Tertinggi", "Terendah", "Vol"]:
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
-            df[col] = df[col].apply(convert_num)
+            df[col] = parse_angka(df[col]) if vectorized else df[col].apply(convert_num)
 
     # Format tanggal
     if "Tanggal" in df.columns:
@@ -32,9 +86,36 @@ def clean_dataframe(df):
 
     # Format kolom persen
     for col in df.columns:
-        if df[col].dtype == "object" and df[col].str.contains("%").any():
-            df[col] = df[col].str.replace("%", "", regex=False)
-            df[col] = df[col].str.replace(",", ".", regex=False)
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+        if col == "Tanggal" and vectorized:
+            continue  # sudah berformat YYYY-MM-DD, tidak mungkin berisi %
+        if _is_teks(df[col]) and df[col].str.contains("%", regex=False).any():
+            if vectorized:
+                df[col] = parse_persen(df[col])
+            else:
+                df[col] = df[col].str.replace("%", "", regex=False)
+                df[col] = df[col].str.replace(",", ".", regex=False)
+                df[col] = pd.to_numeric(df[col], errors="coerce")
 
     return df
+
+
+# --- Perbaiki nama kolom dari Investing.com ---
+RENAME_INVESTING = {
+    "Vol.": "Vol",
+    "Perubahan%": "PerubahanPercent"
+}
+
+
+def kode_saham_dari_file(file_path):
+    """Deteksi nama saham dari filename: "Data Historis BUMI.csv" -> "BUMI" """
+    base = os.path.basename(file_path)
+    name = base.replace(".csv", "")
+    return name.split()[-1].upper()   # ambil kata terakhir
+
+
+def baca_csv_investing(file_path):
+    """Baca + bersihkan satu export Investing.com, siap masuk histori_saham"""
+    raw_df = pd.read_csv(file_path).rename(columns=RENAME_INVESTING)
+    df_clean = clean_dataframe(raw_df)
+    df_clean["Nama_Saham"] = kode_saham_dari_file(file_path)
+    return df_clean
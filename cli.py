@@ -0,0 +1,228 @@
+"""
+Mode batch (non-interaktif) untuk analisa & simulasi di main.py.
+
+Contoh:
+    python main.py simulate --month 1 --year 2024 --money 1e7 --format parquet
+    python main.py owner growth upside --format csv --out hasil/
+    python main.py portfolio cari --month 1 --year 2024 --alloc BBRI=0.4,BBCA=0.6 --stock BBCA
+    python main.py charts --chart-format svg --out nightly/
+    python main.py ohlcv --freq W --format parquet
+    python main.py dca --month 1 --year 2020 --money 0 --setoran 1e6 --rebalance 3 --alloc BBRI=0.5,BBCA=0.5
+    python main.py dca --month 1 --year 2020 --setoran 1e6     (tanpa --alloc: DCA tiap saham di universe)
+
+Data dimuat sekali per proses lalu dipakai semua analisa yang diminta. Hasil
+ditulis sebagai CSV/JSON/Parquet (satu file per analisa, atau ke stdout dengan
+--out -); tidak ada tabel rich maupun jendela grafik (analisa `charts` menulis
+PNG/SVG lewat chart_pack secara headless). Log dicetak ke stderr.
+"""
+import argparse
+import contextlib
+import os
+import sys
+
+import pandas as pd
+
+import main as app
+from analytics_context import AnalyticsContext
+
+FORMAT = {"csv": "csv", "json": "json", "parquet": "parquet"}
+
+
+# ===============================
+# ANALISA
+# ===============================
+
+def _owner(kumpulan, histori, ctx, args):
+    return app.owner_performance(histori, kumpulan, ctx=ctx)[0]
+
+
+def _growth(kumpulan, histori, ctx, args):
+    return app.stock_growth(histori, kumpulan, ctx=ctx)
+
+
+def _upside(kumpulan, histori, ctx, args):
+    return app.potensi_upside_vectorized(kumpulan, top_n=args.top_n)
+
+
+def _simulate(kumpulan, histori, ctx, args):
+    return app.simulate_investment(histori, args.month, args.year, args.money,
+                                   target_date=args.target_date, show_plot=False, ctx=ctx)
+
+
+def _portfolio(kumpulan, histori, ctx, args):
+    df = app.simulate_portfolio(histori, args.alloc, args.month, args.year, args.money,
+                                target_date=args.target_date, show_plot=False, ctx=ctx)
+    # file hasil ikut memuat baris total (attrs tidak ikut tertulis ke CSV/JSON)
+    return app.baris_portofolio(df)
+
+
+def _cari(kumpulan, histori, ctx, args):
+    """Seperti cari_saham: harga di bulan/tahun itu, atau k baris terakhir"""
+    frames = []
+    for stock in args.stock:
+        if not ctx.indeks.ada(stock):
+            print(f"⚠️ Saham {stock} tidak ditemukan. Saran: {', '.join(ctx.indeks.saran(stock)) or '-'}")
+            continue
+        if args.month and args.year:
+            row = ctx.indeks.harga_bulan(stock, args.year, args.month)
+            frames.append(row.to_frame().T if row is not None else None)
+        else:
+            frames.append(ctx.indeks.terakhir(stock, args.last))
+    frames = [f for f in frames if f is not None]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _ohlcv(kumpulan, histori, ctx, args):
+    """Bar OHLCV mingguan/bulanan (resample dari histori harian, di-memo di ctx)"""
+    return ctx.ohlcv(args.freq)
+
+
+def _charts(kumpulan, histori, ctx, args):
+    """Chart pack PNG/SVG; hasil analisa ini = laporan per grafik"""
+    from chart_pack import render_chart_pack
+
+    chart_dir = args.chart_dir or os.path.join("." if args.out == "-" else args.out, "charts")
+    return render_chart_pack(histori, kumpulan, chart_dir, fmt=args.chart_format,
+                             n_workers=args.workers, ctx=ctx, force=args.force)
+
+
+def _dca(kumpulan, histori, ctx, args):
+    """Backtest DCA/rebalance; tanpa --alloc tiap saham jadi satu strategi (perbandingan universe)"""
+    from backtest import backtest, strategi_per_saham
+
+    strategi = {"Portofolio": args.alloc} if args.alloc else strategi_per_saham(ctx.tickers)
+    hasil = backtest(histori, strategi, args.month, args.year, args.money, args.setoran, args.rebalance,
+                     args.target_date, ctx=ctx)
+    if hasil is None:
+        raise ValueError("periode atau alokasi tidak valid")
+    if args.dca_hasil == "equity":
+        return hasil.equity.join(hasil.modal).reset_index()
+    if args.dca_hasil == "holdings":
+        return pd.concat({nama: hasil.holdings(nama) for nama in hasil.bobot.index}, names=["Strategi"]).reset_index()
+    if args.dca_hasil == "ledger":
+        return hasil.ledger()
+    return hasil.ringkasan().reset_index()
+
+
+ANALISA = {
+    "owner": (_owner, ()),
+    "growth": (_growth, ()),
+    "upside": (_upside, ()),
+    "simulate": (_simulate, ("month", "year")),
+    "portfolio": (_portfolio, ("month", "year", "alloc")),
+    "cari": (_cari, ("stock",)),
+    "charts": (_charts, ()),
+    "ohlcv": (_ohlcv, ()),
+    "dca": (_dca, ("month", "year")),
+}
+
+
+# ===============================
+# ARGUMEN & OUTPUT
+# ===============================
+
+def _parse_alokasi(text):
+    """"BBRI=0.4, BBCA=0.6" -> {"BBRI": 0.4, "BBCA": 0.6} (format sama dengan menu 7)"""
+    try:
+        return {part.split("=")[0].strip().upper(): float(part.split("=")[1])
+                for part in text.split(",")}
+    except (IndexError, ValueError):
+        raise argparse.ArgumentTypeError(f"alokasi tidak valid: {text!r} (contoh: BBRI=0.4,BBCA=0.6)")
+
+
+def buat_parser():
+    parser = argparse.ArgumentParser(prog="saham", description="Analisa & simulasi saham tanpa menu interaktif")
+    parser.add_argument("analisa", nargs="+", choices=list(ANALISA), help="satu atau lebih analisa")
+    parser.add_argument("--month", type=int, help="bulan entry (1-12)")
+    parser.add_argument("--year", type=int, help="tahun entry")
+    parser.add_argument("--money", type=float, default=1e7, help="modal awal (Rp), default 1e7")
+    parser.add_argument("--target-date", help="tanggal exit (YYYY-MM-DD), default tanggal terakhir")
+    parser.add_argument("--alloc", type=_parse_alokasi, help="alokasi portofolio, contoh BBRI=0.4,BBCA=0.6")
+    parser.add_argument("--stock", type=lambda s: [x.strip().upper() for x in s.split(",") if x.strip()],
+                        help="kode saham untuk cari, pisahkan dengan koma")
+    parser.add_argument("--last", type=int, default=6, help="cari tanpa bulan/tahun: jumlah baris terakhir")
+    parser.add_argument("--top-n", type=int, help="upside: hanya N saham dengan upside positif terbesar (seluruh pasar)")
+    parser.add_argument("--freq", choices=["W", "M"], default="M", help="ohlcv: mingguan / bulanan")
+    parser.add_argument("--setoran", type=float, default=0.0, help="dca: setoran per bulan (Rp)")
+    parser.add_argument("--rebalance", type=int, default=0, help="dca: rebalance tiap n bulan, 0 = tidak pernah")
+    parser.add_argument("--dca-hasil", choices=["ringkasan", "equity", "holdings", "ledger"], default="ringkasan",
+                        help="dca: tabel yang ditulis")
+    parser.add_argument("--chart-dir", help="charts: direktori grafik, default <out>/charts")
+    parser.add_argument("--chart-format", choices=["png", "svg"], default="png")
+    parser.add_argument("--workers", type=int, help="charts: jumlah proses render")
+    parser.add_argument("--force", action="store_true", help="charts: render ulang walaupun data sama")
+    parser.add_argument("--format", choices=list(FORMAT), default="csv")
+    parser.add_argument("--out", default=".", help="direktori output, atau - untuk stdout (csv/json)")
+    parser.add_argument("--db-url", help="URL SQLAlchemy pengganti koneksi MySQL default")
+    return parser
+
+
+def tulis_hasil(df, nama, fmt, out):
+    """Tulis df ke <out>/<nama>.<fmt> (atau stdout); mengembalikan path/'-'"""
+    if out == "-":
+        if fmt == "parquet":
+            raise ValueError("format parquet tidak bisa ditulis ke stdout")
+        sys.stdout.write(f"# {nama}\n")
+        if fmt == "csv":
+            df.to_csv(sys.stdout, index=False)
+        else:
+            sys.stdout.write(df.to_json(orient="records", date_format="iso") + "\n")
+        return "-"
+
+    os.makedirs(out, exist_ok=True)
+    path = os.path.join(out, f"{nama}.{FORMAT[fmt]}")
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "json":
+        df.to_json(path, orient="records", date_format="iso")
+    else:
+        df.to_parquet(path, index=False)
+    return path
+
+
+def jalankan(argv=None, engine=None, data=None):
+    """
+    Entry point mode batch. engine / data (df_kumpulan, df_histori) boleh diisi
+    dari luar supaya data yang sudah dimuat tidak dibaca ulang.
+    Mengembalikan exit code (0 = semua analisa berhasil).
+    """
+    parser = buat_parser()
+    args = parser.parse_args(argv)
+
+    for nama in args.analisa:
+        kurang = [opsi for opsi in ANALISA[nama][1] if getattr(args, opsi) is None]
+        if kurang:
+            parser.error(f"{nama} butuh --{', --'.join(k.replace('_', '-') for k in kurang)}")
+
+    gagal = 0
+    # semua print dari fungsi analisa ke stderr supaya stdout bersih untuk --out -
+    with contextlib.redirect_stdout(sys.stderr):
+        if data is None:
+            engine = engine or app.buat_koneksi(args.db_url)
+            data = app.muat_data(engine) if engine else None
+            if data is None:
+                return 1
+        kumpulan, histori = data
+        ctx = AnalyticsContext(histori)
+
+        hasil = []
+        for nama in dict.fromkeys(args.analisa):
+            func = ANALISA[nama][0]
+            try:
+                hasil.append((nama, func(kumpulan, histori, ctx, args)))
+            except Exception as e:
+                print(f"❌ Analisa {nama} gagal: {e}")
+                gagal += 1
+
+    for nama, df in hasil:
+        try:
+            path = tulis_hasil(df, nama, args.format, args.out)
+            print(f"✅ {nama}: {len(df)} baris -> {path}", file=sys.stderr)
+        except Exception as e:
+            print(f"❌ Gagal menulis {nama}: {e}", file=sys.stderr)
+            gagal += 1
+    return 1 if gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(jalankan())
@@ -27,3 +27,6 @@ CREATE TABLE histori_saham (
     PerubahanPercent DECIMAL(8,2),
     PRIMARY KEY (Nama_Saham, Tanggal)
 );
+
+-- Index & partisi per tahun: jalankan migrasi setelah skema ini dibuat
+--   python migrasi.py --explain
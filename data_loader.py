@@ -0,0 +1,164 @@
+"""
+Loader bertipe untuk tabel saham.
+
+Data dibaca dengan server-side cursor per chunk lalu langsung disusun menjadi
+kolom numpy float64/int64/datetime64, jadi tidak ada batas LIMIT dan tidak
+ada salinan penuh berisi objek Decimal di memori.
+"""
+import numpy as np
+import pandas as pd
+
+# tipe kolom sesuai create-new-sql.sql
+SKEMA_TABEL = {
+    "kumpulan_saham": {
+        "id": "int64",
+        "Tanggal": "datetime64",
+        "Nama_Saham": "object",
+        "Sektor": "object",
+        "Kepemilikan": "object",
+        "Harga": "int64",
+        "Volume": "int64",
+        "Market_Cap": "int64",
+    },
+    "histori_saham": {
+        "Nama_Saham": "object",
+        "Tanggal": "datetime64",
+        "Terakhir": "float64",
+        "Pembukaan": "float64",
+        "Tertinggi": "float64",
+        "Terendah": "float64",
+        "Vol": "int64",
+        "PerubahanPercent": "float64",
+    },
+}
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def _buat_query(nama_tabel, columns=None, tickers=None, start=None, end=None):
+    """Menyusun SELECT dengan filter ticker/tanggal/kolom yang dijalankan di SQL"""
+    # sqlalchemy baru di-import saat query pertama (tidak ikut biaya `import main`)
+    from sqlalchemy import and_, column, select, table
+
+    skema = SKEMA_TABEL[nama_tabel]
+    columns = list(columns) if columns else list(skema)
+
+    unknown = [c for c in columns if c not in skema]
+    if unknown:
+        raise ValueError(f"Kolom tidak dikenal untuk {nama_tabel}: {unknown}")
+
+    tbl = table(nama_tabel, *[column(c) for c in skema])
+    filters = []
+    if tickers is not None:
+        filters.append(tbl.c.Nama_Saham.in_([t.upper() for t in tickers]))
+    if start is not None:
+        filters.append(tbl.c.Tanggal >= pd.to_datetime(start).date())
+    if end is not None:
+        filters.append(tbl.c.Tanggal <= pd.to_datetime(end).date())
+
+    stmt = select(*[tbl.c[c] for c in columns])
+    if filters:
+        stmt = stmt.where(and_(*filters))
+    return stmt, columns
+
+
+def _buka_cursor(dbapi_conn, driver):
+    """Server-side (unbuffered) cursor supaya baris tidak ditarik sekaligus"""
+    if driver == "mysqlconnector":
+        return dbapi_conn.cursor(buffered=False)
+    if driver == "pymysql":
+        import pymysql.cursors
+        return dbapi_conn.cursor(pymysql.cursors.SSCursor)
+    if driver == "mysqldb":
+        import MySQLdb.cursors
+        return dbapi_conn.cursor(MySQLdb.cursors.SSCursor)
+    # sqlite3 dan driver lain sudah membaca secara lazy lewat fetchmany
+    return dbapi_conn.cursor()
+
+
+def _konversi_chunk(values, dtype):
+    """Mengubah satu kolom hasil fetch menjadi array numpy bertipe"""
+    if dtype == "float64":
+        return np.array(values, dtype="float64")
+    if dtype == "int64":
+        try:
+            return np.array(values, dtype="int64")
+        except TypeError:
+            # ada NULL → simpan sementara sebagai float, jadi Int64 di akhir
+            return np.array(values, dtype="float64")
+    if dtype == "datetime64":
+        return np.array(values, dtype="datetime64[D]")
+    return np.array(values, dtype=object)
+
+
+def _gabung_kolom(chunks, dtype):
+    if not chunks:
+        return np.array([], dtype="datetime64[ns]" if dtype == "datetime64" else dtype)
+
+    arr = np.concatenate(chunks)
+    if dtype == "datetime64":
+        return arr.astype("datetime64[ns]")
+    if dtype == "int64" and arr.dtype != np.int64:
+        return pd.array(arr, dtype="Int64")
+    return arr
+
+
+def iter_chunk(engine, nama_tabel, columns=None, tickers=None, start=None, end=None,
+               chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Generator chunk bertipe dari tabel: tiap item adalah dict {kolom: array numpy}.
+
+    Dipakai muat_tabel, tapi bisa juga dipakai langsung untuk proses streaming.
+    """
+    stmt, columns = _buat_query(nama_tabel, columns, tickers, start, end)
+    dtypes = [SKEMA_TABEL[nama_tabel][c] for c in columns]
+
+    compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = _buka_cursor(raw_conn.driver_connection, engine.dialect.driver)
+        try:
+            cursor.execute(str(compiled), params)
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                values = list(zip(*rows))
+                yield {
+                    col: _konversi_chunk(vals, dtype)
+                    for col, vals, dtype in zip(columns, values, dtypes)
+                }
+        finally:
+            cursor.close()
+    finally:
+        raw_conn.close()
+
+
+def muat_tabel(engine, nama_tabel, columns=None, tickers=None, start=None, end=None,
+               chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Memuat tabel lengkap (tanpa LIMIT) menjadi DataFrame bertipe.
+
+    tickers   : list kode saham, contoh ["BBCA", "BUMI"]
+    start/end : rentang Tanggal (inklusif)
+    columns   : subset kolom yang diambil
+    """
+    try:
+        _, columns = _buat_query(nama_tabel, columns, tickers, start, end)
+        dtypes = {c: SKEMA_TABEL[nama_tabel][c] for c in columns}
+
+        parts = {c: [] for c in columns}
+        for chunk in iter_chunk(engine, nama_tabel, columns, tickers, start, end, chunksize):
+            for col, arr in chunk.items():
+                parts[col].append(arr)
+
+        df = pd.DataFrame({c: _gabung_kolom(parts[c], dtypes[c]) for c in columns})
+        print(f"\n=== DATA: {nama_tabel.upper()} ({len(df)} baris) ===")
+        return df
+    except Exception as e:
+        print(f"Terjadi error saat membaca {nama_tabel}: '{e}'")
+        return None
@@ -0,0 +1,170 @@
+"""
+Generator data sintetis (seeded) untuk benchmark & uji skala.
+
+Menghasilkan kumpulan_saham dan histori_saham dengan skema yang sama seperti
+DumpDataSaham.sql (jumlah ticker, sektor, pemilik dan periode bisa diatur,
+frekuensi harian atau bulanan), export berformat Investing.com, dan database
+SQLite lokal berisi data tersebut. Seed yang sama selalu menghasilkan data
+yang sama.
+"""
+import os
+import re
+import string
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+DUMP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DumpDataSaham.sql")
+FREKUENSI = {"D": "B", "M": "MS"}   # harian = hari bursa, bulanan = awal bulan (seperti dump)
+
+
+# ===============================
+# KUMPULAN & HISTORI
+# ===============================
+
+def kode_ticker(n, seed=0):
+    """n kode unik 4 huruf (mis. "BBCA"), urut alfabet"""
+    rng = np.random.default_rng(seed)
+    angka = np.sort(rng.choice(26 ** 4, n, replace=False))
+    huruf = np.array(list(string.ascii_uppercase))
+    digit = np.stack([(angka // 26 ** p) % 26 for p in (3, 2, 1, 0)], axis=1)
+    return ["".join(row) for row in huruf[digit]]
+
+
+def buat_kumpulan(n_saham=900, n_sektor=40, n_pemilik=25, tanggal="2025-09-15", seed=42):
+    """kumpulan_saham palsu dengan distribusi market cap log-uniform (1e10 - 1e14)"""
+    rng = np.random.default_rng(seed)
+    harga = np.round(10 ** rng.uniform(1.7, 4.3, n_saham))
+    return pd.DataFrame({
+        "id": np.arange(1, n_saham + 1),
+        "Tanggal": pd.Timestamp(tanggal),
+        "Nama_Saham": kode_ticker(n_saham, seed),
+        "Sektor": [f"Sektor {i}" for i in rng.integers(0, n_sektor, n_saham)],
+        "Kepemilikan": [f"Owner {i}" for i in rng.integers(0, n_pemilik, n_saham)],
+        "Harga": harga.astype("int64"),
+        "Volume": (10 ** rng.uniform(6, 12, n_saham)).astype("int64"),
+        "Market_Cap": (10 ** rng.uniform(10, 14, n_saham)).astype("int64"),
+    })
+
+
+def buat_histori(tickers, n_periode=24, freq="M", start="2023-10-01", seed=0):
+    """
+    histori_saham palsu (random walk log-normal per ticker), urut per
+    (Nama_Saham, Tanggal) seperti primary key di database.
+
+    tickers : list kode, jumlah ticker (int), atau DataFrame kumpulan
+    freq    : "D" (hari bursa) atau "M" (bulanan, tanggal 1)
+    """
+    if isinstance(tickers, pd.DataFrame):
+        tickers = tickers["Nama_Saham"].tolist()
+    elif isinstance(tickers, int):
+        tickers = kode_ticker(tickers, seed)
+    tickers = sorted(tickers)
+
+    rng = np.random.default_rng(seed)
+    n_saham = len(tickers)
+    tanggal = pd.date_range(start, periods=n_periode, freq=FREKUENSI[freq])
+    sigma = (0.02 if freq == "D" else 0.09) * rng.uniform(0.5, 2, (n_saham, 1))
+
+    awal = 10 ** rng.uniform(1.7, 4.3, (n_saham, 1))
+    close = np.round(awal * np.exp(np.cumsum(rng.normal(0, 1, (n_saham, n_periode)) * sigma, axis=1)))
+    close = np.maximum(close, 1)
+    prev = np.concatenate([awal.round(), close[:, :-1]], axis=1)
+    pembukaan = np.maximum(np.round(prev * np.exp(rng.normal(0, 0.3, close.shape) * sigma)), 1)
+    tertinggi = np.round(np.maximum(close, pembukaan) * (1 + np.abs(rng.normal(0, 0.5, close.shape)) * sigma))
+    terendah = np.maximum(np.round(np.minimum(close, pembukaan) * (1 - np.abs(rng.normal(0, 0.5, close.shape)) * sigma)), 1)
+    vol = np.round(10 ** rng.normal(7.5, 0.8, close.shape), -4)
+
+    return pd.DataFrame({
+        "Nama_Saham": np.repeat(np.array(tickers, dtype=object), n_periode),
+        "Tanggal": np.tile(tanggal, n_saham),
+        "Terakhir": close.ravel(),
+        "Pembukaan": pembukaan.ravel(),
+        "Tertinggi": tertinggi.ravel(),
+        "Terendah": terendah.ravel(),
+        "Vol": vol.ravel(),
+        "PerubahanPercent": np.round((close / prev - 1) * 100, 2).ravel(),
+    })
+
+
+# ===============================
+# FORMAT INVESTING.COM
+# ===============================
+
+def format_id(values, decimals=2):
+    """1234.5 -> '1.234,50' (format angka Investing.com versi Indonesia)"""
+    return [f"{v:,.{decimals}f}".replace(",", "_").replace(".", ",").replace("_", ".") for v in values]
+
+
+def ke_format_investing(histori_df):
+    """histori satu saham -> DataFrame teks seperti export Investing.com (terbaru di atas)"""
+    df = histori_df.sort_values("Tanggal", ascending=False)
+    vol = df["Vol"].to_numpy(dtype="float64")
+    kondisi = [vol >= 1e9, vol >= 1e6, vol >= 1e3]
+    unit = np.select(kondisi, ["B", "M", "K"], "")
+    scale = np.select(kondisi, [1e9, 1e6, 1e3], 1)
+
+    return pd.DataFrame({
+        "Tanggal": pd.to_datetime(df["Tanggal"]).dt.strftime("%d/%m/%Y").to_numpy(),
+        "Terakhir": format_id(df["Terakhir"]),
+        "Pembukaan": format_id(df["Pembukaan"]),
+        "Tertinggi": format_id(df["Tertinggi"]),
+        "Terendah": format_id(df["Terendah"]),
+        "Vol.": [v + u for v, u in zip(format_id(vol / scale), unit)],
+        "Perubahan%": [p + "%" for p in format_id(df["PerubahanPercent"])],
+    })
+
+
+def tulis_csv_investing(histori_df, out_dir):
+    """Satu file "Data Historis <KODE>.csv" per saham; mengembalikan list path"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for stock, group in histori_df.groupby("Nama_Saham", sort=True):
+        path = os.path.join(out_dir, f"Data Historis {stock}.csv")
+        ke_format_investing(group).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# ===============================
+# DATABASE
+# ===============================
+
+def ddl_sqlite(ddl):
+    """Menyesuaikan CREATE TABLE hasil mysqldump supaya bisa dipakai SQLite"""
+    ddl = re.sub(r"\)\s*ENGINE=.*$", ")", ddl, flags=re.S)
+    ddl = ddl.replace("`id` int NOT NULL AUTO_INCREMENT", "`id` INTEGER PRIMARY KEY AUTOINCREMENT")
+    return re.sub(r",\s*PRIMARY KEY \(`id`\)", "", ddl)
+
+
+def baca_dump(dump_path=DUMP_PATH):
+    """(list DDL CREATE TABLE, list (tabel, VALUES ...)) dari mysqldump"""
+    with open(dump_path, encoding="utf-8") as f:
+        sql = f.read()
+    ddls = re.findall(r"CREATE TABLE `\w+` \(.*?\) ENGINE=[^;]*", sql, flags=re.S)
+    inserts = re.findall(r"INSERT INTO `(\w+)` VALUES (.*);", sql)
+    return ddls, inserts
+
+
+def buat_engine(kumpulan_df=None, histori_df=None, url="sqlite://", dump_path=DUMP_PATH):
+    """
+    Database lokal dengan skema DumpDataSaham.sql.
+
+    Kalau kumpulan_df / histori_df kosong, tabelnya diisi data asli dari dump;
+    kalau diisi, tabel berisi data tersebut.
+    """
+    ddls, inserts = baca_dump(dump_path)
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        for ddl in ddls:
+            conn.exec_driver_sql(ddl_sqlite(ddl))
+        for nama_tabel, values in inserts:
+            if {"kumpulan_saham": kumpulan_df, "histori_saham": histori_df}.get(nama_tabel) is None:
+                conn.exec_driver_sql(f"INSERT INTO {nama_tabel} VALUES {values}")
+
+    for nama_tabel, df in (("kumpulan_saham", kumpulan_df), ("histori_saham", histori_df)):
+        if df is not None:
+            df = df.assign(Tanggal=pd.to_datetime(df["Tanggal"]).dt.date)
+            df.to_sql(nama_tabel, engine, if_exists="append", index=False, chunksize=50_000)
+    return engine
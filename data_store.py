@@ -0,0 +1,87 @@
+"""
+Penyimpan data in-process untuk df_kumpulan dan df_histori.
+
+Setiap penulisan ke database (tambah/hapus saham, import/hapus histori)
+diterapkan sebagai delta ke DataFrame yang sudah ada di memori, jadi tidak
+perlu query ulang seluruh tabel. Atribut `versi` naik setiap ada perubahan
+sehingga cache turunan tahu kapan harus dihitung ulang; `delta_terakhir`
+menyimpan baris histori yang baru di-append supaya cache bisa di-update
+inkremental.
+"""
+import pandas as pd
+
+from data_loader import SKEMA_TABEL
+
+
+def samakan_tipe(df, nama_tabel):
+    """Menyamakan tipe kolom baris baru dengan tipe hasil data_loader"""
+    df = df.copy()
+    for col, dtype in SKEMA_TABEL[nama_tabel].items():
+        if col not in df.columns:
+            continue
+        if dtype == "datetime64":
+            df[col] = pd.to_datetime(df[col])
+        elif dtype == "float64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        elif dtype == "int64":
+            values = pd.to_numeric(df[col], errors="coerce")
+            df[col] = values.astype("Int64" if values.isna().any() else "int64")
+        else:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str).str.strip())
+    return df
+
+
+class DataStore:
+    """Pemilik df_kumpulan & df_histori yang di-update per delta"""
+
+    def __init__(self, kumpulan, histori):
+        self.kumpulan = kumpulan
+        self.histori = histori
+        self.versi = 0
+        self.delta_terakhir = None   # (versi, rows) kalau perubahan terakhir = append histori
+
+    def _naikkan_versi(self, append_rows=None):
+        self.versi += 1
+        self.delta_terakhir = (self.versi, append_rows) if append_rows is not None else None
+        return self.versi
+
+    # --- kumpulan_saham ---
+    def tambah_kumpulan(self, row):
+        """row: dict satu saham baru (hasil tambah_saham)"""
+        new = samakan_tipe(pd.DataFrame([row]), "kumpulan_saham")
+        self.kumpulan = pd.concat([self.kumpulan, new[self.kumpulan.columns.intersection(new.columns)]],
+                                  ignore_index=True)
+        return self._naikkan_versi()
+
+    def hapus_kumpulan(self, nama):
+        self.kumpulan = self.kumpulan[self.kumpulan["Nama_Saham"] != nama.strip()].reset_index(drop=True)
+        return self._naikkan_versi()
+
+    # --- histori_saham ---
+    def tambah_histori(self, rows, replace=False):
+        """
+        rows    : DataFrame hasil import (boleh berisi beberapa saham)
+        replace : True kalau histori lama saham-saham tersebut dihapus dulu
+
+        Baris dengan (Nama_Saham, Tanggal) yang sama menimpa baris lama.
+        """
+        if rows is None or rows.empty:
+            return self.versi
+
+        new = samakan_tipe(rows, "histori_saham")
+        new = new[[c for c in self.histori.columns if c in new.columns]]
+
+        old = self.histori
+        if replace:
+            old = old[~old["Nama_Saham"].isin(new["Nama_Saham"].unique())]
+        else:
+            key_old = pd.MultiIndex.from_frame(old[["Nama_Saham", "Tanggal"]])
+            key_new = pd.MultiIndex.from_frame(new[["Nama_Saham", "Tanggal"]])
+            old = old[~key_old.isin(key_new)]
+
+        self.histori = pd.concat([old, new], ignore_index=True)
+        return self._naikkan_versi(append_rows=None if replace else new)
+
+    def hapus_histori(self, nama):
+        self.histori = self.histori[self.histori["Nama_Saham"] != nama.strip()].reset_index(drop=True)
+        return self._naikkan_versi()
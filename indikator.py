@@ -0,0 +1,129 @@
+"""
+Indikator teknikal untuk semua ticker sekaligus.
+
+Histori (urut per Nama_Saham, Tanggal) disusun menjadi panel lebar
+baris-ke-k x ticker: kolom j berisi deret harga ticker j apa adanya, rata
+kiri, dan sisa barisnya NaN. Rolling / ewm pandas di sepanjang axis 0 lalu
+sama dengan menghitung per ticker, tanpa loop Python per ticker. Hasil panel
+dikembalikan ke bentuk baris histori lewat indeks (posisi, ticker).
+
+Semua indikator memakai konvensi umum:
+  SMA/EMA/Vol_MA  : rolling mean / ewm(span, adjust=False)
+  RSI, ATR        : smoothing Wilder (ewm alpha=1/n)
+  MACD            : EMA12 - EMA26, signal EMA9
+  Bollinger       : SMA20 +- 2 std (populasi)
+"""
+import numpy as np
+import pandas as pd
+
+# parameter default: nama kolom hasil mengikuti angka periodenya
+PARAMETER = {
+    "sma": (20, 50),
+    "ema": (12, 26),
+    "rsi": 14,
+    "macd": (12, 26, 9),
+    "bollinger": (20, 2),
+    "atr": 14,
+    "vol_ma": 20,
+}
+
+
+class PanelSaham:
+    """Peta baris histori <-> panel (posisi dalam ticker, ticker)"""
+
+    def __init__(self, starts, ends, n_rows):
+        lengths = np.asarray(ends) - np.asarray(starts)
+        self.ticker = np.repeat(np.arange(len(lengths)), lengths)
+        self.posisi = np.arange(n_rows) - np.repeat(starts, lengths)
+        self.shape = (int(lengths.max()) if len(lengths) else 0, len(lengths))
+
+    def panel(self, values):
+        """Kolom baris histori -> DataFrame lebar (posisi x ticker), float64"""
+        wide = np.full(self.shape, np.nan)
+        wide[self.posisi, self.ticker] = values
+        return pd.DataFrame(wide)
+
+    def ke_baris(self, wide):
+        """DataFrame lebar -> array sejajar baris histori"""
+        return wide.to_numpy()[self.posisi, self.ticker]
+
+
+# ===============================
+# INDIKATOR (input/output: panel lebar)
+# ===============================
+
+def sma(close, n):
+    return close.rolling(n, min_periods=n).mean()
+
+
+def ema(close, n):
+    return close.ewm(span=n, adjust=False, min_periods=n).mean()
+
+
+def _wilder(values, n):
+    return values.ewm(alpha=1 / n, adjust=False, min_periods=n).mean()
+
+
+def rsi(close, n=14):
+    delta = close.diff()
+    gain = _wilder(delta.clip(lower=0), n)
+    loss = _wilder(-delta.clip(upper=0), n)
+    return 100 - 100 / (1 + gain / loss)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = ema(close, fast) - ema(close, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def bollinger(close, n=20, k=2):
+    mid = sma(close, n)
+    std = close.rolling(n, min_periods=n).std(ddof=0)
+    return mid, mid + k * std, mid - k * std
+
+
+def atr(high, low, close, n=14):
+    prev = close.shift(1)
+    true_range = np.maximum(high - low, np.maximum((high - prev).abs(), (low - prev).abs()))
+    # bar pertama tiap ticker tidak punya prev close: TR = high - low
+    true_range = true_range.where(prev.notna(), high - low)
+    return _wilder(true_range, n)
+
+
+# ===============================
+# SEMUA INDIKATOR
+# ===============================
+
+def hitung_indikator(histori_df, starts, ends, parameter=PARAMETER):
+    """
+    histori_df : histori urut per (Nama_Saham, Tanggal), mis. AnalyticsContext.histori
+    starts/ends: offset baris per ticker (IndeksSaham.starts / ends)
+
+    Mengembalikan DataFrame sejajar histori_df (index sama) berisi Nama_Saham,
+    Tanggal dan kolom indikator.
+    """
+    peta = PanelSaham(starts, ends, len(histori_df))
+    close = peta.panel(histori_df["Terakhir"].to_numpy(dtype="float64"))
+
+    hasil = {}
+    for n in parameter["sma"]:
+        hasil[f"SMA_{n}"] = sma(close, n)
+    for n in parameter["ema"]:
+        hasil[f"EMA_{n}"] = ema(close, n)
+    hasil[f"RSI_{parameter['rsi']}"] = rsi(close, parameter["rsi"])
+    hasil["MACD"], hasil["MACD_Signal"], hasil["MACD_Hist"] = macd(close, *parameter["macd"])
+    hasil["BB_Mid"], hasil["BB_Upper"], hasil["BB_Lower"] = bollinger(close, *parameter["bollinger"])
+
+    if {"Tertinggi", "Terendah"} <= set(histori_df.columns):
+        high = peta.panel(histori_df["Tertinggi"].to_numpy(dtype="float64"))
+        low = peta.panel(histori_df["Terendah"].to_numpy(dtype="float64"))
+        hasil[f"ATR_{parameter['atr']}"] = atr(high, low, close, parameter["atr"])
+    if "Vol" in histori_df.columns:
+        vol = peta.panel(histori_df["Vol"].to_numpy(dtype="float64"))
+        hasil[f"Vol_MA_{parameter['vol_ma']}"] = sma(vol, parameter["vol_ma"])
+
+    df = histori_df[["Nama_Saham", "Tanggal"]].copy()
+    for nama, wide in hasil.items():
+        df[nama] = peta.ke_baris(wide)
+    return df
@@ -0,0 +1,90 @@
+"""
+Indeks lookup untuk histori_saham yang sudah urut per (Nama_Saham, Tanggal).
+
+Setiap ticker menempati satu blok baris berurutan, jadi cukup simpan offset
+awal/akhir per ticker. Pencarian ticker dan tanggal memakai binary search
+(np.searchsorted) dan hasilnya berupa slice iloc, tanpa scan boolean atau
+copy seluruh histori.
+"""
+import difflib
+
+import numpy as np
+import pandas as pd
+
+
+class IndeksSaham:
+    def __init__(self, histori_df, sudah_urut=False):
+        if not sudah_urut:
+            histori_df = (
+                histori_df.assign(Tanggal=pd.to_datetime(histori_df["Tanggal"]))
+                .sort_values(["Nama_Saham", "Tanggal"], kind="stable")
+                .reset_index(drop=True)
+            )
+        self.histori = histori_df
+
+        names = histori_df["Nama_Saham"].to_numpy(dtype=object)
+        self.tickers, self.starts = np.unique(names, return_index=True)
+        self.ends = np.append(self.starts[1:], len(names))
+        self.ticker_set = frozenset(self.tickers)
+        self._ticker_list = self.tickers.tolist()
+        self._tanggal = histori_df["Tanggal"].to_numpy(dtype="datetime64[ns]")
+
+    # --- ticker ---
+    def ada(self, stock):
+        return stock in self.ticker_set
+
+    def rentang(self, stock):
+        """(awal, akhir) baris milik stock, None kalau tidak ada"""
+        pos = np.searchsorted(self.tickers, stock)
+        if pos >= len(self.tickers) or self.tickers[pos] != stock:
+            return None
+        return self.starts[pos], self.ends[pos]
+
+    def saham(self, stock):
+        """Histori satu saham (urut Tanggal); frame kosong kalau tidak ada"""
+        blok = self.rentang(stock)
+        if blok is None:
+            return self.histori.iloc[0:0]
+        return self.histori.iloc[blok[0]:blok[1]]
+
+    # --- pertanyaan harga ---
+    def harga_bulan(self, stock, year, month):
+        """Baris pertama stock di bulan/tahun itu, None kalau tidak ada"""
+        blok = self.rentang(stock)
+        if blok is None:
+            return None
+        awal = pd.Timestamp(year=year, month=month, day=1)
+        akhir = awal + pd.offsets.MonthBegin(1)
+        i = blok[0] + np.searchsorted(self._tanggal[blok[0]:blok[1]], awal.to_datetime64())
+        if i >= blok[1] or self._tanggal[i] >= akhir.to_datetime64():
+            return None
+        return self.histori.iloc[i]
+
+    def terbaru(self, stock):
+        """Baris dengan tanggal terakhir, None kalau tidak ada"""
+        blok = self.rentang(stock)
+        return None if blok is None else self.histori.iloc[blok[1] - 1]
+
+    def terakhir(self, stock, k):
+        """k baris terakhir (urut Tanggal)"""
+        blok = self.rentang(stock)
+        if blok is None:
+            return self.histori.iloc[0:0]
+        return self.histori.iloc[max(blok[0], blok[1] - k):blok[1]]
+
+    # --- saran ticker ---
+    def saran(self, kode, n=3):
+        """Ticker yang berawalan kode, lalu yang mirip (salah ketik)"""
+        kode = kode.strip().upper()
+        if not kode:
+            return []
+        # ticker urut, jadi semua yang berawalan kode ada di satu rentang
+        lo = np.searchsorted(self.tickers, kode)
+        hi = np.searchsorted(self.tickers, kode + "\uffff")
+        hasil = list(self.tickers[lo:hi][:n])
+        for mirip in difflib.get_close_matches(kode, self._ticker_list, n=n, cutoff=0.5):
+            if len(hasil) >= n:
+                break
+            if mirip not in hasil:
+                hasil.append(mirip)
+        return hasil
@@ -1,91 +1,160 @@
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-from tabulate import tabulate
-from sqlalchemy import create_engine, MetaData, Table, insert, delete
+import numpy as np
 from dotenv import load_dotenv
 import os
+from datetime import date
 
-from rich.console import Console
-from rich.table import Table
-from rich.text import Text
-from numerize import numerize
+from data_loader import muat_tabel
+from snapshot_cache import invalidasi_snapshot, muat_dengan_cache
+from data_store import DataStore
+from analytics_context import AnalyticsContext, konteks_untuk
+from lookup_index import IndeksSaham
 
-console = Console()
 # --- Load environment ---
 load_dotenv()
 
-console = Console()
+# matplotlib/seaborn/rich baru di-import saat grafik atau tabel pertama kali
+# dibutuhkan, supaya start (menu maupun batch) tidak ikut menanggung biayanya.
+# Begitu juga sqlalchemy dan modul fitur (chart_pack, rollup, metrik_risiko,
+# backtest, import CSV): di-import di dalam fungsi yang memakainya.
+_console = None
+
+
+def get_console():
+    """rich Console bersama, dibuat saat tabel pertama kali ditampilkan"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 # ===============================
 # 1. DATABASE UTILITIES
 # ===============================
 
-def buat_koneksi():
-    """Membuat koneksi ke database MySQL menggunakan SQLAlchemy"""
+def buat_koneksi(url=None):
+    """Membuat koneksi ke database MySQL menggunakan SQLAlchemy (url: override, mis. sqlite)"""
+    from sqlalchemy import create_engine
+
     try:
         user = os.getenv('DB_USER')
         password = os.getenv('DB_PASSWORD')
         host = 'localhost'
         db_name = 'data_saham'
 
-        engine = create_engine(f"mysql+mysqlconnector://{user}:{password}@{host}/{db_name}")
+        engine = create_engine(url or f"mysql+mysqlconnector://{user}:{password}@{host}/{db_name}")
         print("Koneksi ke database berhasil ✅")
         return engine
     except Exception as e:
         print(f"Terjadi error: '{e}'")
         return None
 
+# kolom yang diformat jadi K/M/B/T
+KOLOM_NUMERIZE = ["volume", "market_cap", "vol", "final_value", "current_mcap", "target_mcap"]
+NUMERIZE_UNITS = [(1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")]
+
+
+def numerize_kolom(values):
+    """Versi per-kolom dari numerize.numerize (1.500.000 -> '1.5M')"""
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+    absolute = np.abs(values)
+
+    scale = np.ones_like(absolute)
+    suffix = np.full(absolute.shape, "", dtype=object)
+    for unit, label in reversed(NUMERIZE_UNITS):
+        mask = absolute >= unit
+        scale[mask] = unit
+        suffix[mask] = label
+
+    # di atas 1000T numerize menampilkan angka aslinya
+    raw = absolute >= 1e15
+    scale[raw] = 1
+    suffix[raw] = ""
+
+    scaled = np.round(values / scale, 2)
+    return [
+        str(v) if np.isnan(v) else f"{v:.2f}".rstrip("0").rstrip(".") + s
+        for v, s in zip(np.where(raw, values, scaled), suffix)
+    ]
+
+
+def format_kolom(series):
+    """Format satu kolom sekaligus, aturannya dipilih dari nama kolom"""
+    col = str(series.name).lower()
+
+    # === Format angka besar jadi K/M/B/T ===
+    if col in KOLOM_NUMERIZE:
+        return numerize_kolom(series)
+
+    # === Format persen growth/upside ===
+    if "%" in col:
+        from rich.text import Text
+        nums = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64")
+        styles = np.select([nums > 0, nums < 0], ["bold green", "bold red"], default="white")
+        return [
+            Text(str(raw), style="white") if np.isnan(num) else Text(f"{num:.2f}%", style=style)
+            for raw, num, style in zip(series, nums, styles)
+        ]
+
+    # === Format angka biasa ===
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return [str(v) if pd.isna(v) else f"{v:,}" for v in series.tolist()]
+
+    return series.astype(str).tolist()
+
+
+def _render_halaman(df, title):
+    """Membuat rich Table hanya untuk baris yang sedang tampil"""
+    from rich.table import Table as RichTable
+
+    table = RichTable(show_header=True, header_style="bold cyan", title=title)
+    for col in df.columns:
+        table.add_column(str(col))
+
+    columns = [format_kolom(df[col]) for col in df.columns]
+    for row in zip(*columns):
+        table.add_row(*row)   # <-- Text objects tetap dipertahankan
+    return table
+
+
 # membuat tampilan dataframe jadi lebih mudah dibaca 
-def tampilkan_tabel(df, title="DATA", use_rich=True):
-    """Universal beautifier for any DataFrame"""
+def tampilkan_tabel(df, title="DATA", use_rich=True, page_size=None):
+    """
+    Universal beautifier for any DataFrame.
+
+    page_size: kalau diisi, data ditampilkan per halaman dengan navigasi
+    [N]ext / [P]rev / [Q]uit, jadi hanya baris di layar yang diformat.
+    """
     if df is None or df.empty:
         print(f"\n⚠️ {title} kosong / tidak ada data.")
         return
 
     print(f"\n=== {title.upper()} ===")
 
-    if use_rich:
-        table = Table(show_header=True, header_style="bold cyan")
-        for col in df.columns:
-            table.add_column(str(col))
-
-        for _, row in df.iterrows():
-            formatted_row = []
-            for col in df.columns:
-                val = row[col]
-
-                # === Format angka besar jadi K/M/B/T ===
-                if col.lower() in ["volume", "market_cap", "vol", "final_value", "current_mcap", "target_mcap"]:
-                    val = numerize.numerize(val)
-
-                # === Format persen growth/upside ===
-                elif "%" in col.lower():
-                    try:
-                        num = float(val)
-                        if num > 0:
-                            val = Text(f"{num:.2f}%", style="bold green")
-                        elif num < 0:
-                            val = Text(f"{num:.2f}%", style="bold red")
-                        else:
-                            val = Text(f"{num:.2f}%", style="white")
-                    except:
-                        val = Text(str(val), style="white")
-
-                # === Format angka biasa ===
-                elif isinstance(val, (int, float)):
-                    val = f"{val:,}"
-
-                else:
-                    val = str(val)
-
-                formatted_row.append(val)   # <-- keep Text objects here!
+    if not use_rich:
+        print(df)
+        return
 
-            table.add_row(*formatted_row)
+    if page_size is None or len(df) <= page_size:
+        get_console().print(_render_halaman(df, None))
+        return
 
-        console.print(table)
-    else:
-        print(df)
+    total_pages = (len(df) + page_size - 1) // page_size
+    page = 0
+    while True:
+        start = page * page_size
+        page_df = df.iloc[start:start + page_size]
+        get_console().print(_render_halaman(
+            page_df, f"Halaman {page + 1}/{total_pages} (baris {start + 1}-{start + len(page_df)} dari {len(df)})"
+        ))
+
+        nav = input("[N]ext / [P]rev / [Q]uit ? ").strip().upper()
+        if nav == "N" and page < total_pages - 1:
+            page += 1
+        elif nav == "P" and page > 0:
+            page -= 1
+        elif nav == "Q":
+            break
 
 
 # menampilkan dataframe 
@@ -102,9 +171,28 @@ def tampilkan_dataframe(koneksi, nama_tabel, limit=None):
         return None
 
 
+def _invalidasi_aman(nama_tabel):
+    """Buang snapshot setelah commit; kegagalannya tidak membatalkan perubahan di database"""
+    try:
+        invalidasi_snapshot(nama_tabel)
+    except Exception as e:
+        print(f"⚠️ Snapshot {nama_tabel} gagal ditandai usang: {e}")
+
+
+def _perbarui_sektor_aman(engine):
+    """Segarkan rollup_sektor setelah kumpulan_saham berubah; gagal = peringatan saja"""
+    from rollup import perbarui_sektor_engine
+    try:
+        perbarui_sektor_engine(engine)
+    except Exception as e:
+        print(f"⚠️ Rollup sektor gagal diperbarui: {e}")
+
+
 # --- FUNGSI TAMBAH SAHAM ---
 def tambah_saham(koneksi):
     """Menambahkan data Saham baru menggunakan SQLAlchemy Core"""
+    from sqlalchemy import MetaData, Table, insert
+
     print("\n=== TAMBAH SAHAM BARU ===")
     try:
         # Input data dari user
@@ -120,7 +208,8 @@ def tambah_saham(koneksi):
         saham_table = Table('kumpulan_saham', metadata, autoload_with=koneksi)
 
         stmt = insert(saham_table).values(
-            Tanggal=tanggal,
+            # objek date: diterima semua driver (SQLite menolak string untuk kolom DATE)
+            Tanggal=date.fromisoformat(tanggal),
             Nama_Saham=nama,
             Sektor=sektor,
             Kepemilikan=kepemilikan,
@@ -133,18 +222,39 @@ def tambah_saham(koneksi):
             result = conn.execute(stmt)
             conn.commit()
 
-        print(f"Saham '{nama}' berhasil ditambahkan! ✅")
-        print(f"ID Saham Baru: {result.inserted_primary_key[0]}")
-
     except ValueError:
-        print("Error: Harga, Volume, dan Marketcap harus berupa angka")
+        print("Error: Tanggal harus YYYY-MM-DD; Harga, Volume, dan Marketcap harus berupa angka")
+        return
     except Exception as e:
         print(f"Terjadi error database: {e}")
+        return
+
+    # INSERT sudah commit: gagal membuang snapshot / menyegarkan rollup cukup jadi peringatan
+    _invalidasi_aman("kumpulan_saham")
+    # sektor saham baru ikut menentukan rollup per sektor
+    _perbarui_sektor_aman(koneksi)
+
+    print(f"Saham '{nama}' berhasil ditambahkan! ✅")
+    print(f"ID Saham Baru: {result.inserted_primary_key[0]}")
+
+    # baris baru dikembalikan supaya data di memori bisa di-update tanpa reload
+    return {
+        "id": result.inserted_primary_key[0],
+        "Tanggal": tanggal,
+        "Nama_Saham": nama,
+        "Sektor": sektor,
+        "Kepemilikan": kepemilikan,
+        "Harga": harga,
+        "Volume": volume,
+        "Market_Cap": mcap,
+    }
 
 #  --- FUNGSI DELETE SAHAM ---
 
 def hapus_saham(koneksi):
     """Menghapus data saham dari tabel berdasarkan Nama_Saham"""
+    from sqlalchemy import MetaData, Table, delete
+
     print("\n=== HAPUS SAHAM ===")
     try:
         nama = input("Masukkan nama saham yang ingin dihapus: ")
@@ -158,13 +268,18 @@ def hapus_saham(koneksi):
             result = conn.execute(stmt)
             conn.commit()
 
-        if result.rowcount > 0:
-            print(f"Saham '{nama}' berhasil dihapus! ✅")
-        else:
-            print(f"Saham '{nama}' tidak ditemukan di database ❌")
-
     except Exception as e:
         print(f"Terjadi error database: {e}")
+        return
+
+    if result.rowcount == 0:
+        print(f"Saham '{nama}' tidak ditemukan di database ❌")
+        return
+
+    _invalidasi_aman("kumpulan_saham")
+    _perbarui_sektor_aman(koneksi)
+    print(f"Saham '{nama}' berhasil dihapus! ✅")
+    return nama
 
 
 
@@ -172,12 +287,12 @@ def hapus_saham(koneksi):
 # 2. ANALYSIS FUNCTIONS
 # ===============================
 
-# --- PERFORMA OWNER ---
-def owner_performance(histori_df, kumpulan_df):
-    histori_df['Tanggal'] = pd.to_datetime(histori_df['Tanggal'])
+# --- HARGA AWAL & AKHIR PER SAHAM (versi pandas) ---
+def harga_awal_akhir(histori_df):
+    # Tanggal di-parse di salinan, frame milik pemanggil tidak diubah
+    histori_df = histori_df.assign(Tanggal=pd.to_datetime(histori_df['Tanggal']))
 
-    # ambil harga awal & akhir per saham (kalau datanya ada)
-    price_summary = (
+    return (
         histori_df.sort_values("Tanggal")
         .groupby("Nama_Saham")
         .agg(
@@ -187,6 +302,16 @@ def owner_performance(histori_df, kumpulan_df):
         .reset_index()
     )
 
+# --- PERFORMA OWNER ---
+def owner_performance(histori_df, kumpulan_df, price_summary=None, ctx=None):
+    """
+    price_summary: hasil harga_awal_akhir_sql (SQL pushdown). Kalau kosong,
+    harga awal & akhir diambil dari ctx (AnalyticsContext) atau dihitung dari histori_df.
+    """
+    # ambil harga awal & akhir per saham (kalau datanya ada)
+    if price_summary is None:
+        price_summary = ctx.harga_awal_akhir() if ctx is not None else harga_awal_akhir(histori_df)
+
     # join ke kumpulan_df supaya semua saham tetap muncul
     merged = pd.merge(
         kumpulan_df[["Nama_Saham", "Kepemilikan"]],
@@ -211,19 +336,12 @@ def owner_performance(histori_df, kumpulan_df):
     return owner_perf, merged
 
 # --- STOCK GROWTH ---
-def stock_growth(histori_df, kumpulan_df):
-    histori_df['Tanggal'] = pd.to_datetime(histori_df['Tanggal'])
-
+def stock_growth(histori_df, kumpulan_df, price_summary=None, ctx=None):
+    """price_summary / ctx: sama seperti di owner_performance"""
     # hitung harga awal & akhir per saham (kalau datanya ada)
-    growth = (
-        histori_df.sort_values("Tanggal")
-        .groupby("Nama_Saham")
-        .agg(
-            Harga_Awal=("Terakhir", "first"),
-            Harga_Akhir=("Terakhir", "last")
-        )
-        .reset_index()
-    )
+    if price_summary is None:
+        price_summary = ctx.harga_awal_akhir() if ctx is not None else harga_awal_akhir(histori_df)
+    growth = price_summary
 
     # join ke kumpulan_df supaya semua saham tetap muncul
     growth = pd.merge(
@@ -287,21 +405,95 @@ def potensi_upside(kumpulan_df, top_n=None):
 
     return df
 
+# POTENSI UPSIDE PER SEKTOR (VECTORIZED) ---
+def potensi_upside_vectorized(kumpulan_df, top_n=None):
+    """
+    Versi groupby dari potensi_upside: cari top-1 & top-2 Market_Cap per sektor
+    sekali saja, lalu hitung target & upside semua saham dalam satu pass.
+
+    Target tiap saham = saham dengan market cap tertinggi di sektornya selain
+    dirinya sendiri, jadi hasilnya sama dengan potensi_upside.
+    """
+    df = kumpulan_df[["Nama_Saham", "Sektor", "Market_Cap"]].reset_index(drop=True)
+
+    # urutan hasil sama dengan versi loop: per sektor (urutan kemunculan), lalu urutan baris
+    sector_code, _ = pd.factorize(df["Sektor"])
+    df = df.iloc[np.argsort(sector_code, kind="stable")]
+
+    # top-1 per sektor
+    ranked = df.sort_values("Market_Cap", ascending=False, kind="stable")
+    top1 = ranked.groupby("Sektor", sort=False).head(1).set_index("Sektor")
+
+    # top-2 per sektor = market cap tertinggi yang namanya bukan top-1
+    ranked_top1_name = ranked["Sektor"].map(top1["Nama_Saham"])
+    top2 = (
+        ranked[ranked["Nama_Saham"] != ranked_top1_name]
+        .groupby("Sektor", sort=False).head(1)
+        .set_index("Sektor")
+    )
+
+    is_top1 = df["Nama_Saham"] == df["Sektor"].map(top1["Nama_Saham"])
+    target_name = df["Sektor"].map(top1["Nama_Saham"]).where(~is_top1, df["Sektor"].map(top2["Nama_Saham"]))
+    target_cap = df["Sektor"].map(top1["Market_Cap"]).where(~is_top1, df["Sektor"].map(top2["Market_Cap"]))
+
+    # saham tanpa pembanding di sektornya dilewati (sama seperti others.empty)
+    valid = target_name.notna()
+    current_cap = df["Market_Cap"][valid]
+    target_cap = target_cap[valid]
+    if pd.api.types.is_integer_dtype(current_cap):
+        target_cap = target_cap.astype(current_cap.dtype)
+
+    result = pd.DataFrame({
+        'Nama_Saham': df["Nama_Saham"][valid],
+        'Sektor': df["Sektor"][valid],
+        'Current_MCap': current_cap,
+        'Target_Saham': target_name[valid],
+        'Target_MCap': target_cap,
+        'Max_Upside (%)': ((target_cap - current_cap) / current_cap * 100).round(2)
+    }).reset_index(drop=True)
+
+    if result.empty:
+        return result
+
+    # sort berdasarkan upside
+    result = result.sort_values(by="Max_Upside (%)", ascending=False)
+
+    # kalau hanya mau top N positif
+    if top_n is not None:
+        result = result[result["Max_Upside (%)"] > 0]  # ambil yang positif
+        result = result.head(top_n)
+
+    return result
+
 # ===============================
 # 3. VISUALIZATION FUNCTIONS
 # ===============================
 
-def plot_marketcap_by_sector(kumpulan_df):
-    plt.figure(figsize=(10, 6))
-    sector_mcap = kumpulan_df.groupby("Sektor")["Market_Cap"].sum().reset_index()
-    sns.barplot(data=sector_mcap, x="Sektor", y="Market_Cap", palette="Set2")
-    plt.title("📊 Market Cap per Sector", fontsize=14, weight="bold")
-    plt.xticks(rotation=45)
+def plot_marketcap_by_sector(kumpulan_df, engine=None):
+    """engine: kalau diisi, total market cap per sektor dihitung di database"""
+    import matplotlib.pyplot as plt
+    from chart_pack import gambar_marketcap_sektor
+    from rollup import marketcap_sektor_sql
+
+    sector_mcap = None
+    if engine is not None:
+        try:
+            sector_mcap = marketcap_sektor_sql(engine)
+        except Exception as e:
+            print(f"⚠️ Query market cap di database gagal ({e}), dihitung dari data lokal.")
+    if sector_mcap is None:
+        sector_mcap = kumpulan_df.groupby("Sektor")["Market_Cap"].sum().reset_index()
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    gambar_marketcap_sektor(ax, sector_mcap)
     plt.tight_layout()
     plt.show()
 
 
 def plot_volume_vs_marketcap(histori_df, kumpulan_df):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     avg_volume = histori_df.groupby("Nama_Saham")["Vol"].mean().reset_index()
     merged = pd.merge(kumpulan_df, avg_volume, on="Nama_Saham")
 
@@ -318,14 +510,19 @@ def plot_volume_vs_marketcap(histori_df, kumpulan_df):
     plt.show()
 
 
-def plot_price_trend(histori_df, stock):
-    df = histori_df[histori_df["Nama_Saham"] == stock].sort_values("Tanggal")
-    plt.figure(figsize=(10, 5))
-    plt.plot(df["Tanggal"], df["Terakhir"], marker="o")
-    plt.title(f"📈 Price Trend of {stock} (2Y)", fontsize=14, weight="bold")
-    plt.xlabel("Tanggal")
-    plt.ylabel("Harga Terakhir")
-    plt.grid(True)
+def plot_price_trend(histori_df, stock, ctx=None):
+    """ctx: kalau diisi, garis SMA & pita Bollinger dari ctx.indikator() ikut digambar"""
+    import matplotlib.pyplot as plt
+    from chart_pack import gambar_price_trend
+
+    indikator = None
+    if ctx is not None:
+        df = ctx.saham(stock)
+        indikator = ctx.indikator_saham(stock).filter(regex=r"^(SMA_|BB_Upper|BB_Lower)")
+    else:
+        df = histori_df[histori_df["Nama_Saham"] == stock].sort_values("Tanggal")
+    fig, ax = plt.subplots(figsize=(10, 5))
+    gambar_price_trend(ax, df["Tanggal"], df["Terakhir"], stock, indikator)
     plt.show()
 
 
@@ -337,6 +534,8 @@ def plot_multiple_price_trends(histori_df, stocks):
         histori_df (pd.DataFrame): Historical stock data.
         stocks (list): List of stock names to plot, e.g. ["DEWA", "UNTR", "PTRO"].
     """
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 6))
 
     for stock in stocks:
@@ -354,21 +553,47 @@ def plot_sector_marketcap_pie(df_kumpulan):
     """
     Menunjukkan proporsi market cap antar sektor.
     """
+    import matplotlib.pyplot as plt
+    from chart_pack import gambar_pie_sektor
+
     sector_cap = df_kumpulan.groupby("Sektor")["Market_Cap"].sum()
 
-    plt.figure(figsize=(8, 8))
-    plt.pie(
-        sector_cap,
-        labels=sector_cap.index,
-        autopct="%1.1f%%",
-        startangle=140,
-        pctdistance=0.85
-    )
-    plt.title("🥧 Proporsi Market Cap per Sektor", fontsize=14, weight="bold")
+    fig, ax = plt.subplots(figsize=(8, 8))
+    gambar_pie_sektor(ax, sector_cap)
     plt.show()
 
+def _baca_rollup(baca, engine):
+    """Hasil pembaca rollup, None kalau engine kosong / rollup belum terpasang / gagal"""
+    if engine is None:
+        return None
+    try:
+        return baca(engine)
+    except Exception as e:
+        print(f"⚠️ Rollup di database tidak bisa dibaca ({e}), dihitung dari data lokal.")
+        return None
+
+
+def _returns_panel(histori_df, ctx=None):
+    """
+    ReturnsPanel di atas bar bulanan: lewat ctx kalau ada, kalau tidak histori
+    harian di-resample dulu, supaya heatmap sama dengan/tanpa ctx
+    """
+    ctx = ctx if ctx is not None else AnalyticsContext(histori_df)
+    return ctx.returns_panel()
+
+
 # heatmap return per saham
-def plot_monthly_return_heatmap(histori_df):
+def _pivot_return_saham(histori_df, ctx=None, engine=None):
+    """Rata-rata return bulanan, Nama_Saham x Month (dari rollup database atau ReturnsPanel)"""
+    from rollup import returns_panel_rollup
+    panel = _baca_rollup(returns_panel_rollup, engine)
+    if panel is None:
+        panel = _returns_panel(histori_df, ctx)
+    return panel.mean().T
+
+
+# --- versi per baris (dipertahankan sebagai pembanding paritas) ---
+def _pivot_return_saham_baris(histori_df):
     # make sure date is datetime
     df = histori_df.copy()
     df["Tanggal"] = pd.to_datetime(df["Tanggal"])
@@ -387,18 +612,32 @@ def plot_monthly_return_heatmap(histori_df):
     )
 
     # pivot for heatmap (stocks x months)
-    pivot = monthly_returns.pivot(index="Nama_Saham", columns="Month", values="Return")
+    return monthly_returns.pivot(index="Nama_Saham", columns="Month", values="Return")
+
+
+def plot_monthly_return_heatmap(histori_df, ctx=None, engine=None):
+    import matplotlib.pyplot as plt
+    from chart_pack import gambar_heatmap
 
-    plt.figure(figsize=(14, 8))
-    sns.heatmap(pivot, cmap="RdYlGn", center=0, annot=False, cbar_kws={"label": "Return"})
-    plt.title("🔥 Monthly Return Heatmap per Stock", fontsize=16, weight="bold")
-    plt.xlabel("Month")
-    plt.ylabel("Stock")
+    pivot = _pivot_return_saham(histori_df, ctx, engine)
+
+    fig, ax = plt.subplots(figsize=(14, 8))
+    gambar_heatmap(ax, pivot, "🔥 Monthly Return Heatmap per Stock", "Stock")
     plt.tight_layout()
     plt.show()
 
 # heatmap return per sektor 
-def plot_sector_monthly_return_heatmap(histori_df, kumpulan_df):
+def _pivot_return_sektor(histori_df, kumpulan_df, ctx=None, engine=None):
+    """Rata-rata return bulanan, Sektor x Month (rollup_sektor, atau reduksi ticker -> sektor di ReturnsPanel)"""
+    from rollup import return_sektor_rollup
+    pivot = _baca_rollup(return_sektor_rollup, engine)
+    if pivot is not None:
+        return pivot.T
+    return _returns_panel(histori_df, ctx).sektor(kumpulan_df).T
+
+
+# --- versi per baris (dipertahankan sebagai pembanding paritas) ---
+def _pivot_return_sektor_baris(histori_df, kumpulan_df):
     # copy data
     df = histori_df.copy()
     df["Tanggal"] = pd.to_datetime(df["Tanggal"])
@@ -421,20 +660,18 @@ def plot_sector_monthly_return_heatmap(histori_df, kumpulan_df):
     )
 
     # pivot untuk heatmap (Sektor x Month)
-    pivot = monthly_sector_returns.pivot(index="Sektor", columns="Month", values="Return")
+    return monthly_sector_returns.pivot(index="Sektor", columns="Month", values="Return")
+
+
+def plot_sector_monthly_return_heatmap(histori_df, kumpulan_df, ctx=None, engine=None):
+    import matplotlib.pyplot as plt
+    from chart_pack import gambar_heatmap
+
+    pivot = _pivot_return_sektor(histori_df, kumpulan_df, ctx, engine)
 
     # plot heatmap
-    plt.figure(figsize=(14, 8))
-    sns.heatmap(
-        pivot,
-        cmap="RdYlGn",
-        center=0,
-        annot=False,
-        cbar_kws={"label": "Return"}
-    )
-    plt.title("🔥 Monthly Return Heatmap per Sector", fontsize=16, weight="bold")
-    plt.xlabel("Month")
-    plt.ylabel("Sector")
+    fig, ax = plt.subplots(figsize=(14, 8))
+    gambar_heatmap(ax, pivot, "🔥 Monthly Return Heatmap per Sector", "Sector")
     plt.tight_layout()
     plt.show()
 
@@ -442,10 +679,8 @@ def plot_sector_monthly_return_heatmap(histori_df, kumpulan_df):
 #4. SIMULASI TRADING
 #===============================
 
-import matplotlib.ticker as ticker
-
-# --- SIMULASI ALL SAHAM ---
-def simulate_investment(histori_df, month, year, initial_money, target_date=None, show_plot=True):
+# --- SIMULASI ALL SAHAM (versi loop) ---
+def _simulate_investment_loop(histori_df, month, year, initial_money, target_date=None):
     results = []
 
     # Pastikan Tanggal jadi datetime
@@ -488,14 +723,50 @@ def simulate_investment(histori_df, month, year, initial_money, target_date=None
             "Return (%)": round(profit_pct, 2)
         })
 
+    return results, target_date
+
+def _jendela_risiko(histori_df, month, year, ctx=None):
+    """(histori, sudah_urut, awal jendela) untuk metrik risiko simulasi"""
+    start = pd.Timestamp(year=year, month=month, day=1)
+    if ctx is not None:
+        return ctx.histori, True, start
+    return histori_df, False, start
+
+# --- SIMULASI ALL SAHAM ---
+def simulate_investment(histori_df, month, year, initial_money, target_date=None, show_plot=True, cube=None, ctx=None):
+    """
+    cube: SimulasiCube yang sudah dibangun dari histori_df. Kalau diisi, hasil
+    diambil dari matriks harga (lookup) tanpa scan ulang histori_df.
+    ctx : AnalyticsContext, cube-nya dipakai (dan di-memo) kalau cube kosong.
+
+    Hasil juga memuat metrik risiko per saham dari awal bulan entry sampai
+    target_date (Volatility, Max Drawdown + tanggalnya, Sharpe, Sortino, Calmar).
+    """
+    if cube is None and ctx is not None:
+        cube = ctx.simulasi_cube()
+
+    if cube is not None:
+        df, target_date = cube.simulate(month, year, initial_money, target_date)
+        results = df.to_dict("records")
+    else:
+        results, target_date = _simulate_investment_loop(histori_df, month, year, initial_money, target_date)
+
     if not results:
         print(f"\n⚠️ Tidak ada data saham untuk {month}/{year}. Coba bulan/tahun lain.")
         return pd.DataFrame()
 
     df = pd.DataFrame(results).sort_values("Return (%)", ascending=False)
 
+    # === Metrik risiko semua saham sekaligus (panel harga, tanpa loop per saham) ===
+    from metrik_risiko import risiko_saham
+    sumber, sudah_urut, start = _jendela_risiko(histori_df, month, year, ctx)
+    df = df.join(risiko_saham(sumber, start, target_date, df["Nama_Saham"], sudah_urut=sudah_urut), on="Nama_Saham")
+
     # === Plot Return (%) & Final Value ===
     if show_plot and not df.empty:
+        import matplotlib.pyplot as plt
+        import matplotlib.ticker as ticker
+
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
         # Left: Return %
@@ -529,42 +800,61 @@ def simulate_investment(histori_df, month, year, initial_money, target_date=None
     return df
 
 # --- SIMULASI PORTO ---
-def simulate_portfolio(histori_df, allocations, month, year, initial_money, target_date=None, show_plot=True):
+def simulate_portfolio(histori_df, allocations, month, year, initial_money, target_date=None, show_plot=True, ctx=None):
     """
     Simulate portfolio investment.
     
     allocations: dict of {stock: weight}, e.g. {"BBRI": 0.4, "BBCA": 0.3, "BUMI": 0.3}
+    ctx: AnalyticsContext; harga entry/target diambil dari cube-nya tanpa scan histori_df.
+
+    Tiap saham diberi metrik risiko (seperti simulate_investment). Ringkasan
+    portofolio (Weight, Final_Value, Return (%), metrik risiko kurva nilainya)
+    ada di df.attrs["portofolio"]; baris_portofolio() menambahkannya sebagai
+    baris "PORTOFOLIO" untuk ditampilkan.
     """
     results = []
-    histori_df = histori_df.copy()
-    histori_df["Tanggal"] = pd.to_datetime(histori_df["Tanggal"])
+    modal = {}
 
-    if target_date is None:
-        target_date = histori_df["Tanggal"].max()
+    if ctx is not None:
+        cube = ctx.simulasi_cube()
+        target_date = cube.max_date if target_date is None else pd.to_datetime(target_date)
+
+        def cari_harga(stock):
+            return cube.harga_entry_exit(stock, month, year, target_date)
     else:
-        target_date = pd.to_datetime(target_date)
+        histori_df = histori_df.copy()
+        histori_df["Tanggal"] = pd.to_datetime(histori_df["Tanggal"])
 
-    # Ambil harga penutupan di target_date
-    target_prices = (
-        histori_df[histori_df["Tanggal"] == target_date]
-        .set_index("Nama_Saham")["Terakhir"]
-    )
+        if target_date is None:
+            target_date = histori_df["Tanggal"].max()
+        else:
+            target_date = pd.to_datetime(target_date)
+
+        # Ambil harga penutupan di target_date
+        target_prices = (
+            histori_df[histori_df["Tanggal"] == target_date]
+            .set_index("Nama_Saham")["Terakhir"]
+        )
+
+        def cari_harga(stock):
+            entry_df = histori_df[
+                (histori_df["Nama_Saham"] == stock) &
+                (histori_df["Tanggal"].dt.month == month) &
+                (histori_df["Tanggal"].dt.year == year)
+            ]
+            if entry_df.empty or stock not in target_prices:
+                return None
+            return entry_df.iloc[0]["Terakhir"], target_prices[stock]
 
     portfolio_final_value = 0
 
     for stock, weight in allocations.items():
-        entry_df = histori_df[
-            (histori_df["Nama_Saham"] == stock) &
-            (histori_df["Tanggal"].dt.month == month) &
-            (histori_df["Tanggal"].dt.year == year)
-        ]
-
-        if entry_df.empty or stock not in target_prices:
+        prices = cari_harga(stock)
+        if prices is None:
             print(f"⚠️ Data {stock} tidak lengkap, dilewati.")
             continue
 
-        entry_price = entry_df.iloc[0]["Terakhir"]
-        target_price = target_prices[stock]
+        entry_price, target_price = prices
 
         invest_amount = initial_money * weight
         shares = invest_amount / entry_price
@@ -572,6 +862,7 @@ def simulate_portfolio(histori_df, allocations, month, year, initial_money, targ
         profit_pct = (final_value - invest_amount) / invest_amount * 100
 
         portfolio_final_value += final_value
+        modal[stock] = invest_amount
 
         results.append({
             "Nama_Saham": stock,
@@ -588,14 +879,24 @@ def simulate_portfolio(histori_df, allocations, month, year, initial_money, targ
 
     df = pd.DataFrame(results)
 
+    # Metrik risiko per saham & kurva nilai portofolio (buy-and-hold saham yang valid)
+    from metrik_risiko import risiko_portofolio, risiko_saham
+    sumber, sudah_urut, start = _jendela_risiko(histori_df, month, year, ctx)
+    df = df.join(risiko_saham(sumber, start, target_date, modal, sudah_urut=sudah_urut), on="Nama_Saham")
+    risiko = risiko_portofolio(sumber, modal, start, target_date, sudah_urut=sudah_urut)
+
     # Tambahkan ringkasan portofolio
     total_return_pct = (portfolio_final_value - initial_money) / initial_money * 100
     print("\n=== RINGKASAN PORTOFOLIO ===")
     print(f"Modal awal : Rp {initial_money:,.0f}".replace(",", "."))
     print(f"Nilai akhir: Rp {portfolio_final_value:,.0f}".replace(",", "."))
     print(f"Total return: {total_return_pct:.2f}%")
+    print(f"Volatilitas: {risiko['Volatility (%)']}% | Max drawdown: {risiko['Max_Drawdown (%)']}% | "
+          f"Sharpe: {risiko['Sharpe']} | Sortino: {risiko['Sortino']} | Calmar: {risiko['Calmar']}")
 
     if show_plot:
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(8, 5))
         plt.bar(df["Nama_Saham"], df["Return (%)"], color="skyblue")
         plt.axhline(0, color="gray", linestyle="--")
@@ -603,51 +904,133 @@ def simulate_portfolio(histori_df, allocations, month, year, initial_money, targ
         plt.ylabel("Return (%)")
         plt.show()
 
+    df.attrs["portofolio"] = {
+        "Weight": f"{sum(modal.values()) / initial_money * 100:.0f}%",
+        "Final_Value": round(portfolio_final_value, 2),
+        "Return (%)": round(total_return_pct, 2),
+        **risiko,
+    }
     return df
 
 
+def baris_portofolio(df):
+    """Hasil simulate_portfolio + baris total "PORTOFOLIO" (untuk tabel / export)"""
+    total = df.attrs.get("portofolio")
+    if total is None:
+        return df
+    return pd.concat([df, pd.DataFrame([{"Nama_Saham": "PORTOFOLIO", **total}])], ignore_index=True)
+
+# --- BACKTEST DCA & REBALANCE ---
+def simulate_dca(histori_df, allocations, month, year, initial_money, monthly_contribution,
+                 rebalance_every=0, target_date=None, show_plot=True, ctx=None):
+    """
+    Backtest setoran bulanan (DCA) + rebalance berkala ke bobot allocations (lihat backtest.py).
+
+    allocations    : {stock: weight} seperti simulate_portfolio, atau
+                     {nama strategi: {stock: weight}} untuk membandingkan beberapa strategi
+    rebalance_every: rebalance tiap n bulan (0 = tidak pernah, 3 = per kuartal)
+
+    Mengembalikan HasilBacktest (equity, modal, holdings(), ledger(), ringkasan()) atau None.
+    """
+    from backtest import backtest
+
+    if not all(isinstance(v, dict) for v in allocations.values()):
+        allocations = {"Portofolio": allocations}
+
+    hasil = backtest(histori_df, allocations, month, year, initial_money, monthly_contribution,
+                     rebalance_every, target_date, ctx=ctx)
+    if hasil is None:
+        print("❌ Backtest tidak bisa dijalankan.")
+        return None
+
+    ringkasan = hasil.ringkasan()
+    print("\n=== RINGKASAN BACKTEST DCA ===")
+    print(f"Periode      : {hasil.tanggal[0].date()} → {hasil.tanggal[-1].date()}")
+    print(f"Total setoran: Rp {hasil.modal.iloc[-1]:,.0f}".replace(",", "."))
+    for nama, row in ringkasan.iterrows():
+        print(f"{nama}: nilai akhir Rp {row['Final_Value']:,.0f}".replace(",", ".")
+              + f" ({row['Return (%)']}%) | Max drawdown {row['Max_Drawdown (%)']}% | Sharpe {row['Sharpe']}")
+
+    if show_plot:
+        import matplotlib.pyplot as plt
+
+        plt.figure(figsize=(10, 5))
+        for nama in hasil.equity.columns:
+            plt.plot(hasil.tanggal, hasil.equity[nama], label=nama)
+        plt.plot(hasil.tanggal, hasil.modal, color="gray", linestyle="--", label="Total setoran")
+        plt.title(f"📈 Backtest DCA {month}/{year} → {hasil.tanggal[-1].date()}")
+        plt.ylabel("Rp")
+        plt.legend()
+        plt.grid(True)
+        plt.show()
+
+    return hasil
+
+
 #===============================
 #5. CARI SAHAM 
 #===============================
 
-def cari_saham(histori_df, stock_code, year=None, month=None):
-    # pastikan tanggal dalam datetime
-    histori_df = histori_df.copy()
-    histori_df["Tanggal"] = pd.to_datetime(histori_df["Tanggal"])
+def saran_saham(indeks, stock_code):
+    """Cetak saran ticker (prefix / salah ketik) kalau kode tidak ditemukan"""
+    saran = indeks.saran(stock_code)
+    if saran:
+        print(f"💡 Mungkin maksud Anda: {', '.join(saran)}")
+
+
+# indikator yang ditampilkan di hasil cari_saham (kalau ada ctx)
+KOLOM_INDIKATOR_CARI = ["SMA_20", "RSI_14", "MACD", "ATR_14"]
+
+
+def _cetak_indikator(ctx, row):
+    """Satu baris ringkasan indikator untuk baris histori `row` (hasil indeks)"""
+    ind = ctx.indikator().loc[row.name]
+    teks = [f"{col.replace('_', ' ')}: {ind[col]:,.2f}" for col in KOLOM_INDIKATOR_CARI
+            if col in ind.index and pd.notna(ind[col])]
+    if teks:
+        print(f"Indikator  : {' | '.join(teks)}")
 
-    # filter saham
-    stock_df = histori_df[histori_df["Nama_Saham"] == stock_code.upper()]
-    if stock_df.empty:
+
+def cari_saham(histori_df, stock_code, year=None, month=None, ctx=None):
+    # indeks (urut per saham & tanggal) dari ctx; tanpa ctx dibangun sekali di sini
+    indeks = ctx.indeks if ctx is not None else IndeksSaham(histori_df)
+    stock_code = stock_code.upper()
+
+    if not indeks.ada(stock_code):
         print(f"⚠️ Saham {stock_code} tidak ditemukan.")
+        saran_saham(indeks, stock_code)
         return None
 
     if year and month:
-        # cari harga berdasarkan tahun & bulan
-        entry = stock_df[
-            (stock_df["Tanggal"].dt.year == year) &
-            (stock_df["Tanggal"].dt.month == month)
-        ]
-        if entry.empty:
+        # cari harga berdasarkan tahun & bulan (binary search di blok saham ini)
+        result = indeks.harga_bulan(stock_code, year, month)
+        if result is None:
             print(f"⚠️ Tidak ada data {stock_code} untuk {month}/{year}.")
             return None
-        result = entry.iloc[0]
         print("\n=== HASIL PENCARIAN SAHAM ===")
         print(f"Saham      : {result['Nama_Saham']}")
         print(f"Tanggal    : {result['Tanggal'].date()}")
         print(f"Harga (Rp) : {result['Terakhir']}")
+        if ctx is not None:
+            _cetak_indikator(ctx, result)
         return result
     else:
         # ambil harga terakhir
-        latest = stock_df.sort_values("Tanggal").iloc[-1]
+        latest = indeks.terbaru(stock_code)
         print("\n=== HARGA TERBARU SAHAM ===")
         print(f"Saham      : {latest['Nama_Saham']}")
         print(f"Tanggal    : {latest['Tanggal'].date()}")
         print(f"Harga (Rp) : {latest['Terakhir']}")
+        if ctx is not None:
+            _cetak_indikator(ctx, latest)
 
         # tampilkan mini history (misal 6 bulan terakhir)
-        history = stock_df.sort_values("Tanggal").tail(6)
+        history = indeks.terakhir(stock_code, 6)[["Tanggal", "Terakhir"]]
+        if ctx is not None:
+            ind = ctx.indikator().loc[history.index]
+            history = history.join(ind[[c for c in KOLOM_INDIKATOR_CARI[:2] if c in ind.columns]].round(2))
         print("\n--- Riwayat 6 bulan terakhir ---")
-        tampilkan_tabel(history[["Tanggal", "Terakhir"]], "Riwayat 6 bulan terakhir")
+        tampilkan_tabel(history, "Riwayat 6 bulan terakhir")
         return latest
 
 
@@ -655,38 +1038,49 @@ def cari_saham(histori_df, stock_code, year=None, month=None):
 #6. IMPORT SAHAM DARI CSV FILE 
 #===============================
 
-from clean_utils import clean_dataframe
-from sqlalchemy import text
+from clean_utils import baca_csv_investing, kode_saham_dari_file
+
+# file CSV di atas ukuran ini di-import per chunk (import_csv_streaming)
+STREAMING_THRESHOLD_MB = 50
 
 # --- IMPORT DATA SAHAM ---
-def import_histori_csv(engine):
+def import_histori_csv(engine, batch_size=None):
+    """batch_size: baris per INSERT (None = bulk_writer.DEFAULT_BATCH_SIZE)"""
+    from sqlalchemy import text
+
+    from batch_import import import_csv_streaming, import_direktori
+    from bulk_writer import DEFAULT_BATCH_SIZE, upsert_histori
+
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
     print("\n=== IMPORT HISTORI SAHAM DARI CSV ===")
-    file_path = input("Masukkan path CSV (contoh: sahamBbca.csv): ")
+    file_path = input("Masukkan path CSV / direktori / glob (contoh: sahamBbca.csv, data/*.csv): ")
+
+    # banyak file sekaligus: satu kebijakan konflik untuk semua, tanpa prompt per file
+    if os.path.isdir(file_path) or any(ch in file_path for ch in "*?["):
+        choice = input("Jika histori sudah ada: [R]eplace / [A]ppend / [S]kip ? ").strip().upper()
+        policy = {"R": "replace", "A": "append", "S": "skip"}.get(choice, "skip")
+        try:
+            report, df_baru = import_direktori(engine, file_path, policy=policy, batch_size=batch_size)
+        except Exception as e:
+            print(f"❌ Gagal import: {e}")
+            return
+        _invalidasi_aman("histori_saham")
+        tampilkan_tabel(report, "Laporan Import", page_size=25)
+        return df_baru, policy == "replace"
 
     if not os.path.exists(file_path):
         print("❌ File tidak ditemukan.")
         return
 
     try:
-        # Baca CSV
-        raw_df = pd.read_csv(file_path)
+        stock_code = kode_saham_dari_file(file_path)
+        streaming = os.path.getsize(file_path) > STREAMING_THRESHOLD_MB * 1024 * 1024
 
-        # --- Perbaiki nama kolom dari Investing.com ---
-        rename_map = {
-            "Vol.": "Vol",
-            "Perubahan%": "PerubahanPercent"
-        }
-        raw_df = raw_df.rename(columns=rename_map)
+        # Baca CSV, perbaiki nama kolom Investing.com & bersihkan dataframe
+        # (file besar dibaca per chunk saat ditulis, bukan sekaligus di sini)
+        df_clean = None if streaming else baca_csv_investing(file_path)
 
-        # Bersihkan dataframe
-        df_clean = clean_dataframe(raw_df)
-
-        # --- Deteksi nama saham dari filename ---
-        base = os.path.basename(file_path)      # contoh: "Data Historis BUMI.csv"
-        name = base.replace(".csv", "")
-        stock_code = name.split()[-1].upper()   # ambil kata terakhir → "BUMI"
-
-        df_clean["Nama_Saham"] = stock_code
+        replace = False
 
         # --- Safety check: apakah saham sudah ada di histori_saham? ---
         with engine.connect() as conn:
@@ -700,23 +1094,29 @@ def import_histori_csv(engine):
             choice = input("Pilih: [R]eplace / [A]ppend / [C]ancel ? ").strip().upper()
 
             if choice == "R":
-                with engine.connect() as conn:
-                    conn.execute(
-                        text("DELETE FROM histori_saham WHERE Nama_Saham = :saham"),
-                        {"saham": stock_code}
-                    )
-                    conn.commit()
-                print(f"🗑 Data lama {stock_code} dihapus. Import ulang...")
+                # data lama yang tidak ada di CSV dihapus di transaksi yang sama dengan upsert
+                replace = True
+                print(f"🗑 Data lama {stock_code} akan diganti. Import ulang...")
 
             elif choice == "C":
                 print("⏹ Import dibatalkan.")
                 return
             else:
-                print("➕ Menambahkan data baru ke histori lama.")
-
-        # Simpan ke database
-        df_clean.to_sql("histori_saham", engine, if_exists="append", index=False)
-        print(f"✅ Data {stock_code} dari {file_path} berhasil di-import ke histori_saham")
+                print("➕ Menambahkan data baru ke histori lama (tanggal yang sama di-update).")
+
+        if streaming:
+            # file besar: per chunk, memori terbatas, bisa dilanjutkan kalau gagal
+            import_csv_streaming(engine, file_path, replace=replace, batch_size=batch_size)
+            _invalidasi_aman("histori_saham")
+            # delta untuk DataStore: cukup histori saham ini saja yang dibaca ulang
+            return muat_tabel(engine, "histori_saham", tickers=[stock_code]), True
+
+        # Simpan ke database: satu transaksi, INSERT multi-baris + upsert
+        stats = upsert_histori(engine, df_clean, replace=replace, batch_size=batch_size)
+        _invalidasi_aman("histori_saham")
+        print(f"✅ Data {stock_code} dari {file_path} berhasil di-import ke histori_saham "
+              f"({stats['rows']} baris, {stats['written']} ditulis, {stats['deleted']} dihapus)")
+        return df_clean, replace
 
     except Exception as e:
         print(f"❌ Gagal import: {e}")
@@ -724,6 +1124,8 @@ def import_histori_csv(engine):
 
 # --- DEL HISTORI SAHAM ---
 def hapus_histori_saham(engine):
+    from sqlalchemy import text
+
     print("\n=== HAPUS HISTORI SAHAM ===")
     stock_code = input("Masukkan kode saham yang ingin dihapus (contoh: BBCA): ").upper()
 
@@ -733,10 +1135,15 @@ def hapus_histori_saham(engine):
                 text("DELETE FROM histori_saham WHERE Nama_Saham = :saham"),
                 {"saham": stock_code}
             )
+            # rollup saham ini ikut dibuang di transaksi yang sama
+            from rollup import perbarui_rollup
+            perbarui_rollup(conn, {stock_code: None})
             conn.commit()
 
         if result.rowcount > 0:
+            _invalidasi_aman("histori_saham")
             print(f"✅ Data histori saham '{stock_code}' berhasil dihapus ({result.rowcount} baris).")
+            return stock_code
         else:
             print(f"⚠️ Tidak ada data histori untuk '{stock_code}' ditemukan.")
 
@@ -748,20 +1155,40 @@ def hapus_histori_saham(engine):
 #7. MAIN MENU
 #===============================
 
+def muat_data(engine):
+    """(df_kumpulan, df_histori) untuk menu & mode batch, None kalau gagal dimuat"""
+    # Ambil data awal (dari snapshot lokal kalau masih segar, kalau tidak streaming dari DB)
+    df_kumpulan = muat_dengan_cache(engine, "kumpulan_saham")
+    df_histori = muat_dengan_cache(engine, "histori_saham")
+    if df_kumpulan is None or df_histori is None:
+        print("❌ Data saham tidak bisa dimuat dari database maupun snapshot.")
+        return None
+
+    # bug fix untuk clean histori_saham nama saham yang ada space nya 3
+    df_kumpulan["Nama_Saham"] = df_kumpulan["Nama_Saham"].str.strip()
+    df_histori["Nama_Saham"]  = df_histori["Nama_Saham"].str.strip()
+    return df_kumpulan, df_histori
+
+
 def main():
     engine = buat_koneksi()
     if not engine:
         return
 
-    # Ambil data awal
-    df_kumpulan = tampilkan_dataframe(engine, "kumpulan_saham", limit=1000)
-    df_histori = tampilkan_dataframe(engine, "histori_saham", limit=10000)
+    data = muat_data(engine)
+    if data is None:
+        return
+    df_kumpulan, df_histori = data
 
-    # bug fix untuk clean histori_saham nama saham yang ada space nya 3
-    df_kumpulan["Nama_Saham"] = df_kumpulan["Nama_Saham"].str.strip()
-    df_histori["Nama_Saham"]  = df_histori["Nama_Saham"].str.strip()
+    # semua penulisan diterapkan sebagai delta ke store, bukan reload tabel
+    store = DataStore(df_kumpulan, df_histori)
+    ctx = None
 
     while True:
+        df_kumpulan, df_histori = store.kumpulan, store.histori
+        # histori yang sudah di-parse/sort dipakai ulang selama versi store belum berubah
+        ctx = konteks_untuk(store, ctx)
+
         print("\n=== MENU UTAMA ===")
         print("1. Tampilkan data saham")
         print("2. Tambah saham baru di kumpulan_saham")
@@ -773,31 +1200,47 @@ def main():
         print("8. Cari Saham")
         print("9. Import CSV ke histori_saham")
         print("10. Hapus histori_saham")
-        print("11. Keluar")
+        print("11. Backtest DCA & Rebalance")
+        print("12. Keluar")
 
-        pilihan = input("Masukkan pilihan Anda (1-11): ")
+        pilihan = input("Masukkan pilihan Anda (1-12): ")
 
         if pilihan == "1":
-            tampilkan_tabel(tampilkan_dataframe(engine, "kumpulan_saham", 100), "Kumpulan Saham")
-            tampilkan_tabel(tampilkan_dataframe(engine, "histori_saham", 1000), "Histori Saham")
+            tampilkan_tabel(tampilkan_dataframe(engine, "kumpulan_saham", 100), "Kumpulan Saham", page_size=25)
+            tampilkan_tabel(tampilkan_dataframe(engine, "histori_saham", 1000), "Histori Saham", page_size=25)
 
         elif pilihan == "2":
-            tambah_saham(engine)
+            row = tambah_saham(engine)
+            if row:
+                store.tambah_kumpulan(row)
         
         elif pilihan == "3":
-            hapus_saham(engine)
+            nama = hapus_saham(engine)
+            if nama:
+                store.hapus_kumpulan(nama)
 
         elif pilihan == "4":
-            owner_perf, merged_detail = owner_performance(df_histori, df_kumpulan)
+            # harga awal & akhir dari rollup tahunan, lalu SQL pushdown, terakhir pandas
+            from rollup import harga_awal_akhir_rollup
+            from sql_analytics import harga_awal_akhir_sql
+            price_summary = _baca_rollup(harga_awal_akhir_rollup, engine)
+            if price_summary is None:
+                try:
+                    price_summary = harga_awal_akhir_sql(engine)
+                except Exception as e:
+                    print(f"⚠️ Query harga di database gagal ({e}), dihitung dari data lokal.")
+                    price_summary = ctx.harga_awal_akhir()
+
+            owner_perf, merged_detail = owner_performance(df_histori, df_kumpulan, price_summary)
             tampilkan_tabel(owner_perf, "Owner Performance")
 
-            growth_df = stock_growth(df_histori, df_kumpulan)
+            growth_df = stock_growth(df_histori, df_kumpulan, price_summary)
             tampilkan_tabel(growth_df, "Stock Growth (2Y)")
 
-            upside_df = potensi_upside(df_kumpulan)   # versi lengkap
+            upside_df = potensi_upside_vectorized(df_kumpulan)   # versi lengkap
             tampilkan_tabel(upside_df, "Potensi Upside (per sektor)")
 
-            top_upside_df = potensi_upside(df_kumpulan, top_n=5)   # hanya top 5 positif
+            top_upside_df = potensi_upside_vectorized(df_kumpulan, top_n=5)   # hanya top 5 positif
             tampilkan_tabel(top_upside_df, "Top 5 Potensi Upside")
 
         elif pilihan == "5":
@@ -808,19 +1251,21 @@ def main():
             print("4. Tren harga beberapa saham (pilih kode saham)")
             print("5. Heatmap return per saham")
             print("6. Heatmap return per sektor")
-            sub_pilihan = input("Pilih jenis visualisasi (1-6): ")
+            print("7. Simpan semua grafik ke folder (chart pack)")
+            sub_pilihan = input("Pilih jenis visualisasi (1-7): ")
 
             if sub_pilihan == "1":
-                plot_marketcap_by_sector(df_kumpulan)
+                plot_marketcap_by_sector(df_kumpulan, engine)
                 plot_sector_marketcap_pie(df_kumpulan)
             elif sub_pilihan == "2":
                 plot_volume_vs_marketcap(df_histori, df_kumpulan)
             elif sub_pilihan == "3":
                 stock_code = input("Masukkan kode saham (contoh: BRMS): ").upper()
-                if stock_code in df_histori["Nama_Saham"].unique():
-                    plot_price_trend(df_histori, stock_code)
+                if ctx.indeks.ada(stock_code):
+                    plot_price_trend(df_histori, stock_code, ctx=ctx)
                 else:
                     print(f"Saham {stock_code} tidak ditemukan.")
+                    saran_saham(ctx.indeks, stock_code)
             elif sub_pilihan == "4":
                 stock_codes = input(
             "Masukkan kode saham (pisahkan dengan koma, contoh: DEWA, UNTR, PTRO): "
@@ -828,27 +1273,42 @@ def main():
                 stock_codes = [s.strip() for s in stock_codes]  # hapus spasi ekstra
 
              # validasi apakah semua saham ada di data
-                valid_stocks = [s for s in stock_codes if s in df_histori["Nama_Saham"].unique()]
+                valid_stocks = [s for s in stock_codes if ctx.indeks.ada(s)]
+                for s in stock_codes:
+                    if s not in valid_stocks:
+                        print(f"Saham {s} tidak ditemukan.")
+                        saran_saham(ctx.indeks, s)
                 if valid_stocks:
                     plot_multiple_price_trends(df_histori, valid_stocks)
                 else:
                     print("Tidak ada saham valid ditemukan dalam input.")
             elif sub_pilihan == "5":
-                plot_monthly_return_heatmap(df_histori)
+                plot_monthly_return_heatmap(df_histori, ctx=ctx, engine=engine)
 
             elif sub_pilihan == "6":
-                plot_sector_monthly_return_heatmap(df_histori, df_kumpulan)
+                plot_sector_monthly_return_heatmap(df_histori, df_kumpulan, ctx=ctx, engine=engine)
+            elif sub_pilihan == "7":
+                out_dir = input("Folder output (enter = charts): ").strip() or "charts"
+                fmt = input("Format [png/svg] (enter = png): ").strip().lower() or "png"
+                try:
+                    from chart_pack import render_chart_pack
+                    report = render_chart_pack(df_histori, df_kumpulan, out_dir, fmt=fmt, ctx=ctx)
+                    tampilkan_tabel(report, "Chart Pack", page_size=25)
+                except Exception as e:
+                    print(f"❌ Gagal membuat chart pack: {e}")
             else:
                 print("Pilihan tidak valid.")
 
         elif pilihan == "6":
+            # matriks harga dibangun sekali, tiap simulasi berikutnya cukup lookup
+            cube = ctx.simulasi_cube()
             while True:
                 print("\n=== SIMULASI INVESTASI ===")
                 month = int(input("Masukkan bulan entry (1-12): "))
                 year = int(input("Masukkan tahun entry (contoh: 2023): "))
                 money = float(input("Masukkan jumlah uang yang diinvestasikan (Rp): "))
 
-                result_df = simulate_investment(df_histori, month, year, money, show_plot=True)
+                result_df = simulate_investment(df_histori, month, year, money, show_plot=True, cube=cube, ctx=ctx)
                 tampilkan_tabel(result_df, "Hasil Simulasi")
 
                 ulang = input("\nCoba simulasi lagi? (y/n): ").lower()
@@ -867,8 +1327,8 @@ def main():
                 allocations = {part.split("=")[0].strip().upper(): float(part.split("=")[1])
                             for part in alloc_input.split(",")}
 
-                result_df = simulate_portfolio(df_histori, allocations, month, year, money, show_plot=True)
-                tampilkan_tabel(result_df, "Hasil Simulasi Portofolio")
+                result_df = simulate_portfolio(df_histori, allocations, month, year, money, show_plot=True, ctx=ctx)
+                tampilkan_tabel(baris_portofolio(result_df), "Hasil Simulasi Portofolio")
                 
                 ulang = input("\nCoba simulasi lagi? (y/n): ").lower()
                 if ulang != "y":
@@ -883,23 +1343,54 @@ def main():
             year = int(year_input) if year_input.strip() else None
             month = int(month_input) if month_input.strip() else None
 
-            cari_saham(df_histori, stock_code, year, month)
+            cari_saham(df_histori, stock_code, year, month, ctx=ctx)
        
         elif pilihan == "9":
-            import_histori_csv(engine)
+            hasil = import_histori_csv(engine)
+            if hasil:
+                df_baru, replace = hasil
+                store.tambah_histori(df_baru, replace=replace)
 
         elif pilihan == "10":
-            hapus_histori_saham(engine)
+            stock_code = hapus_histori_saham(engine)
+            if stock_code:
+                store.hapus_histori(stock_code)
 
         elif pilihan == "11":
+            print("\n=== BACKTEST DCA & REBALANCE ===")
+            month = int(input("Masukkan bulan mulai (1-12): "))
+            year = int(input("Masukkan tahun mulai (contoh: 2023): "))
+            money = float(input("Masukkan modal awal (Rp, 0 jika tidak ada): ") or 0)
+            setoran = float(input("Masukkan setoran per bulan (Rp): ") or 0)
+            rebalance = int(input("Rebalance tiap berapa bulan (contoh: 3, enter = tidak pernah): ") or 0)
+
+            print("Masukkan alokasi saham (contoh: BBRI=0.4, BBCA=0.3, DEWA=0.3)")
+            alloc_input = input("Alokasi: ")
+            allocations = {part.split("=")[0].strip().upper(): float(part.split("=")[1])
+                           for part in alloc_input.split(",")}
+
+            hasil = simulate_dca(df_histori, allocations, month, year, money, setoran, rebalance,
+                                 show_plot=True, ctx=ctx)
+            if hasil is not None:
+                tampilkan_tabel(hasil.equity.join(hasil.modal).reset_index(), "Equity Curve", page_size=25)
+                tampilkan_tabel(hasil.holdings("Portofolio").reset_index(), "Kepemilikan (lembar)", page_size=25)
+                tampilkan_tabel(hasil.ledger(), "Ledger Transaksi", page_size=25)
+
+        elif pilihan == "12":
             print("Terima kasih, program dihentikan.")
             break
         else:
-            print("Pilihan tidak valid. Silakan masukkan 1-11.")
+            print("Pilihan tidak valid. Silakan masukkan 1-12.")
 
     engine.dispose()
 
 
 if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        # mode batch: python main.py <analisa ...> [opsi], tanpa menu & tanpa grafik
+        from cli import jalankan
+        sys.exit(jalankan(sys.argv[1:]))
     main()
 
@@ -0,0 +1,208 @@
+"""
+Metrik risiko path-dependent untuk semua ticker sekaligus.
+
+Histori di jendela [start, end] disusun menjadi panel baris-ke-k x ticker
+(PanelSaham, sama seperti indikator.py): kolom j berisi deret harga ticker j,
+sisa barisnya NaN. Semua metrik dihitung dengan operasi array di sepanjang
+axis 0 (return antar bar, running max, argmin), tanpa loop per ticker.
+
+  Volatility (%)   : std return per bar (ddof=1) x sqrt(bar per tahun)
+  Max_Drawdown (%) : min(harga / running max - 1), plus tanggal puncak & lembah
+  Sharpe           : (rata-rata return - rf) / std, disetahunkan
+  Sortino          : seperti Sharpe, penyebutnya downside deviation (return < rf)
+  Calmar           : CAGR / |max drawdown|
+
+Bar per tahun mengikuti frekuensi histori (harian 252, mingguan 52, bulanan 12).
+"""
+import numpy as np
+import pandas as pd
+
+from indikator import PanelSaham
+from resample_ohlcv import frekuensi_dari_jarak
+
+PER_TAHUN = {"D": 252, "W": 52, "M": 12}
+KOLOM_RISIKO = ["Volatility (%)", "Max_Drawdown (%)", "Peak_Date", "Trough_Date", "Sharpe", "Sortino", "Calmar"]
+
+
+# ===============================
+# METRIK PANEL (baris = waktu, kolom = ticker / kurva)
+# ===============================
+
+def metrik_panel(harga, per_tahun=252, risk_free=0.0):
+    """
+    harga: array 2D (waktu x kolom); NaN boleh di awal/akhir tiap kolom.
+
+    Mengembalikan dict array per kolom: volatility, max_drawdown, pos_puncak,
+    pos_lembah (posisi baris, -1 kalau tidak ada drawdown), sharpe, sortino,
+    calmar. Return & drawdown dalam pecahan (bukan persen).
+    """
+    harga = np.asarray(harga, dtype="float64")
+    rf = risk_free / per_tahun
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = harga[1:] / harga[:-1] - 1
+        valid = ~np.isnan(ret)
+        n = valid.sum(axis=0)
+        r0 = np.where(valid, ret, 0.0)
+        mean = r0.sum(axis=0) / n
+        std = np.sqrt(np.where(valid, (ret - mean) ** 2, 0.0).sum(axis=0) / (n - 1))
+        # baris padding (NaN) tidak ikut: r0 - rf di sana bernilai -rf, bukan 0
+        downside = np.sqrt((np.where(valid, np.minimum(ret - rf, 0.0), 0.0) ** 2).sum(axis=0) / n)
+
+        # drawdown terhadap running max (fmax mengabaikan NaN di awal kolom)
+        puncak = np.fmax.accumulate(harga, axis=0)
+        drawdown = np.nan_to_num(harga / puncak - 1, nan=0.0)
+        baris = np.arange(len(harga))[:, None]
+        pos_puncak_jalan = np.maximum.accumulate(np.where(harga >= puncak, baris, 0), axis=0)
+
+        kolom = np.arange(harga.shape[1])
+        pos_lembah = drawdown.argmin(axis=0)
+        max_drawdown = drawdown[pos_lembah, kolom]
+        pos_puncak = pos_puncak_jalan[pos_lembah, kolom]
+        ada_drawdown = max_drawdown < 0
+
+        ada_harga = ~np.isnan(harga)
+        pos_awal = ada_harga.argmax(axis=0)
+        pos_akhir = len(harga) - 1 - ada_harga[::-1].argmax(axis=0)
+        tahun = n / per_tahun
+        cagr = (harga[pos_akhir, kolom] / harga[pos_awal, kolom]) ** (1 / tahun) - 1
+
+        return {
+            "volatility": std * np.sqrt(per_tahun),
+            "max_drawdown": max_drawdown,
+            "pos_puncak": np.where(ada_drawdown, pos_puncak, -1),
+            "pos_lembah": np.where(ada_drawdown, pos_lembah, -1),
+            "sharpe": (mean - rf) / std * np.sqrt(per_tahun),
+            "sortino": (mean - rf) / downside * np.sqrt(per_tahun),
+            "calmar": np.where(ada_drawdown, cagr / -max_drawdown, np.nan),
+        }
+
+
+def _tabel_metrik(m, tanggal_puncak, tanggal_lembah, index):
+    """dict metrik_panel -> DataFrame KOLOM_RISIKO (persen & rasio dibulatkan 2 desimal)"""
+    def bersih(values):
+        # std 0 / satu bar saja -> inf atau NaN, tampilkan NaN
+        return np.round(np.where(np.isfinite(values), values, np.nan), 2)
+
+    return pd.DataFrame({
+        "Volatility (%)": bersih(m["volatility"] * 100),
+        "Max_Drawdown (%)": bersih(m["max_drawdown"] * 100),
+        "Peak_Date": tanggal_puncak,
+        "Trough_Date": tanggal_lembah,
+        "Sharpe": bersih(m["sharpe"]),
+        "Sortino": bersih(m["sortino"]),
+        "Calmar": bersih(m["calmar"]),
+    }, index=index)
+
+
+def _jendela(histori_df, start, end, tickers, sudah_urut):
+    """Baris histori di [start, end] untuk tickers, urut per (Nama_Saham, Tanggal)"""
+    tanggal = pd.to_datetime(histori_df["Tanggal"])
+    mask = np.ones(len(histori_df), dtype=bool)
+    if start is not None:
+        mask &= (tanggal >= pd.to_datetime(start)).to_numpy()
+    if end is not None:
+        mask &= (tanggal <= pd.to_datetime(end)).to_numpy()
+    if tickers is not None:
+        mask &= histori_df["Nama_Saham"].isin(list(tickers)).to_numpy()
+
+    df = histori_df.loc[mask, ["Nama_Saham", "Tanggal", "Terakhir"]].assign(Tanggal=tanggal[mask])
+    if not sudah_urut:
+        df = df.sort_values(["Nama_Saham", "Tanggal"], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _batas_ticker(df):
+    """Array bool: baris pertama tiap ticker di df (urut per ticker)"""
+    nama = df["Nama_Saham"]
+    return (nama != nama.shift()).to_numpy()
+
+
+def _per_tahun(df, ganti, per_tahun):
+    """Bar per tahun dari median jarak hari antar bar satu ticker (kalau per_tahun kosong)"""
+    if per_tahun:
+        return per_tahun
+    hari = df["Tanggal"].to_numpy(dtype="datetime64[D]").astype("int64")
+    return PER_TAHUN[frekuensi_dari_jarak(np.diff(hari)[~ganti[1:]])]
+
+
+# ===============================
+# PER TICKER & PORTOFOLIO
+# ===============================
+
+def risiko_saham(histori_df, start=None, end=None, tickers=None, per_tahun=None, risk_free=0.0, sudah_urut=False):
+    """
+    Metrik risiko tiap ticker atas harga Terakhir di jendela [start, end].
+
+    per_tahun : bar per tahun untuk annualisasi (None = dari frekuensi histori)
+    risk_free : suku bunga bebas risiko per tahun (pecahan, mis. 0.05)
+    sudah_urut: histori_df sudah urut per (Nama_Saham, Tanggal), mis. ctx.histori
+
+    Mengembalikan DataFrame index Nama_Saham, kolom KOLOM_RISIKO.
+    """
+    df = _jendela(histori_df, start, end, tickers, sudah_urut)
+    if df.empty:
+        return pd.DataFrame(columns=KOLOM_RISIKO, index=pd.Index([], name="Nama_Saham"))
+
+    ganti = _batas_ticker(df)
+    starts = np.flatnonzero(ganti)
+    ends = np.r_[starts[1:], len(df)]
+    peta = PanelSaham(starts, ends, len(df))
+
+    m = metrik_panel(peta.panel(df["Terakhir"].to_numpy(dtype="float64")).to_numpy(),
+                     _per_tahun(df, ganti, per_tahun), risk_free)
+
+    # posisi dalam ticker -> baris df -> tanggal
+    tanggal = df["Tanggal"].to_numpy()
+    ada = m["pos_lembah"] >= 0
+    puncak = np.where(ada, tanggal[starts + np.maximum(m["pos_puncak"], 0)], np.datetime64("NaT"))
+    lembah = np.where(ada, tanggal[starts + np.maximum(m["pos_lembah"], 0)], np.datetime64("NaT"))
+    return _tabel_metrik(m, puncak, lembah, pd.Index(df["Nama_Saham"].iloc[starts], name="Nama_Saham"))
+
+
+def _kurva(df, modal):
+    harga = (
+        df.pivot_table(index="Tanggal", columns="Nama_Saham", values="Terakhir", aggfunc="last")
+        .reindex(columns=list(modal))
+    )
+    entry = harga.bfill().iloc[0].to_numpy() if len(harga) else np.full(len(modal), np.nan)
+    uang = np.array(list(modal.values()), dtype="float64")
+
+    nilai = harga.ffill().to_numpy() * (uang / entry)
+    nilai = np.where(np.isnan(nilai), uang, nilai)
+    return pd.Series(nilai.sum(axis=1), index=harga.index, name="Nilai")
+
+
+def kurva_portofolio(histori_df, modal, start=None, end=None, sudah_urut=False):
+    """
+    Nilai portofolio buy-and-hold per tanggal di jendela [start, end].
+
+    modal: dict {saham: uang yang dibelikan}. Tiap saham dibeli di harga pertamanya
+    dalam jendela; sebelum itu porsinya dihitung sebagai kas. Harga yang bolong
+    di suatu tanggal memakai harga terakhir sebelumnya.
+    """
+    return _kurva(_jendela(histori_df, start, end, modal.keys(), sudah_urut), modal)
+
+
+def risiko_portofolio(histori_df, modal, start=None, end=None, per_tahun=None, risk_free=0.0, sudah_urut=False):
+    """Metrik risiko kurva_portofolio(); dict dengan kunci KOLOM_RISIKO"""
+    df = _jendela(histori_df, start, end, modal.keys(), sudah_urut)
+    kurva = _kurva(df, modal)
+    if kurva.empty:
+        return dict.fromkeys(KOLOM_RISIKO, np.nan)
+    return risiko_kurva(kurva.to_frame(), _per_tahun(df, _batas_ticker(df), per_tahun), risk_free).iloc[0].to_dict()
+
+
+def risiko_kurva(kurva, per_tahun=12, risk_free=0.0):
+    """
+    Metrik risiko kurva nilai yang sejajar tanggal (mis. equity curve backtest).
+
+    kurva: DataFrame index Tanggal, satu kolom per kurva. Mengembalikan DataFrame
+    index = kolom kurva, kolom KOLOM_RISIKO.
+    """
+    m = metrik_panel(kurva.to_numpy(dtype="float64"), per_tahun, risk_free)
+    tanggal = kurva.index.to_numpy(dtype="datetime64[ns]")
+    ada = m["pos_lembah"] >= 0
+    puncak = np.where(ada, tanggal[np.maximum(m["pos_puncak"], 0)], np.datetime64("NaT"))
+    lembah = np.where(ada, tanggal[np.maximum(m["pos_lembah"], 0)], np.datetime64("NaT"))
+    return _tabel_metrik(m, puncak, lembah, kurva.columns)
@@ -0,0 +1,283 @@
+"""
+Migrasi skema bertahap (berversi) untuk database saham.
+
+Versi yang sudah dijalankan dicatat di tabel schema_migrasi. Setiap langkah
+juga mengecek dulu apakah index / partisinya sudah ada, jadi aman dijalankan
+ulang (mis. di database yang sebagian sudah dimigrasi manual).
+
+  1. index kumpulan_saham (Nama_Saham)          -> hapus_saham, join per ticker
+  2. index histori_saham (Tanggal, Nama_Saham,  -> "semua ticker di tanggal X"
+     Terakhir), covering                           (simulate_investment)
+  3. partisi RANGE per tahun histori_saham      -> hanya MySQL (SQLite tidak
+                                                   punya partisi, dilewati)
+  4. tabel rollup_histori & rollup_sektor       -> growth & heatmap tanpa
+     (lihat rollup.py), diisi penuh sekali         membaca seluruh histori
+
+Migrasi berulang (tidak berversi, dijalankan setiap kali, no-op kalau tidak
+ada yang perlu diubah):
+
+  - partisi tahun berikutnya: pmax dipecah supaya selalu ada partisi sampai
+    tahun depan (jalankan migrasi ini minimal setahun sekali, mis. via cron)
+
+Jalankan: python migrasi.py [--db-url URL] [--explain]
+"""
+import argparse
+import re
+import sys
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+TABEL_MIGRASI = "schema_migrasi"
+
+INDEKS = {
+    "idx_kumpulan_nama": ("kumpulan_saham", ("Nama_Saham",)),
+    "idx_histori_tanggal": ("histori_saham", ("Tanggal", "Nama_Saham", "Terakhir")),
+}
+
+
+# ===============================
+# LANGKAH MIGRASI
+# ===============================
+
+def _buat_index(conn, nama):
+    tabel, kolom = INDEKS[nama]
+    if nama in {ix["name"] for ix in inspect(conn).get_indexes(tabel)}:
+        return False
+    conn.execute(text(f"CREATE INDEX {nama} ON {tabel} ({', '.join(kolom)})"))
+    return True
+
+
+def _analyze(conn, tabel):
+    """Statistik baru supaya optimizer langsung memakai index yang baru dibuat"""
+    conn.execute(text(f"ANALYZE TABLE {tabel}" if conn.dialect.name == "mysql" else f"ANALYZE {tabel}"))
+
+
+def _m1_index_kumpulan(conn):
+    if _buat_index(conn, "idx_kumpulan_nama"):
+        _analyze(conn, "kumpulan_saham")
+
+
+def _m2_index_histori_tanggal(conn):
+    if _buat_index(conn, "idx_histori_tanggal"):
+        _analyze(conn, "histori_saham")
+
+
+def _daftar_partisi(tahun_list):
+    parts = [f"PARTITION p{t} VALUES LESS THAN ({t + 1})" for t in tahun_list]
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return "(\n    " + ",\n    ".join(parts) + "\n)"
+
+
+def partisi_tahun(tahun_awal, tahun_akhir):
+    """Definisi PARTITION BY RANGE (YEAR(Tanggal)): satu partisi per tahun + pmax"""
+    return "PARTITION BY RANGE (YEAR(Tanggal)) " + _daftar_partisi(range(tahun_awal, tahun_akhir + 1))
+
+
+def pecah_pmax(tahun_list):
+    """REORGANIZE pmax menjadi satu partisi per tahun di tahun_list + pmax baru"""
+    return "REORGANIZE PARTITION pmax INTO " + _daftar_partisi(tahun_list)
+
+
+def partisi_terpasang(conn):
+    """Nama partisi histori_saham urut posisi (kosong kalau belum dipartisi)"""
+    return list(conn.execute(text(
+        "SELECT partition_name FROM information_schema.partitions "
+        "WHERE table_schema = DATABASE() AND table_name = 'histori_saham' AND partition_name IS NOT NULL "
+        "ORDER BY partition_ordinal_position"
+    )).scalars())
+
+
+def _m3_partisi_histori(conn):
+    if conn.dialect.name != "mysql":
+        print(f"⚠️ Partisi per tahun dilewati: tidak didukung {conn.dialect.name}")
+        return
+    if partisi_terpasang(conn):
+        return
+    # primary key (Nama_Saham, Tanggal) sudah memuat kolom partisi, syarat MySQL terpenuhi
+    tahun_awal = conn.execute(text("SELECT MIN(YEAR(Tanggal)) FROM histori_saham")).scalar()
+    tahun_akhir = date.today().year + 1
+    conn.execute(text(f"ALTER TABLE histori_saham {partisi_tahun(tahun_awal or tahun_akhir - 1, tahun_akhir)}"))
+
+
+def _m4_rollup(conn):
+    import rollup
+
+    # diisi ulang dari awal, jadi aman kalau tabelnya sudah ada sebagian
+    rollup.buat_tabel(conn)
+    rollup.bangun_ulang(conn)
+
+
+MIGRASI = [
+    (1, "index kumpulan_saham Nama_Saham", _m1_index_kumpulan),
+    (2, "index covering histori_saham Tanggal", _m2_index_histori_tanggal),
+    (3, "partisi histori_saham per tahun", _m3_partisi_histori),
+    (4, "tabel rollup histori & sektor", _m4_rollup),
+]
+
+
+def tambah_partisi_tahun(conn, tahun_akhir=None):
+    """
+    Pecah pmax supaya ada partisi per tahun sampai tahun_akhir (default tahun
+    depan); tanpa ini tahun-tahun setelah migrasi 3 menumpuk di pmax.
+    Mengembalikan list tahun yang partisinya baru dibuat.
+    """
+    if conn.dialect.name != "mysql":
+        return []
+    nama = partisi_terpasang(conn)
+    tahun = [int(p[1:]) for p in nama if re.fullmatch(r"p\d{4}", p)]
+    if not tahun or "pmax" not in nama:
+        return []
+    baru = list(range(max(tahun) + 1, (tahun_akhir or date.today().year + 1) + 1))
+    if baru:
+        conn.execute(text(f"ALTER TABLE histori_saham {pecah_pmax(baru)}"))
+    return baru
+
+
+# dijalankan setiap jalankan_migrasi(), setelah migrasi berversi
+MIGRASI_BERULANG = [
+    ("partisi histori_saham tahun berikutnya", tambah_partisi_tahun),
+]
+
+
+# ===============================
+# RUNNER
+# ===============================
+
+def versi_terpasang(engine):
+    """Set versi migrasi yang sudah dijalankan"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {TABEL_MIGRASI} ("
+            "versi INT PRIMARY KEY, nama VARCHAR(100) NOT NULL, waktu DATETIME NOT NULL)"
+        ))
+        return set(conn.execute(text(f"SELECT versi FROM {TABEL_MIGRASI}")).scalars())
+
+
+def jalankan_migrasi(engine, sampai=None):
+    """
+    Menjalankan migrasi yang belum terpasang, urut versi, lalu MIGRASI_BERULANG.
+    sampai: berhenti di versi ini (None = semua). Mengembalikan list versi baru.
+    """
+    terpasang = versi_terpasang(engine)
+    baru = []
+    for versi, nama, langkah in MIGRASI:
+        if versi in terpasang or (sampai is not None and versi > sampai):
+            continue
+        # DDL MySQL auto-commit; catatan versi ditulis setelah langkahnya berhasil
+        with engine.begin() as conn:
+            langkah(conn)
+            conn.execute(text(f"INSERT INTO {TABEL_MIGRASI} (versi, nama, waktu) VALUES (:v, :n, :w)"),
+                         {"v": versi, "n": nama, "w": pd.Timestamp.now().to_pydatetime()})
+        print(f"✅ Migrasi {versi}: {nama}")
+        baru.append(versi)
+
+    for nama, langkah in MIGRASI_BERULANG:
+        with engine.begin() as conn:
+            hasil = langkah(conn)
+        if hasil:
+            print(f"✅ Migrasi berulang {nama}: {hasil}")
+    return baru
+
+
+# ===============================
+# EXPLAIN: QUERY PANAS HARUS PAKAI INDEX
+# ===============================
+
+# nama -> (sql, params contoh, {tabel/alias: index yang diharapkan})
+QUERY_PANAS = {
+    "hapus_saham": (
+        "DELETE FROM kumpulan_saham WHERE Nama_Saham = :nama",
+        {"nama": "BBCA"}, {"kumpulan_saham": "idx_kumpulan_nama"}),
+    "semua ticker di tanggal": (
+        "SELECT Nama_Saham, Terakhir FROM histori_saham WHERE Tanggal = :tanggal",
+        {"tanggal": date(2024, 1, 2)}, {"histori_saham": "idx_histori_tanggal"}),
+    "tanggal bursa terdekat": (
+        "SELECT MAX(Tanggal) FROM histori_saham WHERE Tanggal <= :tanggal",
+        {"tanggal": date(2024, 1, 2)}, {"histori_saham": "idx_histori_tanggal"}),
+    "harga_pada_tanggal_sql": (
+        "SELECT Nama_Saham, Tanggal, Terakhir FROM histori_saham "
+        "WHERE Tanggal = (SELECT MAX(Tanggal) FROM histori_saham WHERE Tanggal <= :tanggal)",
+        {"tanggal": date(2024, 1, 2)}, {"histori_saham": "idx_histori_tanggal"}),
+    "join sektor di tanggal": (
+        "SELECT k.Sektor, h.Nama_Saham, h.Terakhir FROM histori_saham h "
+        "JOIN kumpulan_saham k ON k.Nama_Saham = h.Nama_Saham WHERE h.Tanggal = :tanggal",
+        {"tanggal": date(2024, 1, 2)}, {"h": "idx_histori_tanggal", "k": "idx_kumpulan_nama"}),
+}
+
+# MySQL menjawab MIN/MAX langsung dari ujung index: baris EXPLAIN tanpa tabel,
+# Extra "Select tables optimized away" (tidak ada scan sama sekali)
+DIOPTIMASI = "(optimized away)"
+
+_POLA_SQLITE = re.compile(
+    r"^(?:SCAN|SEARCH) (\w+)(?: AS (\w+))?(?: USING (?:COVERING )?INDEX (\w+)| USING (INTEGER )?PRIMARY KEY)?"
+)
+
+
+def _rencana_mysql(rows):
+    """Baris EXPLAIN MySQL -> list (tabel/alias, index); tanpa tabel tapi optimized away -> (None, DIOPTIMASI)"""
+    rencana = []
+    for r in rows:
+        if r["table"]:
+            rencana.append((r["table"], r["key"] if r["type"] != "ALL" else None))
+        elif "optimized away" in (r["Extra"] or ""):
+            rencana.append((None, DIOPTIMASI))
+    return rencana
+
+
+def rencana_query(conn, sql, params):
+    """Rencana eksekusi: list (tabel/alias, index yang dipakai atau None)"""
+    if conn.dialect.name == "mysql":
+        return _rencana_mysql(conn.execute(text(f"EXPLAIN {sql}"), params).mappings().all())
+
+    rencana = []
+    for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params):
+        cocok = _POLA_SQLITE.match(row[-1])
+        if cocok:
+            tabel, alias, index, pk = cocok.groups()
+            rencana.append((alias or tabel, index or ("PRIMARY" if pk is not None else None)))
+    return rencana
+
+
+def cek_explain(engine, queries=QUERY_PANAS):
+    """
+    DataFrame (Query, Tabel, Index, Diharapkan, OK) untuk semua query panas.
+
+    Tabel yang tidak muncul di rencana karena dioptimasi habis (MIN/MAX dari
+    index) dianggap OK dengan Index = DIOPTIMASI.
+    """
+    hasil = []
+    with engine.connect() as conn:
+        for nama, (sql, params, harapan) in queries.items():
+            dipakai = dict(rencana_query(conn, sql, params))
+            dioptimasi = dipakai.pop(None, None) == DIOPTIMASI
+            for tabel, index in harapan.items():
+                pakai = dipakai.get(tabel, DIOPTIMASI if dioptimasi else None)
+                hasil.append({"Query": nama, "Tabel": tabel, "Index": pakai,
+                              "Diharapkan": index, "OK": pakai in (index, DIOPTIMASI)})
+    return pd.DataFrame(hasil, columns=["Query", "Tabel", "Index", "Diharapkan", "OK"])
+
+
+if __name__ == "__main__":
+    from main import buat_koneksi
+
+    parser = argparse.ArgumentParser(description="Migrasi skema database saham")
+    parser.add_argument("--db-url", help="URL SQLAlchemy pengganti koneksi MySQL default")
+    parser.add_argument("--sampai", type=int, help="berhenti di versi ini")
+    parser.add_argument("--explain", action="store_true", help="cek rencana query panas setelah migrasi")
+    args = parser.parse_args()
+
+    engine = buat_koneksi(args.db_url)
+    if engine is None:
+        sys.exit(1)
+    try:
+        if not jalankan_migrasi(engine, args.sampai):
+            print("Skema sudah versi terbaru ✅")
+        if args.explain:
+            report = cek_explain(engine)
+            print(report.to_string(index=False))
+            sys.exit(0 if report["OK"].all() else 1)
+    except Exception as e:
+        print(f"❌ Migrasi gagal: {e}")
+        sys.exit(1)
@@ -0,0 +1,17 @@
+"""
+Utilitas process pool bersama (simulasi_batch, batch_import, chart_pack).
+"""
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+def map_bertahap(pool, func, tasks, max_pending):
+    """Seperti pool.map, tapi hanya `max_pending` batch yang antre sekaligus"""
+    pending = set()
+    for task in tasks:
+        pending.add(pool.submit(func, task))
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                yield f.result()
+    for f in pending:
+        yield f.result()
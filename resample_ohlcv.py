@@ -0,0 +1,117 @@
+"""
+Resampler OHLCV: histori harian -> bar mingguan / bulanan (juga kuartal / tahunan)
+untuk semua ticker.
+
+Histori (urut per Nama_Saham, Tanggal) dipotong menjadi blok berurutan per
+(ticker, periode); nomor blok dipakai sebagai key groupby integer, jadi satu
+agregasi cythonized untuk semua ticker tanpa loop Python dan tanpa groupby
+di atas kolom string.
+
+Konvensi bar hasil sama dengan histori bulanan di database:
+  Tanggal    : awal periode (tanggal 1 untuk bulanan, Senin untuk mingguan)
+  Pembukaan  : open pertama       Tertinggi : high tertinggi
+  Terakhir   : close terakhir     Terendah  : low terendah
+  Vol        : jumlah volume
+  PerubahanPercent : close / close periode sebelumnya - 1 (periode pertama
+                     tiap ticker: gabungan PerubahanPercent hariannya)
+"""
+import numpy as np
+import pandas as pd
+
+FREKUENSI = ("D", "W", "M", "Q", "Y")
+AGREGASI = {
+    "Pembukaan": "first",
+    "Tertinggi": "max",
+    "Terendah": "min",
+    "Terakhir": "last",
+    "Vol": "sum",
+}
+
+
+def awal_periode(tanggal, freq):
+    """Array datetime64 -> awal periode (minggu: Senin, bulan/kuartal/tahun: tanggal 1)"""
+    hari = np.asarray(tanggal, dtype="datetime64[D]")
+    if freq == "Y":
+        return hari.astype("datetime64[Y]").astype("datetime64[ns]")
+    if freq == "Q":
+        bulan = hari.astype("datetime64[M]")
+        return (bulan - bulan.astype("int64") % 3).astype("datetime64[ns]")
+    if freq == "M":
+        return hari.astype("datetime64[M]").astype("datetime64[ns]")
+    if freq == "W":
+        # 1970-01-01 hari Kamis -> (hari + 3) % 7 = 0 untuk Senin
+        return (hari - (hari.astype("int64") + 3) % 7).astype("datetime64[ns]")
+    return hari.astype("datetime64[ns]")
+
+
+def deteksi_frekuensi(histori_df, sudah_urut=False):
+    """"D" / "W" / "M" dari median jarak hari antar baris ticker yang sama"""
+    if not sudah_urut:
+        histori_df = histori_df.sort_values(["Nama_Saham", "Tanggal"], kind="stable")
+    names = histori_df["Nama_Saham"].to_numpy(dtype=object)
+    hari = pd.to_datetime(histori_df["Tanggal"]).to_numpy(dtype="datetime64[D]").astype("int64")
+
+    return frekuensi_dari_jarak(np.diff(hari)[names[1:] == names[:-1]])
+
+
+def frekuensi_dari_jarak(jarak):
+    """"D" / "W" / "M" dari array jarak hari antar bar berurutan satu ticker"""
+    if len(jarak) == 0:
+        return "M"
+    median = np.median(jarak)
+    return "D" if median <= 4 else "W" if median <= 10 else "M"
+
+
+def resample_ohlcv(histori_df, freq="M", sudah_urut=False):
+    """
+    Bar OHLCV per (Nama_Saham, periode) untuk freq "W", "M", "Q" atau "Y".
+
+    histori_df boleh berfrekuensi apa saja yang lebih rapat dari (atau sama
+    dengan) freq; kolom yang tidak ada (mis. tanpa Tertinggi/Terendah)
+    dilewati. Histori yang lebih jarang dari freq (mis. bulanan -> "W") ditolak
+    dengan ValueError, karena bar hasilnya hanya akan menyalin bar aslinya.
+    """
+    if freq not in FREKUENSI:
+        raise ValueError(f"Frekuensi {freq} tidak didukung (pilih {', '.join(FREKUENSI)})")
+    if not sudah_urut:
+        histori_df = (
+            histori_df.assign(Tanggal=pd.to_datetime(histori_df["Tanggal"]))
+            .sort_values(["Nama_Saham", "Tanggal"], kind="stable")
+            .reset_index(drop=True)
+        )
+
+    names = histori_df["Nama_Saham"].to_numpy(dtype=object)
+    tanggal = histori_df["Tanggal"].to_numpy()
+    if len(names) == 0:
+        return histori_df.iloc[0:0].copy()
+
+    hari = tanggal.astype("datetime64[D]").astype("int64")
+    asal = frekuensi_dari_jarak(np.diff(hari)[names[1:] == names[:-1]])
+    if FREKUENSI.index(freq) < FREKUENSI.index(asal):
+        raise ValueError(f"Histori berfrekuensi {asal}, tidak bisa di-resample ke {freq} yang lebih rapat")
+
+    periode = awal_periode(tanggal, freq)
+
+    # blok baru setiap ticker atau periode berganti
+    ganti = np.r_[True, (names[1:] != names[:-1]) | (periode[1:] != periode[:-1])]
+    blok = np.cumsum(ganti) - 1
+    awal = np.flatnonzero(ganti)
+
+    agregasi = {c: f for c, f in AGREGASI.items() if c in histori_df.columns}
+    bars = histori_df[list(agregasi)].groupby(blok, sort=False).agg(agregasi)
+
+    hasil = pd.DataFrame({"Nama_Saham": names[awal], "Tanggal": periode[awal]})
+    for col in histori_df.columns.drop(["Nama_Saham", "Tanggal", "PerubahanPercent"], errors="ignore"):
+        # kolom lain (mis. id) ikut dari baris pertama periode
+        hasil[col] = bars[col].to_numpy() if col in bars else histori_df[col].to_numpy()[awal]
+
+    if "PerubahanPercent" in histori_df.columns:
+        close = hasil["Terakhir"].to_numpy(dtype="float64")
+        ticker_sama = np.r_[False, hasil["Nama_Saham"].to_numpy()[1:] == hasil["Nama_Saham"].to_numpy()[:-1]]
+        prev = np.r_[np.nan, close[:-1]]
+        # periode pertama tiap ticker: tidak ada close sebelumnya, pakai gabungan perubahan hariannya
+        gabungan = np.expm1(pd.Series(np.log1p(histori_df["PerubahanPercent"].to_numpy(dtype="float64") / 100))
+                            .groupby(blok, sort=False).sum(min_count=1).to_numpy())
+        hasil["PerubahanPercent"] = np.round(np.where(ticker_sama, close / prev - 1, gabungan) * 100, 2)
+
+    return hasil[list(histori_df.columns)]
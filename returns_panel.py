@@ -0,0 +1,118 @@
+"""
+Panel return bulanan (periode x ticker) untuk heatmap & analisa berbasis return.
+
+Return harian (pct_change Terakhir per saham) dihitung sekali lalu diringkas
+menjadi dua matriks lebar float64: jumlah return dan banyaknya return per
+(bulan, ticker). Rata-rata per saham = jumlah / banyak; rata-rata per sektor
+didapat dengan mengalikan kedua matriks dengan matriks indikator ticker x sektor,
+jadi tidak perlu merge kumpulan_saham ke setiap baris histori.
+
+Data baru yang tanggalnya setelah tanggal terakhir tiap ticker bisa ditambahkan
+lewat tambah() tanpa menghitung ulang seluruh histori.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _ringkas(names, months, returns):
+    """(jumlah, banyak) return per Month x Nama_Saham dalam bentuk lebar"""
+    grouped = (
+        pd.DataFrame({"Month": months, "Nama_Saham": names, "Return": returns})
+        .groupby(["Month", "Nama_Saham"])["Return"]
+        .agg(["sum", "count"])
+    )
+    sums = grouped["sum"].unstack("Nama_Saham").astype("float64")
+    counts = grouped["count"].unstack("Nama_Saham").astype("float64")
+    return sums, counts
+
+
+class ReturnsPanel:
+    """
+    sums   : Month x ticker, jumlah return harian di bulan itu
+    counts : Month x ticker, banyaknya return harian (NaN tidak dihitung)
+    """
+
+    def __init__(self, histori_df, sudah_urut=False):
+        df = histori_df[["Nama_Saham", "Tanggal", "Terakhir"]]
+        if not sudah_urut:
+            df = df.assign(Tanggal=pd.to_datetime(df["Tanggal"])).sort_values(["Nama_Saham", "Tanggal"])
+
+        returns = df.groupby("Nama_Saham")["Terakhir"].pct_change()
+        self.sums, self.counts = _ringkas(df["Nama_Saham"], df["Tanggal"].dt.to_period("M"), returns)
+
+        # posisi terakhir per ticker, bekal untuk tambah()
+        last = df.groupby("Nama_Saham").tail(1).set_index("Nama_Saham")
+        self.last_date = last["Tanggal"]
+        self.last_price = last["Terakhir"]
+        self._mean = None
+
+    @classmethod
+    def _dari_bagian(cls, sums, counts, last_date, last_price):
+        panel = cls.__new__(cls)
+        panel.sums, panel.counts = sums, counts
+        panel.last_date, panel.last_price = last_date, last_price
+        panel._mean = None
+        return panel
+
+    # --- tampilan ---
+    def mean(self):
+        """Rata-rata return per Month x ticker"""
+        if self._mean is None:
+            self._mean = self.sums / self.counts.where(self.counts > 0)
+        return self._mean
+
+    def sektor(self, kumpulan_df):
+        """Rata-rata return per Month x Sektor lewat reduksi matriks ticker -> sektor"""
+        sektor = (
+            kumpulan_df.drop_duplicates("Nama_Saham")
+            .set_index("Nama_Saham")["Sektor"]
+            .reindex(self.sums.columns)
+        )
+        indikator = pd.get_dummies(sektor, dtype="float64")   # ticker tanpa sektor = baris nol
+
+        sums = self.sums.fillna(0).to_numpy() @ indikator.to_numpy()
+        counts = self.counts.fillna(0).to_numpy() @ indikator.to_numpy()
+        mean = np.divide(sums, counts, out=np.full_like(sums, np.nan), where=counts > 0)
+        return pd.DataFrame(mean, index=self.sums.index,
+                            columns=pd.Index(indikator.columns, name="Sektor"))
+
+    # --- update inkremental ---
+    def tambah(self, rows):
+        """
+        Panel baru dengan rows (histori baru) ditambahkan.
+
+        Hanya berlaku kalau setiap baris baru tanggalnya setelah tanggal terakhir
+        ticker-nya; kalau tidak (data lama di-update), mengembalikan None dan
+        panel harus dibangun ulang.
+        """
+        rows = rows[["Nama_Saham", "Tanggal", "Terakhir"]].assign(Tanggal=lambda d: pd.to_datetime(d["Tanggal"]))
+        rows = rows.sort_values(["Nama_Saham", "Tanggal"])
+        if rows.duplicated(["Nama_Saham", "Tanggal"]).any():
+            return None
+
+        prev_date = rows["Nama_Saham"].map(self.last_date)
+        first = ~rows["Nama_Saham"].duplicated()
+        if (rows.loc[first, "Tanggal"] <= prev_date[first]).any():
+            return None
+
+        # harga terakhir yang sudah ada disisipkan di depan supaya pct_change nyambung
+        lanjutan = rows["Nama_Saham"][first & prev_date.notna()]
+        seed = pd.DataFrame({
+            "Nama_Saham": lanjutan.to_numpy(),
+            "Tanggal": self.last_date[lanjutan].to_numpy(),
+            "Terakhir": self.last_price[lanjutan].to_numpy(),
+        })
+        gabung = pd.concat([seed, rows], ignore_index=True).sort_values(["Nama_Saham", "Tanggal"], kind="stable")
+        returns = gabung.groupby("Nama_Saham")["Terakhir"].pct_change()
+        baru = gabung.index >= len(seed)
+        gabung, returns = gabung[baru], returns[baru]
+
+        sums, counts = _ringkas(gabung["Nama_Saham"], gabung["Tanggal"].dt.to_period("M"), returns)
+        sums = self.sums.add(sums, fill_value=0)
+        counts = self.counts.add(counts, fill_value=0)
+
+        last = rows.groupby("Nama_Saham").tail(1).set_index("Nama_Saham")
+        last_date = last["Tanggal"].combine_first(self.last_date)
+        last_price = self.last_price.drop(last.index, errors="ignore")
+        last_price = pd.concat([last_price, last["Terakhir"]]).sort_index()
+        return ReturnsPanel._dari_bagian(sums, counts, last_date, last_price)
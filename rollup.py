@@ -0,0 +1,379 @@
+"""
+Tabel rollup di database: ringkasan histori_saham per periode.
+
+  rollup_histori : per (Periode M/Q/Y, Nama_Saham, Tanggal awal periode)
+                   OHLCV periode, close pertama & terakhir, dan return
+                   periode (close / close periode sebelumnya - 1, sama dengan
+                   ReturnsPanel di atas bar bulanan)
+  rollup_sektor  : per (Periode, Sektor, Tanggal) jumlah & banyaknya return
+                   periode semua saham di sektor itu
+
+Tabel dibuat & diisi penuh oleh migrasi.py (versi 4). Setelah itu setiap
+penulisan histori (bulk_writer.upsert_histori, hapus histori) memanggil
+perbarui_rollup() di transaksi yang sama; yang dihitung ulang hanya ticker
+yang berubah di tahun-tahun yang tersentuh, jadi biayanya tidak bergantung
+pada panjang histori. Pembacaan (growth, heatmap) cukup membaca rollup.
+"""
+import numpy as np
+import pandas as pd
+from sqlalchemy import (BigInteger, Column, Date, Double, Integer, MetaData, Numeric, String, Table,
+                        bindparam, inspect, text)
+
+from resample_ohlcv import awal_periode
+from returns_panel import ReturnsPanel
+
+PERIODE = ("M", "Q", "Y")
+BATCH_TICKER = 200
+
+metadata = MetaData()
+rollup_histori = Table(
+    "rollup_histori", metadata,
+    Column("Periode", String(1), primary_key=True),
+    Column("Nama_Saham", String(20), primary_key=True),
+    Column("Tanggal", Date, primary_key=True),
+    Column("Tanggal_Awal", Date),
+    Column("Tanggal_Akhir", Date),
+    Column("Pembukaan", Numeric(15, 2)),
+    Column("Tertinggi", Numeric(15, 2)),
+    Column("Terendah", Numeric(15, 2)),
+    Column("Terakhir_Awal", Numeric(15, 2)),
+    Column("Terakhir", Numeric(15, 2)),
+    Column("Vol", BigInteger),
+    Column("Return_Periode", Double),
+)
+rollup_sektor = Table(
+    "rollup_sektor", metadata,
+    Column("Periode", String(1), primary_key=True),
+    Column("Sektor", String(100), primary_key=True),
+    Column("Tanggal", Date, primary_key=True),
+    Column("Return_Sum", Double),
+    Column("Return_Count", Integer),
+    Column("Jumlah_Saham", Integer),
+)
+
+KOLOM_BAR = ["Nama_Saham", "Tanggal", "Pembukaan", "Tertinggi", "Terendah", "Terakhir", "Vol"]
+
+
+# ===============================
+# HITUNG ROLLUP (pandas, per kumpulan bar)
+# ===============================
+
+def hitung_rollup(bars, sebelum=None):
+    """
+    bars   : histori urut per (Nama_Saham, Tanggal)
+    sebelum: {periode: Series Terakhir per Nama_Saham} close periode tepat
+             sebelum jendela bars, supaya return periode pertama jendela tetap
+             nyambung (kosong = periode pertama tidak punya return)
+
+    Mengembalikan DataFrame baris rollup_histori untuk semua PERIODE.
+    """
+    bars = bars.assign(Tanggal=pd.to_datetime(bars["Tanggal"]))
+    sebelum = sebelum or {}
+
+    hasil = []
+    for periode in PERIODE:
+        key = awal_periode(bars["Tanggal"].to_numpy(), periode)
+        agg = bars.groupby([bars["Nama_Saham"].to_numpy(), key], sort=False).agg(
+            Tanggal_Awal=("Tanggal", "min"),
+            Tanggal_Akhir=("Tanggal", "max"),
+            Pembukaan=("Pembukaan", "first"),
+            Tertinggi=("Tertinggi", "max"),
+            Terendah=("Terendah", "min"),
+            Terakhir_Awal=("Terakhir", "first"),
+            Terakhir=("Terakhir", "last"),
+            Vol=("Vol", "sum"),
+        )
+        agg.index.names = ["Nama_Saham", "Tanggal"]
+        agg = agg.reset_index()
+
+        # close periode sebelumnya: baris sebelumnya di ticker yang sama, atau dari `sebelum`
+        prev = agg.groupby("Nama_Saham", sort=False)["Terakhir"].shift(1)
+        pertama = ~agg["Nama_Saham"].duplicated()
+        if periode in sebelum:
+            prev[pertama] = agg.loc[pertama, "Nama_Saham"].map(sebelum[periode]).to_numpy(dtype="float64")
+        hasil.append(agg.assign(Return_Periode=agg["Terakhir"] / prev - 1, Periode=periode))
+    return pd.concat(hasil, ignore_index=True)[[c.name for c in rollup_histori.columns]]
+
+
+def _records(df):
+    """DataFrame -> list dict siap insert (tanggal jadi date, NaN jadi NULL)"""
+    df = df.copy()
+    for col in ("Tanggal", "Tanggal_Awal", "Tanggal_Akhir"):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col]).dt.date
+    if "Vol" in df.columns:
+        df["Vol"] = df["Vol"].round().astype("Int64")
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+# ===============================
+# DDL & BUILD PENUH
+# ===============================
+
+def terpasang(conn):
+    """True kalau tabel rollup sudah dibuat (migrasi versi 4)"""
+    return inspect(conn).has_table("rollup_histori")
+
+
+def buat_tabel(conn):
+    metadata.create_all(conn, checkfirst=True)
+
+
+def _frame_bar(rows):
+    df = pd.DataFrame(rows, columns=KOLOM_BAR)
+    for col in ("Pembukaan", "Tertinggi", "Terendah", "Terakhir", "Vol"):
+        df[col] = pd.to_numeric(df[col]).astype("float64")
+    return df
+
+
+def _baca_bar(conn, tickers, start=None, end=None):
+    """Bar histori tickers dalam [start, end], urut per (Nama_Saham, Tanggal)"""
+    filters = ["Nama_Saham IN :tickers"]
+    params = {"tickers": list(tickers)}
+    if start is not None:
+        filters.append("Tanggal >= :start")
+        params["start"] = start
+    if end is not None:
+        filters.append("Tanggal <= :end")
+        params["end"] = end
+    stmt = text(
+        f"SELECT {', '.join(KOLOM_BAR)} FROM histori_saham WHERE {' AND '.join(filters)} "
+        "ORDER BY Nama_Saham, Tanggal"
+    ).bindparams(bindparam("tickers", expanding=True))
+    return _frame_bar(conn.execute(stmt, params).all())
+
+
+def bangun_ulang(conn):
+    """Isi ulang seluruh rollup dari histori_saham, BATCH_TICKER saham per query"""
+    conn.execute(rollup_histori.delete())
+    tickers = conn.execute(text("SELECT DISTINCT Nama_Saham FROM histori_saham ORDER BY Nama_Saham")).scalars().all()
+    for start in range(0, len(tickers), BATCH_TICKER):
+        rows = _records(hitung_rollup(_baca_bar(conn, tickers[start:start + BATCH_TICKER])))
+        if rows:
+            conn.execute(rollup_histori.insert(), rows)
+    perbarui_sektor(conn)
+
+
+# ===============================
+# UPDATE INKREMENTAL
+# ===============================
+
+def _jendela(conn, stock, start, end):
+    """
+    Jendela [awal tahun, akhir tahun] yang harus dihitung ulang kalau bar stock
+    di [start, end] berubah. Bar pertama setelah end ikut karena return-nya
+    bergantung pada close terakhir di dalam rentang.
+    """
+    berikut = conn.execute(
+        text("SELECT MIN(Tanggal) FROM histori_saham WHERE Nama_Saham = :saham AND Tanggal > :end"),
+        {"saham": stock, "end": end},
+    ).scalar()
+    tahun_akhir = pd.Timestamp(berikut or end).year
+    return pd.Timestamp(start).replace(month=1, day=1).date(), pd.Timestamp(year=tahun_akhir, month=12, day=31).date()
+
+
+def _terakhir_sebelum(conn, stock, sebelum):
+    """{periode: Series Terakhir} dari baris rollup stock yang tepat sebelum tanggal `sebelum`"""
+    hasil = {}
+    for periode in PERIODE:
+        row = conn.execute(
+            text("SELECT Terakhir FROM rollup_histori WHERE Periode = :periode AND Nama_Saham = :saham "
+                 "AND Tanggal < :sebelum ORDER BY Tanggal DESC LIMIT 1"),
+            {"periode": periode, "saham": stock, "sebelum": sebelum},
+        ).all()
+        if row:
+            hasil[periode] = pd.Series({stock: float(row[0][0]) if row[0][0] is not None else np.nan})
+    return hasil
+
+
+def perbarui_rollup(conn, rentang):
+    """
+    Hitung ulang rollup untuk histori yang baru berubah.
+
+    conn    : koneksi di dalam transaksi penulisan histori
+    rentang : {Nama_Saham: (tanggal_min, tanggal_max)} rentang bar yang
+              ditulis/dihapus, atau None = seluruh histori saham itu
+
+    Tidak melakukan apa-apa kalau tabel rollup belum dibuat (migrasi belum jalan).
+    """
+    if not rentang or not terpasang(conn):
+        return
+    jendela_sektor = []
+    for stock, batas in rentang.items():
+        if batas is None:
+            awal = akhir = None
+            conn.execute(rollup_histori.delete().where(rollup_histori.c.Nama_Saham == stock))
+            bars, sebelum = _baca_bar(conn, [stock]), None
+        else:
+            awal, akhir = _jendela(conn, stock, *[pd.Timestamp(t).date() for t in batas])
+            conn.execute(rollup_histori.delete().where(
+                (rollup_histori.c.Nama_Saham == stock)
+                & rollup_histori.c.Tanggal.between(awal, akhir)
+            ))
+            sebelum = _terakhir_sebelum(conn, stock, awal)
+            bars = _baca_bar(conn, [stock], awal, akhir)
+
+        rows = _records(hitung_rollup(bars, sebelum))
+        if rows:
+            conn.execute(rollup_histori.insert(), rows)
+        jendela_sektor.append((stock, awal, akhir))
+
+    sektor = conn.execute(
+        text("SELECT DISTINCT Sektor FROM kumpulan_saham WHERE TRIM(Nama_Saham) IN :tickers AND Sektor IS NOT NULL")
+        .bindparams(bindparam("tickers", expanding=True)),
+        {"tickers": [stock.strip() for stock in rentang]},
+    ).scalars().all()
+    if sektor:
+        awal = [a for _, a, _ in jendela_sektor]
+        akhir = [b for _, _, b in jendela_sektor]
+        penuh = any(a is None for a in awal)
+        perbarui_sektor(conn, sektor, None if penuh else min(awal), None if penuh else max(akhir))
+
+
+QUERY_SEKTOR = """
+INSERT INTO rollup_sektor (Periode, Sektor, Tanggal, Return_Sum, Return_Count, Jumlah_Saham)
+SELECT r.Periode, k.Sektor, r.Tanggal, SUM(r.Return_Periode), COUNT(r.Return_Periode), COUNT(*)
+FROM rollup_histori r
+JOIN (
+    -- satu sektor per saham; nama di kumpulan_saham bisa ber-spasi
+    SELECT TRIM(Nama_Saham) AS Nama_Saham, MIN(Sektor) AS Sektor
+    FROM kumpulan_saham WHERE Sektor IS NOT NULL GROUP BY TRIM(Nama_Saham)
+) k ON k.Nama_Saham = TRIM(r.Nama_Saham)
+WHERE 1 = 1 {filter}
+GROUP BY r.Periode, k.Sektor, r.Tanggal
+"""
+
+
+def perbarui_sektor(conn, sektor=None, start=None, end=None):
+    """
+    Hitung ulang rollup_sektor dari rollup_histori.
+    sektor: list sektor (None = semua); start/end: rentang Tanggal periode
+    (None = semua). Dipanggil juga saat kumpulan_saham berubah.
+    """
+    filters, params, expanding = [], {}, []
+    if sektor is not None:
+        filters.append("AND k.Sektor IN :sektor")
+        params["sektor"] = list(sektor)
+        expanding.append(bindparam("sektor", expanding=True))
+    if start is not None:
+        filters.append("AND r.Tanggal BETWEEN :start AND :end")
+        params.update(start=start, end=end)
+
+    hapus = rollup_sektor.delete()
+    if sektor is not None:
+        hapus = hapus.where(rollup_sektor.c.Sektor.in_(list(sektor)))
+    if start is not None:
+        hapus = hapus.where(rollup_sektor.c.Tanggal.between(start, end))
+    conn.execute(hapus)
+    conn.execute(text(QUERY_SEKTOR.format(filter=" ".join(filters))).bindparams(*expanding), params)
+
+
+def perbarui_sektor_engine(engine):
+    """Segarkan rollup_sektor setelah kumpulan_saham berubah (kalau rollup terpasang)"""
+    with engine.begin() as conn:
+        if terpasang(conn):
+            perbarui_sektor(conn)
+
+
+# ===============================
+# BACA ROLLUP
+# ===============================
+
+def _baca(engine, sql, params, columns):
+    with engine.connect() as conn:
+        if not terpasang(conn):
+            return None
+        return pd.DataFrame(conn.execute(text(sql), params).all(), columns=columns)
+
+
+def harga_awal_akhir_rollup(engine):
+    """
+    Sama dengan harga_awal_akhir / harga_awal_akhir_sql, dibaca dari rollup
+    tahunan (satu baris per saham per tahun). Nama dengan spasi di ujung
+    digabung per TRIM(Nama_Saham); baris tahun yang sama diurutkan lewat
+    Tanggal_Awal / Tanggal_Akhir. None kalau rollup belum terpasang.
+    """
+    df = _baca(engine, """
+        SELECT Nama_Saham,
+               MAX(CASE WHEN rn_awal = 1 THEN Terakhir_Awal END),
+               MAX(CASE WHEN rn_akhir = 1 THEN Terakhir END)
+        FROM (
+            SELECT TRIM(Nama_Saham) AS Nama_Saham, Terakhir_Awal, Terakhir,
+                   ROW_NUMBER() OVER (PARTITION BY TRIM(Nama_Saham)
+                                      ORDER BY CASE WHEN Terakhir_Awal IS NULL THEN 1 ELSE 0 END,
+                                               Tanggal_Awal) AS rn_awal,
+                   ROW_NUMBER() OVER (PARTITION BY TRIM(Nama_Saham)
+                                      ORDER BY CASE WHEN Terakhir IS NULL THEN 1 ELSE 0 END,
+                                               Tanggal_Akhir DESC) AS rn_akhir
+            FROM rollup_histori WHERE Periode = 'Y'
+        ) ranked
+        WHERE rn_awal = 1 OR rn_akhir = 1
+        GROUP BY Nama_Saham
+    """, {}, ["Nama_Saham", "Harga_Awal", "Harga_Akhir"])
+    if df is None:
+        return None
+    df[["Harga_Awal", "Harga_Akhir"]] = df[["Harga_Awal", "Harga_Akhir"]].astype("float64")
+    return df.sort_values("Nama_Saham").reset_index(drop=True)
+
+
+def returns_panel_rollup(engine):
+    """
+    ReturnsPanel (Month x ticker) dari rollup bulanan, sama dengan panel di atas
+    bar bulanan (AnalyticsContext.returns_panel). None kalau belum terpasang.
+    """
+    df = _baca(engine, """
+        SELECT Nama_Saham, Tanggal, Tanggal_Akhir, Terakhir
+        FROM rollup_histori WHERE Periode = 'M'
+    """, {}, ["Nama_Saham", "Tanggal", "Tanggal_Akhir", "Terakhir"])
+    if df is None:
+        return None
+
+    # rollup disimpan per nama mentah: "BBCA" dan "BBCA " bisa punya bar di bulan
+    # yang sama. Digabung per nama trim (close = bar yang berakhir paling akhir),
+    # lalu return dihitung ulang dari close bulan sebelumnya nama trim yang sama.
+    df["Nama_Saham"] = df["Nama_Saham"].str.strip()
+    df["Tanggal"] = pd.to_datetime(df["Tanggal"])
+    df["Terakhir"] = df["Terakhir"].astype("float64")
+    df = (
+        df.sort_values(["Nama_Saham", "Tanggal", "Tanggal_Akhir"])
+        .groupby(["Nama_Saham", "Tanggal"], sort=False).tail(1)
+        .reset_index(drop=True)
+    )
+    df["Return_Periode"] = df.groupby("Nama_Saham")["Terakhir"].pct_change()
+    df["Month"] = df["Tanggal"].dt.to_period("M")
+    df["Ada"] = df["Return_Periode"].notna().astype("float64")
+    # satu bar per bulan: jumlah = return bulan itu, banyak = 1 kalau return-nya ada
+    sums = df.pivot(index="Month", columns="Nama_Saham", values="Return_Periode").fillna(0)
+    counts = df.pivot(index="Month", columns="Nama_Saham", values="Ada")
+    sums = sums.where(counts.notna())
+
+    last = df.groupby("Nama_Saham").tail(1).set_index("Nama_Saham")
+    return ReturnsPanel._dari_bagian(sums, counts, last["Tanggal"], last["Terakhir"])
+
+
+def return_sektor_rollup(engine):
+    """Rata-rata return Month x Sektor (sama dengan ReturnsPanel.sektor); None kalau belum terpasang"""
+    df = _baca(engine, """
+        SELECT Sektor, Tanggal, Return_Sum, Return_Count FROM rollup_sektor WHERE Periode = 'M'
+    """, {}, ["Sektor", "Tanggal", "Return_Sum", "Return_Count"])
+    if df is None:
+        return None
+
+    df["Month"] = pd.to_datetime(df["Tanggal"]).dt.to_period("M")
+    df["Return"] = df["Return_Sum"].astype("float64") / df["Return_Count"].where(df["Return_Count"] > 0)
+    return df.pivot(index="Month", columns="Sektor", values="Return").astype("float64")
+
+
+def marketcap_sektor_sql(engine):
+    """
+    Market cap per sektor dihitung di database (Sektor, Market_Cap).
+
+    Sengaja tidak dimaterialisasi: kumpulan_saham hanya satu baris per saham,
+    jadi GROUP BY langsung sama murahnya dengan membaca tabel rollup.
+    """
+    with engine.connect() as conn:
+        df = pd.DataFrame(conn.execute(text(
+            "SELECT Sektor, SUM(Market_Cap) FROM kumpulan_saham GROUP BY Sektor ORDER BY Sektor"
+        )).all(), columns=["Sektor", "Market_Cap"])
+    df["Market_Cap"] = df["Market_Cap"].astype("int64")
+    return df
@@ -0,0 +1,299 @@
+"""
+Simulasi batch: semua periode entry x semua tanggal exit sekaligus.
+
+Harga `Terakhir` di-pivot sekali menjadi matriks ticker x periode, lalu return
+setiap pasangan (entry, exit) dihitung dengan satu broadcast NumPy. Pertanyaan
+tunggal simulate_investment(month, year, target_date) cukup jadi lookup ke
+matriks tersebut.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from pool_utils import map_bertahap
+
+
+class SimulasiCube:
+    """
+    entry_prices : ticker x bulan entry  (harga baris pertama di bulan itu)
+    exit_prices  : ticker x tanggal exit (harga tepat di tanggal itu)
+    """
+
+    def __init__(self, histori_df):
+        df = histori_df[["Nama_Saham", "Tanggal", "Terakhir"]].copy()
+        df["Tanggal"] = pd.to_datetime(df["Tanggal"])
+
+        # urutan ticker mengikuti unique() seperti loop di simulate_investment
+        self.tickers = pd.Index(pd.unique(df["Nama_Saham"]))
+        self.periods = pd.PeriodIndex(sorted(df["Tanggal"].dt.to_period("M").unique()), freq="M")
+        self.dates = pd.DatetimeIndex(sorted(df["Tanggal"].unique()))
+        self.max_date = df["Tanggal"].max()
+
+        # harga entry = baris pertama (urutan asli) per ticker per bulan, sama dengan entry_df.iloc[0]
+        entry = (
+            df.assign(Month=df["Tanggal"].dt.to_period("M"))
+            .drop_duplicates(["Nama_Saham", "Month"], keep="first")
+            .pivot(index="Nama_Saham", columns="Month", values="Terakhir")
+        )
+        self.entry_prices = entry.reindex(index=self.tickers, columns=self.periods).to_numpy(dtype="float64")
+
+        # harga exit di tiap tanggal (kalau dobel, yang terakhir menang seperti set_index lookup)
+        exit_ = (
+            df.drop_duplicates(["Nama_Saham", "Tanggal"], keep="last")
+            .pivot(index="Nama_Saham", columns="Tanggal", values="Terakhir")
+        )
+        self.exit_prices = exit_.reindex(index=self.tickers, columns=self.dates).to_numpy(dtype="float64")
+
+        self._period_pos = {p: i for i, p in enumerate(self.periods)}
+        self._date_pos = {d: j for j, d in enumerate(self.dates)}
+
+    # --- posisi di matriks ---
+    def _entry_index(self, month, year):
+        return self._period_pos.get(pd.Period(year=year, month=month, freq="M"))
+
+    def _exit_index(self, target_date=None):
+        target_date = self.max_date if target_date is None else pd.to_datetime(target_date)
+        return self._date_pos.get(target_date), target_date
+
+    def harga_entry_exit(self, stock, month, year, target_date=None):
+        """(entry_price, target_price) satu saham, None kalau datanya tidak lengkap"""
+        i = self._entry_index(month, year)
+        j, _ = self._exit_index(target_date)
+        pos = self.tickers.get_indexer([stock])[0]
+        if i is None or j is None or pos < 0:
+            return None
+        entry_price, target_price = self.entry_prices[pos, i], self.exit_prices[pos, j]
+        if np.isnan(entry_price) or np.isnan(target_price):
+            return None
+        return entry_price, target_price
+
+    # --- broadcast ---
+    def price_relative(self, entry_periods=None, exit_dates=None):
+        """
+        Matriks harga exit / harga entry, bentuk ticker x entry x exit.
+
+        entry_periods / exit_dates: subset (slice) supaya cube tidak terlalu
+        besar untuk data harian; default semua.
+        """
+        entry = self.entry_prices
+        exit_ = self.exit_prices
+        if entry_periods is not None:
+            entry = entry[:, [self._period_pos[pd.Period(p, freq="M")] for p in entry_periods]]
+        if exit_dates is not None:
+            exit_ = exit_[:, [self._date_pos[pd.to_datetime(d)] for d in exit_dates]]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return exit_[:, None, :] / entry[:, :, None]
+
+    def return_cube(self, entry_periods=None, exit_dates=None):
+        """Return (%) untuk setiap ticker x entry x exit"""
+        return (self.price_relative(entry_periods, exit_dates) - 1) * 100
+
+    def final_value_cube(self, initial_money, entry_periods=None, exit_dates=None):
+        """Nilai akhir (Rp) untuk setiap ticker x entry x exit"""
+        return initial_money * self.price_relative(entry_periods, exit_dates)
+
+    # --- lookup satu pertanyaan ---
+    def simulate(self, month, year, initial_money, target_date=None):
+        """
+        Hasil sama dengan tabel simulate_investment untuk satu (month, year, target_date),
+        tapi diambil langsung dari kolom matriks tanpa scan histori_df.
+        """
+        i = self._entry_index(month, year)
+        j, target_date = self._exit_index(target_date)
+        if i is None or j is None:
+            return pd.DataFrame(), target_date
+
+        entry_price = self.entry_prices[:, i]
+        target_price = self.exit_prices[:, j]
+        valid = ~np.isnan(entry_price) & ~np.isnan(target_price)
+
+        shares = initial_money / entry_price[valid]
+        final_value = shares * target_price[valid]
+        profit_pct = (final_value - initial_money) / initial_money * 100
+
+        df = pd.DataFrame({
+            "Nama_Saham": self.tickers[valid],
+            "Entry_Price": entry_price[valid],
+            "Target_Price": target_price[valid],
+            "Final_Value": np.round(final_value, 2),
+            "Return (%)": np.round(profit_pct, 2),
+        })
+        return df, target_date
+
+
+# ===============================
+# MONTE CARLO PORTOFOLIO
+# ===============================
+
+N_BINS = 200
+
+
+def _bobot_random(rng, size, k):
+    """Vektor bobot acak yang jumlahnya 1 (Dirichlet seragam)"""
+    return rng.dirichlet(np.ones(k), size=size)
+
+
+def _bobot_grid(k, step):
+    """Generator semua kombinasi bobot kelipatan `step` yang jumlahnya 1 (stars & bars)"""
+    units = int(round(1 / step))
+
+    def _rekursif(sisa, depth):
+        if depth == k - 1:
+            yield (sisa,)
+            return
+        for u in range(sisa, -1, -1):
+            for rest in _rekursif(sisa - u, depth + 1):
+                yield (u,) + rest
+
+    for combo in _rekursif(units, 0):
+        yield np.array(combo, dtype="float64") / units
+
+
+def _evaluasi_batch(args):
+    """
+    Worker: evaluasi satu batch bobot, kembalikan ringkasan kecil saja
+    (histogram, momen, top-k) supaya memori tetap datar.
+    """
+    weights, seed, size, relatives, initial_money, bins, top_k = args
+    if weights is None:
+        weights = _bobot_random(np.random.default_rng(seed), size, len(relatives))
+
+    # weight matrix x price-relative vector
+    final_values = initial_money * (weights @ relatives)
+    returns = (final_values - initial_money) / initial_money * 100
+
+    # return bisa meleset 1 ulp di luar [lo, hi] (pembulatan float), jangan sampai dibuang histogram
+    counts, _ = np.histogram(np.clip(returns, bins[0], bins[-1]), bins=bins)
+    top = np.argsort(returns)[::-1][:top_k]
+    return {
+        "count": len(returns),
+        "sum": returns.sum(),
+        "sumsq": np.square(returns).sum(),
+        "min": returns.min(),
+        "max": returns.max(),
+        "hist": counts,
+        "top_weights": weights[top],
+        "top_values": final_values[top],
+    }
+
+
+def _batch_grid(k, step, batch_size):
+    batch = []
+    for w in _bobot_grid(k, step):
+        batch.append(w)
+        if len(batch) == batch_size:
+            yield np.vstack(batch)
+            batch = []
+    if batch:
+        yield np.vstack(batch)
+
+
+def monte_carlo_portfolio(histori_df, tickers, month, year, initial_money, target_date=None,
+                          n_samples=100_000, method="random", grid_step=0.1, batch_size=20_000,
+                          n_workers=None, top_k=10, seed=None, cube=None):
+    """
+    Cari ruang alokasi: evaluasi ribuan vektor bobot sekaligus untuk satu set
+    ticker dan satu window entry/exit.
+
+    method : "random" (n_samples vektor Dirichlet) atau "grid" (semua kombinasi kelipatan grid_step)
+    n_workers : jumlah proses; 1 = jalan di proses ini saja
+
+    Saham yang datanya tidak lengkap dilewati seperti di simulate_portfolio.
+    Mengembalikan dict berisi "best" (DataFrame top_k alokasi), "distribusi"
+    (histogram Return (%)) dan "statistik".
+    """
+    if method != "grid" and n_samples < 1:
+        raise ValueError(f"n_samples harus minimal 1 untuk method random (diberikan {n_samples})")
+    if batch_size < 1:
+        raise ValueError(f"batch_size harus minimal 1 (diberikan {batch_size})")
+
+    cube = cube if cube is not None else SimulasiCube(histori_df)
+    i = cube._entry_index(month, year)
+    j, target_date = cube._exit_index(target_date)
+
+    valid_tickers, relatives = [], []
+    for stock in tickers:
+        pos = cube.tickers.get_indexer([stock])[0]
+        rel = np.nan if i is None or j is None or pos < 0 else cube.exit_prices[pos, j] / cube.entry_prices[pos, i]
+        if np.isnan(rel):
+            print(f"⚠️ Data {stock} tidak lengkap, dilewati.")
+            continue
+        valid_tickers.append(stock)
+        relatives.append(rel)
+
+    if not valid_tickers:
+        print("❌ Tidak ada saham valid untuk simulasi portofolio.")
+        return None
+
+    relatives = np.array(relatives)
+    k = len(relatives)
+
+    # batas return portofolio = batas return saham (kombinasi konveks), jadi bin bisa ditentukan di awal
+    lo, hi = (relatives.min() - 1) * 100, (relatives.max() - 1) * 100
+    bins = np.linspace(lo, hi if hi > lo else lo + 1e-9, N_BINS + 1)
+
+    if method == "grid":
+        tasks = ((w, None, None, relatives, initial_money, bins, top_k)
+                 for w in _batch_grid(k, grid_step, batch_size))
+    else:
+        seeds = np.random.SeedSequence(seed).spawn((n_samples + batch_size - 1) // batch_size)
+        sizes = [min(batch_size, n_samples - b * batch_size) for b in range(len(seeds))]
+        tasks = ((None, s, size, relatives, initial_money, bins, top_k) for s, size in zip(seeds, sizes))
+
+    if n_workers == 1:
+        results = map(_evaluasi_batch, tasks)
+        summaries = _gabung_ringkasan(results, k, top_k)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        n_workers = n_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = map_bertahap(pool, _evaluasi_batch, tasks, max_pending=2 * n_workers)
+            summaries = _gabung_ringkasan(results, k, top_k)
+
+    count, total, totalsq, hist, best_w, best_v, lo_r, hi_r = summaries
+    mean = total / count
+    centers = (bins[:-1] + bins[1:]) / 2
+    cdf = np.cumsum(hist) / count
+
+    best = pd.DataFrame(best_w, columns=valid_tickers)
+    best["Final_Value"] = np.round(best_v, 2)
+    best["Return (%)"] = np.round((best_v - initial_money) / initial_money * 100, 2)
+
+    return {
+        "best": best,
+        "distribusi": pd.DataFrame({"Return (%)": centers, "Jumlah": hist}),
+        "statistik": {
+            "n": count,
+            "entry": f"{month}/{year}",
+            "target_date": target_date,
+            "mean_return": mean,
+            "std_return": np.sqrt(max(totalsq / count - mean ** 2, 0)),
+            "min_return": lo_r,
+            "max_return": hi_r,
+            **{f"p{q}": centers[min(np.searchsorted(cdf, q / 100), N_BINS - 1)] for q in (5, 25, 50, 75, 95)},
+        },
+    }
+
+
+def _gabung_ringkasan(results, k, top_k):
+    """Menggabungkan ringkasan per batch secara streaming"""
+    count, total, totalsq = 0, 0.0, 0.0
+    lo_r, hi_r = np.inf, -np.inf
+    hist = np.zeros(N_BINS, dtype="int64")
+    best_w, best_v = np.empty((0, k)), np.empty(0)
+
+    for r in results:
+        count += r["count"]
+        total += r["sum"]
+        totalsq += r["sumsq"]
+        lo_r, hi_r = min(lo_r, r["min"]), max(hi_r, r["max"])
+        hist += r["hist"]
+
+        best_w = np.vstack([best_w, r["top_weights"]])
+        best_v = np.concatenate([best_v, r["top_values"]])
+        order = np.argsort(best_v)[::-1][:top_k]
+        best_w, best_v = best_w[order], best_v[order]
+
+    return count, total, totalsq, hist, best_w, best_v, lo_r, hi_r
@@ -0,0 +1,136 @@
+"""
+Snapshot lokal (Arrow IPC / Parquet) untuk kumpulan_saham dan histori_saham.
+
+Saat startup, tanda tabel di database (jumlah baris, MAX(Tanggal), MAX(id))
+dibandingkan dengan manifest snapshot. Kalau sama, data dibaca dari file lokal
+lewat memory-map, bukan ditarik ulang dari MySQL. Kalau database tidak bisa
+dihubungi, snapshot terakhir tetap dipakai supaya analisa bisa jalan offline.
+"""
+import json
+import os
+
+import pandas as pd
+
+from data_loader import SKEMA_TABEL, muat_tabel
+
+CACHE_DIR = os.getenv("SAHAM_CACHE_DIR", ".cache_saham")
+
+
+def _path(nama_tabel, ext):
+    return os.path.join(CACHE_DIR, f"{nama_tabel}.{ext}")
+
+
+def _pyarrow():
+    """(pyarrow, pyarrow.feather) di-import saat dipakai, bukan saat start; None tanpa pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError:  # cache otomatis nonaktif tanpa pyarrow
+        return None
+    return pa, feather
+
+
+def baca_manifest(nama_tabel):
+    try:
+        with open(_path(nama_tabel, "json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def tanda_tabel(engine, nama_tabel):
+    """Tanda murah untuk mendeteksi perubahan tabel tanpa membaca isinya"""
+    from sqlalchemy import text
+
+    extra = ", MAX(id)" if "id" in SKEMA_TABEL[nama_tabel] else ""
+    with engine.connect() as conn:
+        row = conn.execute(text(f"SELECT COUNT(*), MAX(Tanggal){extra} FROM {nama_tabel}")).one()
+
+    return {
+        "rows": int(row[0]),
+        "max_tanggal": str(row[1])[:10] if row[1] is not None else None,
+        "max_id": int(row[2]) if extra and row[2] is not None else None,
+    }
+
+
+def simpan_snapshot(df, nama_tabel, tanda, format="arrow"):
+    """Menulis DataFrame ke file lokal + manifest berisi tanda tabel dan versi"""
+    arrow = _pyarrow()
+    if arrow is None:
+        return None
+    _, feather = arrow
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    lama = baca_manifest(nama_tabel) or {}
+
+    if format == "parquet":
+        df.to_parquet(_path(nama_tabel, "parquet"), index=False)
+    else:
+        # Arrow IPC tanpa kompresi supaya bisa dibaca via memory-map
+        feather.write_feather(df, _path(nama_tabel, "arrow"), compression="uncompressed")
+
+    manifest = {"tanda": tanda, "format": format, "versi": lama.get("versi", 0) + 1}
+    with open(_path(nama_tabel, "json"), "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def muat_snapshot(nama_tabel):
+    """Membaca snapshot lokal (memory-mapped untuk format arrow); None kalau file hilang/rusak"""
+    manifest = baca_manifest(nama_tabel)
+    arrow = _pyarrow() if manifest is not None else None
+    if arrow is None:
+        return None
+    pa, feather = arrow
+
+    try:
+        if manifest["format"] == "parquet":
+            return pd.read_parquet(_path(nama_tabel, "parquet"), memory_map=True)
+        return feather.read_feather(_path(nama_tabel, "arrow"), memory_map=True)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        print(f"⚠️ Snapshot {nama_tabel} tidak bisa dibaca ({e}).")
+        return None
+
+
+def invalidasi_snapshot(nama_tabel):
+    """
+    Dipanggil setiap ada penulisan ke tabel supaya snapshot dibangun ulang.
+
+    File datanya tetap disimpan sebagai cadangan mode offline, hanya tandanya
+    yang dihapus sehingga startup berikutnya pasti membaca ulang dari database.
+    """
+    manifest = baca_manifest(nama_tabel)
+    if manifest is None:
+        return
+    manifest["tanda"] = None
+    with open(_path(nama_tabel, "json"), "w") as f:
+        json.dump(manifest, f)
+
+
+def muat_dengan_cache(engine, nama_tabel):
+    """
+    Memuat tabel dari snapshot kalau masih segar, kalau tidak dari database.
+
+    Snapshot dianggap segar bila tanda tabel (rows / max Tanggal / max id)
+    sama dengan yang tersimpan di manifest. Snapshot segar yang ternyata rusak
+    dibaca ulang dari database lalu ditulis ulang.
+    """
+    try:
+        tanda = tanda_tabel(engine, nama_tabel)
+    except Exception as e:
+        df = muat_snapshot(nama_tabel)
+        if df is not None:
+            print(f"⚠️ Database tidak bisa diakses ({e}), memakai snapshot {nama_tabel}.")
+        return df
+
+    manifest = baca_manifest(nama_tabel)
+    if manifest is not None and manifest["tanda"] == tanda:
+        df = muat_snapshot(nama_tabel)
+        if df is not None:
+            print(f"\n=== DATA: {nama_tabel.upper()} ({len(df)} baris, snapshot v{manifest['versi']}) ===")
+            return df
+
+    df = muat_tabel(engine, nama_tabel)
+    if df is not None:
+        simpan_snapshot(df, nama_tabel, tanda)
+    return df
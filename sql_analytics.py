@@ -0,0 +1,73 @@
+"""
+Analisa yang dihitung langsung di database (SQL pushdown).
+
+Harga awal & akhir per saham diambil dengan ROW_NUMBER() di atas primary key
+(Nama_Saham, Tanggal), jadi yang lewat jaringan hanya N baris (satu per saham),
+bukan seluruh histori N x T.
+"""
+import pandas as pd
+from sqlalchemy import text
+
+QUERY_HARGA_AWAL_AKHIR = """
+SELECT Nama_Saham,
+       MAX(CASE WHEN rn_awal = 1 THEN Terakhir END) AS Harga_Awal,
+       MAX(CASE WHEN rn_akhir = 1 THEN Terakhir END) AS Harga_Akhir
+FROM (
+    SELECT TRIM(Nama_Saham) AS Nama_Saham, Terakhir,
+           ROW_NUMBER() OVER (PARTITION BY TRIM(Nama_Saham) ORDER BY Tanggal ASC)  AS rn_awal,
+           ROW_NUMBER() OVER (PARTITION BY TRIM(Nama_Saham) ORDER BY Tanggal DESC) AS rn_akhir
+    FROM histori_saham
+    WHERE Terakhir IS NOT NULL {filter_tanggal}
+) ranked
+WHERE rn_awal = 1 OR rn_akhir = 1
+GROUP BY Nama_Saham
+"""
+
+
+def harga_awal_akhir_sql(engine, start=None, end=None):
+    """
+    Harga Terakhir pertama & terakhir per saham dalam window [start, end].
+
+    Sama dengan groupby().agg(first/last) setelah sort Tanggal di pandas
+    (baris dengan Terakhir NULL dilewati seperti "first"/"last"). Nama_Saham
+    dengan spasi di ujung digabung dengan versi tanpa spasinya, seperti
+    muat_data() yang men-strip nama sebelum analisa.
+    """
+    filters, params = [], {}
+    if start is not None:
+        filters.append("AND Tanggal >= :start")
+        params["start"] = pd.to_datetime(start).date()
+    if end is not None:
+        filters.append("AND Tanggal <= :end")
+        params["end"] = pd.to_datetime(end).date()
+
+    query = text(QUERY_HARGA_AWAL_AKHIR.format(filter_tanggal=" ".join(filters)))
+    with engine.connect() as conn:
+        df = pd.DataFrame(conn.execute(query, params).all(), columns=["Nama_Saham", "Harga_Awal", "Harga_Akhir"])
+
+    df[["Harga_Awal", "Harga_Akhir"]] = df[["Harga_Awal", "Harga_Akhir"]].astype("float64")
+    return df.sort_values("Nama_Saham").reset_index(drop=True)
+
+
+QUERY_HARGA_PADA_TANGGAL = """
+SELECT TRIM(Nama_Saham) AS Nama_Saham, Tanggal, Terakhir
+FROM histori_saham
+WHERE Tanggal = (SELECT MAX(Tanggal) FROM histori_saham WHERE Tanggal <= :tanggal)
+"""
+
+
+def harga_pada_tanggal_sql(engine, tanggal):
+    """
+    Harga semua saham di tanggal bursa terakhir <= tanggal (penampang satu tanggal).
+
+    Dengan index idx_histori_tanggal (migrasi.py) query ini hanya membaca
+    baris tanggal tersebut, bukan seluruh histori.
+    """
+    with engine.connect() as conn:
+        df = pd.DataFrame(conn.execute(text(QUERY_HARGA_PADA_TANGGAL),
+                                       {"tanggal": pd.to_datetime(tanggal).date()}).all(),
+                          columns=["Nama_Saham", "Tanggal", "Terakhir"])
+
+    df["Tanggal"] = pd.to_datetime(df["Tanggal"])
+    df["Terakhir"] = df["Terakhir"].astype("float64")
+    return df.sort_values("Nama_Saham").reset_index(drop=True)
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+# modul aplikasi ada di root repo (tanpa packaging)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snapshot_cache  # noqa: E402
+from data_sintetis import buat_histori  # noqa: E402
+
+
+def pytest_addoption(parser):
+    parser.addoption("--slow", action="store_true", help="jalankan juga test berskala besar (@pytest.mark.slow)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: test berskala besar (jutaan baris), hanya jalan dengan --slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--slow"):
+        return
+    lewati = pytest.mark.skip(reason="test berskala besar, jalankan dengan --slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(lewati)
+
+
+# ===============================
+# FIXTURE BERSAMA
+# ===============================
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Snapshot & checkpoint import ditulis ke direktori sementara, bukan .cache_saham"""
+    path = tmp_path / "cache"
+    monkeypatch.setattr(snapshot_cache, "CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def histori_dengan_spasi():
+    """Histori bulanan 8 saham; sebagian baris dua saham memakai nama dengan spasi di ujung"""
+    histori = buat_histori(8, 30, freq="M", start="2021-01-01")
+    nama = histori["Nama_Saham"].to_numpy(dtype=object).copy()
+    tickers = sorted(set(nama))
+    awal = (nama == tickers[0]) & (histori["Tanggal"] < "2022-01-01").to_numpy()
+    akhir = (nama == tickers[1]) & (histori["Tanggal"] >= "2022-06-01").to_numpy()
+    nama[awal] = tickers[0] + " "
+    nama[akhir] = tickers[1] + "  "
+    return histori.assign(Nama_Saham=nama)
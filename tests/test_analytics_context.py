@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+import main
+from analytics_context import AnalyticsContext
+from data_sintetis import buat_histori
+
+
+@pytest.fixture(scope="module")
+def harian():
+    return buat_histori(5, 300, freq="D", start="2023-01-02")
+
+
+def urut(df):
+    return df.sort_values("Nama_Saham").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("target_date", [None, "2023-06-15"])
+def test_simulate_investment_harian_ctx_sama_tanpa_ctx(harian, target_date):
+    ctx = AnalyticsContext(harian)
+    expected = main.simulate_investment(harian, 1, 2023, 1e7, target_date, show_plot=False)
+    actual = main.simulate_investment(harian, 1, 2023, 1e7, target_date, show_plot=False, ctx=ctx)
+    assert len(expected) == 5
+    pd.testing.assert_frame_equal(urut(expected), urut(actual), check_dtype=False)
+
+
+@pytest.mark.parametrize("target_date", [None, "2023-06-15"])
+def test_simulate_portfolio_harian_ctx_sama_tanpa_ctx(harian, target_date):
+    ctx = AnalyticsContext(harian)
+    tickers = ctx.tickers[:3]
+    allocations = {t: 1 / 3 for t in tickers}
+    expected = main.simulate_portfolio(harian, allocations, 1, 2023, 1e7, target_date, show_plot=False)
+    actual = main.simulate_portfolio(harian, allocations, 1, 2023, 1e7, target_date, show_plot=False, ctx=ctx)
+    assert set(tickers) <= set(expected["Nama_Saham"])
+    pd.testing.assert_frame_equal(urut(expected), urut(actual), check_dtype=False)
+
+
+def test_cube_harian_entry_di_bar_pertama_bulan(harian):
+    cube = AnalyticsContext(harian).simulasi_cube()
+    stock = cube.tickers[0]
+    pertama = harian[harian["Nama_Saham"] == stock].iloc[0]
+    entry, _ = cube.harga_entry_exit(stock, 1, 2023)
+    assert entry == pertama["Terakhir"]
+
+
+def test_heatmap_harian_tanpa_ctx_memakai_bar_bulanan(harian):
+    from data_sintetis import buat_kumpulan
+    from resample_ohlcv import resample_ohlcv
+
+    ctx = AnalyticsContext(harian)
+    kumpulan = buat_kumpulan(n_saham=5).assign(Nama_Saham=list(ctx.tickers))
+    bulanan = resample_ohlcv(harian, "M")
+
+    tanpa_ctx = main._pivot_return_saham(harian)
+    pd.testing.assert_frame_equal(tanpa_ctx, main._pivot_return_saham(harian, ctx))
+    # return bulanan dari close ke close, bukan rata-rata return harian
+    pd.testing.assert_frame_equal(tanpa_ctx, main._pivot_return_saham_baris(bulanan), check_names=False)
+
+    sektor = main._pivot_return_sektor(harian, kumpulan)
+    assert sektor.notna().any().any()
+    pd.testing.assert_frame_equal(sektor, main._pivot_return_sektor(harian, kumpulan, ctx))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import backtest
+from data_sintetis import buat_histori
+
+STRATEGI = {
+    "Campuran": {"AAAA": 0.5, "BBBB": 0.3, "CCCC": 0.2},
+    "Tunggal": {"BBBB": 1.0},
+}
+
+
+@pytest.fixture(scope="module")
+def histori():
+    df = buat_histori(["AAAA", "BBBB", "CCCC"], 300, freq="D", start="2022-01-03")
+    # CCCC baru listing di bulan ke-4: porsinya jadi kas sampai bisa dibeli
+    return df[(df["Nama_Saham"] != "CCCC") | (pd.to_datetime(df["Tanggal"]) >= "2022-04-15")]
+
+
+def backtest_manual(histori, strategi, month, year, modal_awal, setoran, rebalance_setiap):
+    """Simulasi bulan per bulan dengan dict lembar + kas, satu strategi per loop"""
+    df = histori.assign(Tanggal=pd.to_datetime(histori["Tanggal"])).sort_values(["Nama_Saham", "Tanggal"])
+    df["Month"] = df["Tanggal"].dt.to_period("M")
+    entry = df.groupby(["Month", "Nama_Saham"])["Terakhir"].first().unstack().astype(float)
+    target_date = df["Tanggal"].max()
+    target = df[df["Tanggal"] == target_date].set_index("Nama_Saham")["Terakhir"].astype(float)
+    bulan = entry.loc[pd.Period(year=year, month=month, freq="M"):target_date.to_period("M")]
+    # harga penilaian: harga awal bulan terakhir yang diketahui
+    nilai_harga = entry.ffill().loc[bulan.index]
+
+    hasil = {}
+    for nama, bobot in strategi.items():
+        lembar = dict.fromkeys(bobot, 0.0)
+        kas = 0.0
+        kurva = []
+
+        def nilai(harga):
+            return sum(lembar[s] * (0.0 if np.isnan(harga[s]) else harga[s]) for s in lembar) + kas
+
+        for t, periode in enumerate(bulan.index):
+            harga = bulan.loc[periode]
+            if rebalance_setiap and t > 0 and t % rebalance_setiap == 0:
+                total = nilai(nilai_harga.loc[periode])
+                kas = 0.0
+                for s, w in bobot.items():
+                    if np.isnan(harga[s]):
+                        lembar[s] = 0.0
+                        kas += w * total
+                    else:
+                        lembar[s] = w * total / harga[s]
+            uang = setoran + (modal_awal if t == 0 else 0.0)
+            for s, w in bobot.items():
+                if np.isnan(harga[s]):
+                    kas += w * uang
+                else:
+                    lembar[s] += w * uang / harga[s]
+            kurva.append(nilai(nilai_harga.loc[periode]))
+        kurva.append(nilai(target))
+        hasil[nama] = kurva
+    return pd.DataFrame(hasil, index=list(bulan.index.to_timestamp()) + [target_date])
+
+
+@pytest.mark.parametrize("rebalance_setiap", [0, 1, 3])
+def test_backtest_sama_dengan_simulasi_manual(histori, rebalance_setiap):
+    kwargs = dict(month=2, year=2022, modal_awal=10_000_000, setoran=1_000_000, rebalance_setiap=rebalance_setiap)
+    hasil = backtest(histori, STRATEGI, **kwargs)
+    expected = backtest_manual(histori, STRATEGI, **kwargs)
+
+    np.testing.assert_allclose(hasil.equity.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert list(hasil.equity.index) == list(expected.index)
+    n_bulan = len(expected) - 1
+    assert hasil.modal.iloc[-1] == 10_000_000 + n_bulan * 1_000_000
+
+    # holdings & ledger konsisten dengan equity
+    df = histori.assign(Tanggal=pd.to_datetime(histori["Tanggal"]))
+    target = df[df["Tanggal"] == df["Tanggal"].max()].set_index("Nama_Saham")["Terakhir"].astype(float)
+    holdings = hasil.holdings("Campuran")
+    assert (holdings["CCCC"].iloc[:2] == 0).all() and holdings["Kas"].iloc[0] > 0
+    akhir = holdings.iloc[-1]
+    assert (akhir[["AAAA", "BBBB", "CCCC"]] * target[["AAAA", "BBBB", "CCCC"]]).sum() + akhir["Kas"] == \
+        pytest.approx(hasil.equity["Campuran"].iloc[-1])
+
+    ledger = hasil.ledger("Tunggal")
+    assert set(ledger["Nama_Saham"]) == {"BBBB"}
+    arah = np.where(ledger["Aksi"] == "BELI", 1.0, -1.0)
+    assert (arah * ledger["Lembar"]).sum() == pytest.approx(hasil.holdings("Tunggal")["BBBB"].iloc[-1])
@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import batch_import
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan, tulis_csv_investing
+
+
+# checkpoint import ditulis ke direktori cache sementara
+pytestmark = pytest.mark.usefixtures("cache_dir")
+
+
+@pytest.fixture
+def csv_saham(tmp_path):
+    histori = buat_histori(["BBCA"], 250, freq="D", start="2023-01-02")
+    return tulis_csv_investing(histori, tmp_path)[0], histori
+
+
+def baca_db(engine, stock="BBCA"):
+    with engine.connect() as conn:
+        return pd.read_sql(text("SELECT Tanggal, Terakhir FROM histori_saham WHERE Nama_Saham = :s ORDER BY Tanggal"),
+                           conn, params={"s": stock})
+
+
+def test_import_streaming_lanjut_setelah_gagal(csv_saham, monkeypatch):
+    path, histori = csv_saham
+    engine = buat_engine(buat_kumpulan(n_saham=5), histori.iloc[:0])
+    asli = batch_import.upsert_histori
+    panggilan = []
+
+    def gagal_di_chunk_ketiga(*args, **kwargs):
+        panggilan.append(1)
+        if len(panggilan) == 3:
+            raise RuntimeError("koneksi putus")
+        return asli(*args, **kwargs)
+
+    monkeypatch.setattr(batch_import, "upsert_histori", gagal_di_chunk_ketiga)
+    with pytest.raises(RuntimeError):
+        batch_import.import_csv_streaming(engine, path, chunk_rows=60)
+    assert len(baca_db(engine)) == 120
+    # checkpoint di direktori cache, folder CSV tidak disentuh
+    assert os.path.exists(batch_import._path_checkpoint(path))
+    assert not [f for f in os.listdir(os.path.dirname(path)) if f.endswith(".json")]
+
+    monkeypatch.setattr(batch_import, "upsert_histori", asli)
+    hasil = batch_import.import_csv_streaming(engine, path, chunk_rows=60)
+    assert hasil["resumed_from"] == 120
+    assert hasil["rows"] == 250
+
+    db = baca_db(engine)
+    assert len(db) == 250
+    assert db["Terakhir"].astype(float).tolist() == histori["Terakhir"].astype(float).tolist()
+
+
+def test_import_streaming_replace_atomik(csv_saham, monkeypatch):
+    path, histori = csv_saham
+    # histori lama: tanggal lain yang harus hilang setelah replace selesai
+    lama = buat_histori(["BBCA"], 40, freq="D", start="2020-01-01", seed=3)
+    engine = buat_engine(buat_kumpulan(n_saham=5), lama)
+    asli = batch_import.upsert_histori
+    panggilan = []
+
+    def gagal_di_chunk_ketiga(*args, **kwargs):
+        panggilan.append(1)
+        if len(panggilan) == 3:
+            raise RuntimeError("koneksi putus")
+        return asli(*args, **kwargs)
+
+    monkeypatch.setattr(batch_import, "upsert_histori", gagal_di_chunk_ketiga)
+    with pytest.raises(RuntimeError):
+        batch_import.import_csv_streaming(engine, path, replace=True, chunk_rows=60)
+    # gagal di tengah: histori lama utuh
+    assert baca_db(engine)["Terakhir"].astype(float).tolist() == lama["Terakhir"].astype(float).tolist()
+
+    monkeypatch.setattr(batch_import, "upsert_histori", asli)
+    hasil = batch_import.import_csv_streaming(engine, path, replace=True, chunk_rows=60)
+    assert hasil["resumed_from"] == 120
+
+    db = baca_db(engine)
+    assert db["Terakhir"].astype(float).tolist() == histori["Terakhir"].astype(float).tolist()
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM histori_saham_staging")).scalar() == 0
+
+
+def test_import_streaming_csv_tanpa_baris(tmp_path):
+    path = tmp_path / "Data Historis BBCA.csv"
+    path.write_text('"Tanggal","Terakhir","Pembukaan","Tertinggi","Terendah","Vol.","Perubahan%"\n')
+    lama = buat_histori(["BBCA"], 10, freq="D", start="2020-01-01")
+    engine = buat_engine(buat_kumpulan(n_saham=5), lama)
+
+    hasil = batch_import.import_csv_streaming(engine, str(path), replace=True)
+    assert hasil["rows"] == 0
+    # file kosong tidak menghapus histori lama
+    assert len(baca_db(engine)) == 10
+
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+
+import bulk_writer
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan
+
+
+@pytest.fixture
+def histori():
+    return buat_histori(["BBCA", "BBRI"], 20, freq="D", start="2023-01-02")
+
+
+@pytest.fixture
+def engine(histori):
+    return buat_engine(buat_kumpulan(n_saham=5), histori)
+
+
+def baca_db(engine):
+    with engine.connect() as conn:
+        df = pd.read_sql(text("SELECT Nama_Saham, Tanggal, Terakhir, Vol FROM histori_saham "
+                              "ORDER BY Nama_Saham, Tanggal"), conn)
+    return df.assign(Tanggal=pd.to_datetime(df["Tanggal"]), Terakhir=df["Terakhir"].astype(float),
+                     Vol=df["Vol"].astype(float))
+
+
+def data_baru(histori):
+    """10 tanggal terakhir BBCA dengan harga baru + 5 tanggal setelahnya"""
+    bbca = histori[histori["Nama_Saham"] == "BBCA"]
+    lanjut = buat_histori(["BBCA"], 15, freq="D", start=bbca["Tanggal"].iloc[10], seed=9)
+    return lanjut
+
+
+def test_append_update_tanggal_sama_dan_tambah_tanggal_baru(engine, histori):
+    baru = data_baru(histori)
+    stats = bulk_writer.upsert_histori(engine, baru, batch_size=4)
+    assert stats["rows"] == 15
+    assert stats["deleted"] == 0
+
+    db = baca_db(engine)
+    bbca = db[db["Nama_Saham"] == "BBCA"].set_index("Tanggal")
+    # 10 tanggal pertama tetap, 10 sisanya ditimpa, 5 tanggal baru
+    assert len(bbca) == 25
+    lama = histori[histori["Nama_Saham"] == "BBCA"].set_index("Tanggal")
+    pd.testing.assert_series_equal(bbca["Terakhir"].iloc[:10], lama["Terakhir"].iloc[:10].astype(float),
+                                   check_names=False, check_index_type=False)
+    assert bbca["Terakhir"].iloc[10:].tolist() == baru["Terakhir"].astype(float).tolist()
+    # saham lain tidak tersentuh
+    assert (db["Nama_Saham"] == "BBRI").sum() == 20
+
+
+def test_replace_hapus_tanggal_yang_tidak_ada_di_data_baru(engine, histori):
+    baru = data_baru(histori)
+    stats = bulk_writer.upsert_histori(engine, baru, replace=True, batch_size=4)
+    assert stats["deleted"] == 10
+
+    db = baca_db(engine)
+    bbca = db[db["Nama_Saham"] == "BBCA"]
+    assert bbca["Tanggal"].tolist() == pd.to_datetime(baru["Tanggal"]).tolist()
+    assert bbca["Terakhir"].tolist() == baru["Terakhir"].astype(float).tolist()
+    assert (db["Nama_Saham"] == "BBRI").sum() == 20
+
+    # replace kedua dengan data yang sama tidak menulis apa pun
+    ulang = bulk_writer.upsert_histori(engine, baru, replace=True, batch_size=4)
+    assert ulang["deleted"] == 0
+    assert ulang["written"] == 0
+
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_gagal_di_tengah_batch_rollback_semua(engine, histori, replace):
+    sebelum = baca_db(engine)
+    panggilan = []
+
+    def putus_di_batch_ketiga(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO histori_saham"):
+            panggilan.append(1)
+            if len(panggilan) == 3:
+                raise RuntimeError("koneksi putus")
+
+    event.listen(engine, "before_cursor_execute", putus_di_batch_ketiga)
+    try:
+        with pytest.raises(RuntimeError):
+            bulk_writer.upsert_histori(engine, data_baru(histori), replace=replace, batch_size=4)
+    finally:
+        event.remove(engine, "before_cursor_execute", putus_di_batch_ketiga)
+
+    assert len(panggilan) == 3
+    # dua batch pertama (dan penghapusan mode replace) ikut dibatalkan
+    pd.testing.assert_frame_equal(baca_db(engine), sebelum)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from clean_utils import clean_dataframe, parse_angka, parse_persen
+
+
+@pytest.mark.parametrize("teks, angka", [
+    ("1.234,5", 1234.5),
+    ("41,27M", 41_270_000.0),
+    ("7,5k", 7_500.0),
+    ("1,2B", 1_200_000_000.0),
+    ("2.000", 2_000.0),
+    (" 15 ", 15.0),
+    ("12,5M x", 12_500_000.0),
+    ("-5,52", np.nan),   # convert_num tidak menerima tanda minus
+    ("abc", np.nan),
+    (None, np.nan),
+])
+def test_parse_angka_format_indonesia(teks, angka):
+    hasil = parse_angka(pd.Series([teks], dtype=object).str.strip())
+    np.testing.assert_equal(hasil.iloc[0], angka)
+
+
+@pytest.mark.parametrize("teks, persen", [
+    ("-5,52%", -5.52),
+    ("0,00%", 0.0),
+    ("12,3%", 12.3),
+    ("x%", np.nan),
+    (None, np.nan),
+])
+def test_parse_persen(teks, persen):
+    np.testing.assert_equal(parse_persen(pd.Series([teks, "1%"], dtype=object)).iloc[0], persen)
+
+
+def test_clean_dataframe_vectorized_sama_dengan_convert_num():
+    sample = pd.DataFrame({
+        "Tanggal": ["02/01/2024", "03.01.2024", "bukan tanggal", None, "05/01/2024", "08/01/2024", "09/01/2024"],
+        "Terakhir": ["1.234,5", "41,27M", "-5,52", "7,5k", "abc", None, "2.000"],
+        "Vol": ["10,5K", "", "1,2B", "  3,4M ", "12,5M x", "0", None],
+        "PerubahanPercent": ["-5,52%", "0,00%", "12,3%", None, "1%", "x%", "2%"],
+    })
+    expected = clean_dataframe(sample.copy(), vectorized=False)
+    actual = clean_dataframe(sample.copy())
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+    assert actual["Terakhir"].iloc[0] == 1234.5
+    assert actual["PerubahanPercent"].iloc[0] == -5.52
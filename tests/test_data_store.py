@@ -0,0 +1,71 @@
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+import main
+from bulk_writer import upsert_histori
+from data_loader import muat_tabel
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan
+from data_store import DataStore
+
+
+@pytest.fixture
+def engine(cache_dir):
+    kumpulan = buat_kumpulan(n_saham=5)
+    return buat_engine(kumpulan, buat_histori(kumpulan, 40, freq="D", start="2023-01-02"))
+
+
+def muat(engine, nama_tabel):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return muat_tabel(engine, nama_tabel)
+
+
+def sama_dengan_reload(store, engine):
+    """Frame di store (setelah delta) == frame hasil baca ulang seluruh tabel"""
+    for df, nama_tabel, key in ((store.kumpulan, "kumpulan_saham", ["Nama_Saham"]),
+                                (store.histori, "histori_saham", ["Nama_Saham", "Tanggal"])):
+        reload = muat(engine, nama_tabel)
+        urut = lambda d: d[reload.columns].sort_values(key).reset_index(drop=True)
+        pd.testing.assert_frame_equal(urut(df), urut(reload), check_dtype=False)
+
+
+def test_delta_sama_dengan_reload(engine, monkeypatch):
+    store = DataStore(muat(engine, "kumpulan_saham"), muat(engine, "histori_saham"))
+    tickers = sorted(store.histori["Nama_Saham"].unique())
+    keluar = contextlib.redirect_stdout(io.StringIO())
+
+    with keluar:
+        # tambah & hapus saham
+        jawaban = iter(["2024-01-02", "ZZZZ", "Keuangan", "Publik", "1000", "5", "7000"])
+        monkeypatch.setattr("builtins.input", lambda _: next(jawaban))
+        store.tambah_kumpulan(main.tambah_saham(engine))
+        monkeypatch.setattr("builtins.input", lambda _: tickers[0])
+        store.hapus_kumpulan(main.hapus_saham(engine))
+    assert store.versi == 2
+    assert store.delta_terakhir is None
+    sama_dengan_reload(store, engine)
+
+    # append: 20 tanggal lama ditimpa + 10 tanggal baru
+    baru = buat_histori([tickers[1]], 30, freq="D", start="2023-01-23", seed=5)
+    upsert_histori(engine, baru)
+    store.tambah_histori(baru)
+    versi, rows = store.delta_terakhir
+    assert versi == store.versi == 3
+    assert len(rows) == 30
+    sama_dengan_reload(store, engine)
+
+    # replace: histori lama saham itu hilang seluruhnya
+    ganti = buat_histori([tickers[2]], 15, freq="D", start="2024-03-01", seed=6)
+    upsert_histori(engine, ganti, replace=True)
+    store.tambah_histori(ganti, replace=True)
+    assert store.delta_terakhir is None
+    sama_dengan_reload(store, engine)
+
+    # hapus histori
+    with keluar:
+        monkeypatch.setattr("builtins.input", lambda _: tickers[3])
+        store.hapus_histori(main.hapus_histori_saham(engine))
+    assert store.versi == 5
+    sama_dengan_reload(store, engine)
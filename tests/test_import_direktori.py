@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import batch_import
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan, tulis_csv_investing
+from pool_utils import map_bertahap
+
+
+@pytest.fixture
+def folder(tmp_path):
+    histori = buat_histori(["BBCA", "BBRI", "TLKM"], 30, freq="D", start="2023-01-02")
+    paths = tulis_csv_investing(histori, tmp_path)
+    # nama file huruf kecil: kode saham tetap diambil dari kata terakhir, di-upper
+    os.rename(paths[2], tmp_path / "data historis tlkm.csv")
+    (tmp_path / "Data Historis RUSAK.csv").write_text("foo,bar\n1,2\n")
+    (tmp_path / "Data Historis KOSONG.csv").write_text("")
+    return tmp_path, histori
+
+
+def jumlah_per_saham(engine):
+    with engine.connect() as conn:
+        return dict(conn.execute(text("SELECT Nama_Saham, COUNT(*) FROM histori_saham GROUP BY Nama_Saham")).all())
+
+
+def test_import_direktori_laporan_dan_file_rusak(folder):
+    path, histori = folder
+    engine = buat_engine(buat_kumpulan(n_saham=5), histori.iloc[:0])
+
+    report, df_baru = batch_import.import_direktori(engine, str(path), policy="replace", n_workers=2)
+
+    report = report.set_index("File")
+    assert report.loc["data historis tlkm.csv", "Nama_Saham"] == "TLKM"
+    assert report.loc["Data Historis BBCA.csv", "Nama_Saham"] == "BBCA"
+    ok = report[report["Status"] == "OK"]
+    assert sorted(ok["Nama_Saham"]) == ["BBCA", "BBRI", "TLKM"]
+    assert (ok["Baris"] == 30).all()
+    assert (ok["Ditulis"] == 30).all()
+
+    # file rusak dilaporkan per file, tanpa menggagalkan file lain
+    gagal = report[report["Status"] == "ERROR"]
+    assert sorted(gagal["Nama_Saham"]) == ["KOSONG", "RUSAK"]
+    assert (gagal["Pesan"] != "").all()
+
+    assert jumlah_per_saham(engine) == {"BBCA": 30, "BBRI": 30, "TLKM": 30}
+    assert sorted(df_baru["Nama_Saham"].unique()) == ["BBCA", "BBRI", "TLKM"]
+
+
+def test_import_direktori_policy_skip_dan_append(folder):
+    path, histori = folder
+    lama = buat_histori(["BBCA"], 10, freq="D", start="2020-01-01")
+    engine = buat_engine(buat_kumpulan(n_saham=5), lama)
+    pola = str(path / "Data Historis B*.csv")
+
+    report, _ = batch_import.import_direktori(engine, pola, policy="skip", n_workers=2)
+    status = report.set_index("Nama_Saham")["Status"].to_dict()
+    assert status == {"BBCA": "SKIP", "BBRI": "OK"}
+    assert jumlah_per_saham(engine)["BBCA"] == 10
+
+    report, _ = batch_import.import_direktori(engine, pola, policy="append", n_workers=2)
+    assert (report["Status"] == "OK").all()
+    # append: histori lama tetap, tanggal baru ditambahkan
+    assert jumlah_per_saham(engine)["BBCA"] == 40
+
+    report, _ = batch_import.import_direktori(engine, pola, policy="replace", n_workers=2)
+    assert report.set_index("Nama_Saham").loc["BBCA", "Dihapus"] == 10
+    assert jumlah_per_saham(engine)["BBCA"] == 30
+
+
+def test_import_direktori_tanpa_file_dan_policy_salah(tmp_path):
+    engine = buat_engine(buat_kumpulan(n_saham=5), buat_histori(["BBCA"], 5))
+    report, df_baru = batch_import.import_direktori(engine, str(tmp_path))
+    assert report.empty and df_baru.empty
+    with pytest.raises(ValueError):
+        batch_import.import_direktori(engine, str(tmp_path), policy="overwrite")
+
+
+def test_map_bertahap_urutan_lengkap_dan_antrean_terbatas():
+    diambil = []
+
+    def tugas():
+        for i in range(20):
+            diambil.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        hasil = []
+        for y in map_bertahap(pool, lambda x: x * x, tugas(), max_pending=3):
+            hasil.append(y)
+            # task hanya diambil dari generator secukupnya: paling banyak max_pending di depan hasil
+            assert len(diambil) - len(hasil) < 3
+
+    assert sorted(hasil) == [x * x for x in range(20)]
+
+
+def test_map_bertahap_meneruskan_error_worker():
+    def gagal(x):
+        if x == 2:
+            raise ValueError("rusak")
+        return x
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(ValueError, match="rusak"):
+            list(map_bertahap(pool, gagal, range(5), max_pending=2))
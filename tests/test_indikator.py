@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_sintetis import buat_histori
+from indikator import hitung_indikator
+from lookup_index import IndeksSaham
+
+
+def sma_naif(x, n):
+    return [sum(x[i - n + 1:i + 1]) / n if i >= n - 1 else math.nan for i in range(len(x))]
+
+
+def ewm_naif(x, alpha, n, mulai=0):
+    """Rekursi y = (1 - alpha) y + alpha x dari x[mulai]; NaN sebelum n observasi"""
+    hasil, y = [], None
+    for i, v in enumerate(x):
+        if i < mulai:
+            hasil.append(math.nan)
+            continue
+        y = v if y is None else (1 - alpha) * y + alpha * v
+        hasil.append(y if i - mulai + 1 >= n else math.nan)
+    return hasil
+
+
+def ema_naif(x, n):
+    return ewm_naif(x, 2 / (n + 1), n)
+
+
+def rsi_naif(x, n):
+    delta = [math.nan] + [x[i] - x[i - 1] for i in range(1, len(x))]
+    gain = ewm_naif([max(d, 0.0) for d in delta], 1 / n, n, mulai=1)
+    loss = ewm_naif([max(-d, 0.0) for d in delta], 1 / n, n, mulai=1)
+    return [100 - 100 / (1 + g / l) for g, l in zip(gain, loss)]
+
+
+def bollinger_naif(x, n, k):
+    mid = sma_naif(x, n)
+    upper, lower = [], []
+    for i, m in enumerate(mid):
+        if math.isnan(m):
+            upper.append(math.nan)
+            lower.append(math.nan)
+            continue
+        std = math.sqrt(sum((v - m) ** 2 for v in x[i - n + 1:i + 1]) / n)
+        upper.append(m + k * std)
+        lower.append(m - k * std)
+    return mid, upper, lower
+
+
+def atr_naif(high, low, close, n):
+    tr = [high[0] - low[0]] + [
+        max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        for i in range(1, len(close))
+    ]
+    return ewm_naif(tr, 1 / n, n)
+
+
+@pytest.fixture(scope="module")
+def histori():
+    # panjang histori berbeda-beda, termasuk yang lebih pendek dari jendela SMA_50
+    bagian = [buat_histori([t], n, freq="D", start="2023-01-02", seed=i)
+              for i, (t, n) in enumerate([("ASII", 120), ("BBCA", 80), ("BBRI", 30), ("TLKM", 10)])]
+    return pd.concat(bagian, ignore_index=True)
+
+
+def test_indikator_panel_sama_dengan_loop_per_ticker(histori):
+    indeks = IndeksSaham(histori)
+    df = indeks.histori
+    hasil = hitung_indikator(df, indeks.starts, indeks.ends)
+    assert hasil.index.equals(df.index)
+
+    for stock in indeks.tickers:
+        awal, akhir = indeks.rentang(stock)
+        close = df["Terakhir"].iloc[awal:akhir].astype(float).tolist()
+        high = df["Tertinggi"].iloc[awal:akhir].astype(float).tolist()
+        low = df["Terendah"].iloc[awal:akhir].astype(float).tolist()
+        vol = df["Vol"].iloc[awal:akhir].astype(float).tolist()
+
+        macd = [a - b for a, b in zip(ema_naif(close, 12), ema_naif(close, 26))]
+        signal = ewm_naif(macd, 2 / 10, 9, mulai=25)
+        mid, upper, lower = bollinger_naif(close, 20, 2)
+        expected = {
+            "SMA_20": sma_naif(close, 20),
+            "SMA_50": sma_naif(close, 50),
+            "EMA_12": ema_naif(close, 12),
+            "EMA_26": ema_naif(close, 26),
+            "RSI_14": rsi_naif(close, 14),
+            "MACD": macd,
+            "MACD_Signal": signal,
+            "BB_Mid": mid,
+            "BB_Upper": upper,
+            "BB_Lower": lower,
+            "ATR_14": atr_naif(high, low, close, 14),
+            "Vol_MA_20": sma_naif(vol, 20),
+        }
+        for kolom, nilai in expected.items():
+            np.testing.assert_allclose(hasil[kolom].iloc[awal:akhir].to_numpy(), nilai,
+                                       rtol=1e-9, err_msg=f"{stock} {kolom}")
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from data_sintetis import buat_histori
+from lookup_index import IndeksSaham
+
+TICKERS = ["ASII", "BBCA", "BBNI", "BBRI", "BMRI", "TLKM"]
+
+
+@pytest.fixture(scope="module")
+def histori():
+    df = buat_histori(TICKERS, 60, freq="D", start="2023-01-02")
+    # urutan acak: IndeksSaham yang mengurutkan sendiri
+    return df.sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def indeks(histori):
+    return IndeksSaham(histori)
+
+
+def naif(histori, stock):
+    df = histori[histori["Nama_Saham"] == stock]
+    return df.assign(Tanggal=pd.to_datetime(df["Tanggal"])).sort_values("Tanggal")
+
+
+@pytest.mark.parametrize("stock", TICKERS)
+def test_saham_sama_dengan_filter_boolean(indeks, histori, stock):
+    expected = naif(histori, stock)
+    actual = indeks.saham(stock)
+    pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+    pd.testing.assert_series_equal(indeks.terbaru(stock), expected.iloc[-1], check_names=False)
+    assert indeks.terakhir(stock, 5)["Tanggal"].tolist() == expected["Tanggal"].iloc[-5:].tolist()
+    # k lebih besar dari histori: seluruh blok saja, tidak melewati batas ke ticker lain
+    assert len(indeks.terakhir(stock, 1000)) == len(expected)
+
+
+@pytest.mark.parametrize("year,month", [(2023, 1), (2023, 2), (2023, 3), (2022, 12), (2023, 7)])
+def test_harga_bulan_sama_dengan_filter_boolean(indeks, histori, year, month):
+    for stock in TICKERS:
+        df = naif(histori, stock)
+        bulan = df[(df["Tanggal"].dt.year == year) & (df["Tanggal"].dt.month == month)]
+        hasil = indeks.harga_bulan(stock, year, month)
+        if bulan.empty:
+            assert hasil is None
+        else:
+            pd.testing.assert_series_equal(hasil, bulan.iloc[0], check_names=False)
+
+
+def test_ticker_tidak_ada(indeks):
+    # di antara dua ticker, sebelum yang pertama, sesudah yang terakhir
+    for stock in ["BBCB", "AAAA", "ZZZZ", ""]:
+        assert not indeks.ada(stock)
+        assert indeks.rentang(stock) is None
+        assert indeks.saham(stock).empty
+        assert indeks.terbaru(stock) is None
+        assert indeks.terakhir(stock, 3).empty
+        assert indeks.harga_bulan(stock, 2023, 1) is None
+
+
+def test_saran_berawalan_lalu_mirip(indeks):
+    assert indeks.saran("BB") == ["BBCA", "BBNI", "BBRI"]
+    # satu berawalan, sisanya salah ketik yang paling mirip
+    saran = indeks.saran("bbc ")
+    assert saran[0] == "BBCA"
+    assert sorted(saran) == ["BBCA", "BBNI", "BBRI"]
+    assert indeks.saran("TLKN", n=1) == ["TLKM"]
+    assert indeks.saran("") == []
+    assert indeks.saran("XYZQ") == []
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from metrik_risiko import metrik_panel
+
+
+def sortino_naif(harga, per_tahun, risk_free):
+    """Satu kolom tanpa NaN, dihitung langsung dari definisinya"""
+    ret = harga[1:] / harga[:-1] - 1
+    rf = risk_free / per_tahun
+    downside = np.sqrt(np.mean(np.minimum(ret - rf, 0.0) ** 2))
+    return (ret.mean() - rf) / downside * np.sqrt(per_tahun)
+
+
+@pytest.mark.parametrize("risk_free", [0.0, 0.05])
+def test_sortino_histori_tidak_sama_panjang(risk_free):
+    rng = np.random.default_rng(7)
+    panjang = [60, 25, 40]
+    harga = np.full((60, 3), np.nan)
+    for j, n in enumerate(panjang):
+        # kolom 1 baru listing (NaN di awal), kolom 2 berhenti lebih dulu (NaN di akhir)
+        mulai = 60 - n if j == 1 else 0
+        harga[mulai:mulai + n, j] = 1000 * np.cumprod(1 + rng.normal(0.001, 0.02, n))
+
+    hasil = metrik_panel(harga, per_tahun=252, risk_free=risk_free)
+    for j in range(3):
+        kolom = harga[~np.isnan(harga[:, j]), j]
+        assert hasil["sortino"][j] == pytest.approx(sortino_naif(kolom, 252, risk_free))
@@ -0,0 +1,82 @@
+import contextlib
+import io
+
+import pytest
+from sqlalchemy import text
+
+import migrasi
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan
+
+
+@pytest.fixture(scope="module")
+def engine():
+    kumpulan = buat_kumpulan(n_saham=50)
+    engine = buat_engine(kumpulan, buat_histori(kumpulan, 300, freq="D", start="2023-01-02"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrasi.jalankan_migrasi(engine)
+    return engine
+
+
+def test_query_panas_memakai_index(engine):
+    report = migrasi.cek_explain(engine)
+    assert report["OK"].all(), report.to_string(index=False)
+
+
+def test_rencana_mysql_optimized_away_dianggap_ok(engine, monkeypatch):
+    # EXPLAIN MySQL untuk MAX(Tanggal) ... WHERE Tanggal <= ? (index Tanggal): satu baris tanpa tabel
+    rows = [{"table": None, "type": None, "key": None, "Extra": "Select tables optimized away"}]
+    assert migrasi._rencana_mysql(rows) == [(None, migrasi.DIOPTIMASI)]
+
+    monkeypatch.setattr(migrasi, "rencana_query", lambda conn, sql, params: migrasi._rencana_mysql(rows))
+    report = migrasi.cek_explain(engine, {"tanggal bursa terdekat": migrasi.QUERY_PANAS["tanggal bursa terdekat"]})
+    assert report["OK"].all()
+    assert report["Index"].tolist() == [migrasi.DIOPTIMASI]
+
+
+def test_rencana_mysql_full_scan_tidak_ok(engine, monkeypatch):
+    rows = [{"table": "histori_saham", "type": "ALL", "key": None, "Extra": "Using where"}]
+    monkeypatch.setattr(migrasi, "rencana_query", lambda conn, sql, params: migrasi._rencana_mysql(rows))
+    report = migrasi.cek_explain(engine, {"semua ticker di tanggal": migrasi.QUERY_PANAS["semua ticker di tanggal"]})
+    assert not report["OK"].any()
+
+
+class KoneksiMySQLPalsu:
+    class dialect:
+        name = "mysql"
+
+    def __init__(self):
+        self.sql = []
+
+    def execute(self, stmt):
+        self.sql.append(str(stmt))
+
+
+def test_partisi_tahun_berikutnya_memecah_pmax(monkeypatch):
+    monkeypatch.setattr(migrasi, "partisi_terpasang", lambda conn: ["p2023", "p2024", "p2025", "pmax"])
+    conn = KoneksiMySQLPalsu()
+    assert migrasi.tambah_partisi_tahun(conn, tahun_akhir=2027) == [2026, 2027]
+    assert conn.sql == [f"ALTER TABLE histori_saham {migrasi.pecah_pmax([2026, 2027])}"]
+    assert "PARTITION p2027 VALUES LESS THAN (2028)" in conn.sql[0]
+
+    # sudah lengkap / belum dipartisi: tidak ada ALTER
+    conn = KoneksiMySQLPalsu()
+    assert migrasi.tambah_partisi_tahun(conn, tahun_akhir=2025) == []
+    monkeypatch.setattr(migrasi, "partisi_terpasang", lambda conn: [])
+    assert migrasi.tambah_partisi_tahun(conn, tahun_akhir=2027) == []
+    assert conn.sql == []
+
+
+@pytest.mark.slow
+def test_query_panas_memakai_index_di_jutaan_baris():
+    # 800 saham x 2500 hari bursa = 2 juta baris; statistik ANALYZE di skala ini
+    # yang menentukan planner tetap memilih index, bukan scan
+    kumpulan = buat_kumpulan(n_saham=800)
+    engine = buat_engine(kumpulan, buat_histori(kumpulan, 2500, freq="D", start="2015-01-01"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrasi.jalankan_migrasi(engine)
+
+    report = migrasi.cek_explain(engine)
+    assert report["OK"].all(), report.to_string(index=False)
+    sql, params, _ = migrasi.QUERY_PANAS["semua ticker di tanggal"]
+    with engine.connect() as conn:
+        assert len(conn.execute(text(sql), params).all()) == 800
@@ -0,0 +1,22 @@
+import pytest
+
+from analytics_context import AnalyticsContext
+from data_sintetis import buat_histori
+from resample_ohlcv import resample_ohlcv
+
+
+def test_resample_harian_ke_mingguan_dan_bulanan():
+    harian = buat_histori(3, 60, freq="D", start="2024-01-01")
+    mingguan = resample_ohlcv(harian, "W")
+    bulanan = resample_ohlcv(harian, "M")
+    assert len(mingguan) == 3 * 12
+    assert len(bulanan) == 3 * 3
+    assert resample_ohlcv(bulanan, "M")["Terakhir"].tolist() == bulanan["Terakhir"].tolist()
+
+
+def test_resample_ke_frekuensi_lebih_rapat_ditolak():
+    bulanan = buat_histori(3, 24, freq="M")
+    with pytest.raises(ValueError, match="lebih rapat"):
+        resample_ohlcv(bulanan, "W")
+    with pytest.raises(ValueError, match="lebih rapat"):
+        AnalyticsContext(bulanan).ohlcv("W")
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+import main
+from data_sintetis import buat_histori, buat_kumpulan
+from returns_panel import ReturnsPanel
+
+
+@pytest.fixture(scope="module")
+def kumpulan():
+    return buat_kumpulan(n_saham=8)
+
+
+@pytest.fixture(scope="module")
+def histori(kumpulan):
+    return buat_histori(kumpulan, 80, freq="D", start="2023-01-02")
+
+
+def bagi(histori, batas="2023-03-15"):
+    """(lama, baru): baru = bar setelah batas; ticker pertama hanya ada di lama, ticker terakhir hanya di baru"""
+    tickers = sorted(histori["Nama_Saham"].unique())
+    tanggal = pd.to_datetime(histori["Tanggal"])
+    lama = histori[(tanggal <= batas) & (histori["Nama_Saham"] != tickers[-1])]
+    baru = histori[(tanggal > batas) & (histori["Nama_Saham"] != tickers[0])]
+    return lama, baru
+
+
+def test_tambah_sama_dengan_bangun_ulang(histori, kumpulan):
+    lama, baru = bagi(histori)
+    panel = ReturnsPanel(lama).tambah(baru)
+    penuh = ReturnsPanel(pd.concat([lama, baru], ignore_index=True))
+
+    pd.testing.assert_frame_equal(panel.mean(), penuh.mean(), check_like=True, check_freq=False)
+    pd.testing.assert_frame_equal(panel.counts.fillna(0), penuh.counts.fillna(0),
+                                  check_like=True, check_freq=False)
+    pd.testing.assert_series_equal(panel.last_date.sort_index(), penuh.last_date.sort_index(), check_names=False)
+    pd.testing.assert_series_equal(panel.last_price.sort_index(), penuh.last_price.sort_index(),
+                                   check_names=False)
+    pd.testing.assert_frame_equal(panel.sektor(kumpulan), penuh.sektor(kumpulan), check_freq=False)
+
+    # tambah bertahap dua kali tetap sama
+    baru1, baru2 = bagi(baru, batas="2023-04-10")
+    dua_kali = ReturnsPanel(lama).tambah(baru1).tambah(baru2)
+    pd.testing.assert_frame_equal(dua_kali.mean(), ReturnsPanel(pd.concat([lama, baru1, baru2])).mean(),
+                                  check_like=True, check_freq=False)
+
+
+def test_tambah_menolak_data_lama_dan_duplikat(histori):
+    lama, baru = bagi(histori)
+    panel = ReturnsPanel(lama)
+    # tanggal yang sudah ada di panel -> harus bangun ulang
+    assert panel.tambah(lama.tail(3)) is None
+    assert panel.tambah(pd.concat([baru.head(1), baru.head(1)])) is None
+
+
+def test_sektor_sama_dengan_versi_per_baris(histori, kumpulan):
+    expected = main._pivot_return_sektor_baris(histori, kumpulan)
+    actual = ReturnsPanel(histori).sektor(kumpulan).T
+    pd.testing.assert_frame_equal(actual, expected, check_names=False, check_freq=False, check_like=True)
@@ -0,0 +1,62 @@
+import contextlib
+import io
+
+import pandas as pd
+
+import main
+from data_sintetis import buat_engine, buat_kumpulan
+from migrasi import jalankan_migrasi
+from rollup import harga_awal_akhir_rollup
+
+
+def test_harga_awal_akhir_rollup_per_nama_trim(histori_dengan_spasi):
+    histori = histori_dengan_spasi
+    engine = buat_engine(buat_kumpulan(n_saham=8), histori)
+    assert harga_awal_akhir_rollup(engine) is None
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        jalankan_migrasi(engine)
+    expected = main.harga_awal_akhir(histori.assign(Nama_Saham=histori["Nama_Saham"].str.strip()))
+    actual = harga_awal_akhir_rollup(engine)
+    assert actual["Nama_Saham"].is_unique
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+
+def test_returns_panel_rollup_nama_trim_di_bulan_yang_sama():
+    from analytics_context import AnalyticsContext
+    from data_sintetis import buat_histori
+    from rollup import returns_panel_rollup
+
+    # harian; satu saham ganti nama (spasi di ujung) di tengah bulan
+    histori = buat_histori(4, 120, freq="D", start="2022-01-03")
+    nama = histori["Nama_Saham"].to_numpy(dtype=object).copy()
+    ganti = (nama == sorted(set(nama))[0]) & (histori["Tanggal"] < "2022-02-15").to_numpy()
+    nama[ganti] = nama[ganti] + " "
+    histori = histori.assign(Nama_Saham=nama)
+
+    engine = buat_engine(buat_kumpulan(n_saham=4), histori)
+    with contextlib.redirect_stdout(io.StringIO()):
+        jalankan_migrasi(engine)
+
+    expected = AnalyticsContext(histori.assign(Nama_Saham=histori["Nama_Saham"].str.strip())).returns_panel()
+    actual = returns_panel_rollup(engine)
+    pd.testing.assert_frame_equal(expected.mean(), actual.mean(), check_names=False, check_freq=False)
+
+
+def test_tambah_hapus_saham_tetap_mengembalikan_delta_kalau_rollup_gagal(histori_dengan_spasi, cache_dir,
+                                                                         monkeypatch):
+    import rollup
+
+    def gagal(engine):
+        raise RuntimeError("lock wait timeout")
+
+    engine = buat_engine(buat_kumpulan(n_saham=8), histori_dengan_spasi)
+    monkeypatch.setattr(rollup, "perbarui_sektor_engine", gagal)
+    jawaban = iter(["2024-01-02", "ZZZZ", "Keuangan", "Publik", "1000", "5", "7000"])
+    monkeypatch.setattr("builtins.input", lambda _: next(jawaban))
+    with contextlib.redirect_stdout(io.StringIO()):
+        row = main.tambah_saham(engine)
+        monkeypatch.setattr("builtins.input", lambda _: "ZZZZ")
+        nama = main.hapus_saham(engine)
+    assert row["Nama_Saham"] == "ZZZZ"
+    assert nama == "ZZZZ"
@@ -0,0 +1,70 @@
+import pytest
+
+import main
+from data_sintetis import buat_histori
+from metrik_risiko import KOLOM_RISIKO
+
+
+@pytest.fixture(scope="module")
+def bulanan():
+    return buat_histori(10, 36, freq="M", start="2021-01-01")
+
+
+def test_simulate_portfolio_hanya_baris_saham(bulanan):
+    tickers = sorted(bulanan["Nama_Saham"].unique())[:3]
+    df = main.simulate_portfolio(bulanan, {t: 1 / 3 for t in tickers}, 1, 2021, 1e7, show_plot=False)
+
+    assert df["Nama_Saham"].tolist() == tickers
+    total = df.attrs["portofolio"]
+    assert total["Final_Value"] == pytest.approx(df["Final_Value"].sum(), abs=0.05)
+    assert set(KOLOM_RISIKO) <= set(total)
+
+    tabel = main.baris_portofolio(df)
+    assert tabel["Nama_Saham"].tolist() == tickers + ["PORTOFOLIO"]
+    assert tabel["Return (%)"].iloc[-1] == total["Return (%)"]
+
+
+@pytest.mark.parametrize("kwargs", [{"n_samples": 0}, {"n_samples": -5}, {"batch_size": 0}])
+def test_monte_carlo_menolak_ukuran_tidak_valid(bulanan, kwargs):
+    from simulasi_batch import monte_carlo_portfolio
+
+    tickers = sorted(bulanan["Nama_Saham"].unique())[:3]
+    with pytest.raises(ValueError, match="minimal 1"):
+        monte_carlo_portfolio(bulanan, tickers, 1, 2021, 1e7, n_workers=1, **kwargs)
+
+
+def test_monte_carlo_satu_sampel(bulanan):
+    from simulasi_batch import monte_carlo_portfolio
+
+    tickers = sorted(bulanan["Nama_Saham"].unique())[:3]
+    hasil = monte_carlo_portfolio(bulanan, tickers, 1, 2021, 1e7, n_samples=1, n_workers=1, seed=0)
+    assert hasil["statistik"]["n"] == 1
+    assert len(hasil["best"]) == 1
+
+
+def test_monte_carlo_satu_ticker(bulanan):
+    from simulasi_batch import monte_carlo_portfolio
+
+    for ticker in sorted(bulanan["Nama_Saham"].unique()):
+        hasil = monte_carlo_portfolio(bulanan, [ticker], 1, 2021, 1e7, n_samples=50, n_workers=1, seed=0)
+        statistik = hasil["statistik"]
+        assert hasil["distribusi"]["Jumlah"].sum() == 50
+        assert statistik["p5"] == statistik["p95"]
+        assert statistik["min_return"] == pytest.approx(statistik["max_return"])
+
+
+def test_monte_carlo_grid(bulanan):
+    from simulasi_batch import SimulasiCube, monte_carlo_portfolio
+
+    tickers = sorted(bulanan["Nama_Saham"].unique())[:2]
+    hasil = monte_carlo_portfolio(bulanan, tickers, 1, 2021, 1e7, method="grid", grid_step=0.5, n_workers=1)
+    assert hasil["statistik"]["n"] == 3
+    assert hasil["distribusi"]["Jumlah"].sum() == 3
+
+    # return tiap kombinasi grid = rata-rata tertimbang return saham
+    cube = SimulasiCube(bulanan)
+    rel = [cube.harga_entry_exit(t, 1, 2021)[1] / cube.harga_entry_exit(t, 1, 2021)[0] for t in tickers]
+    returns = sorted((w * rel[0] + (1 - w) * rel[1] - 1) * 100 for w in (0, 0.5, 1))
+    assert hasil["statistik"]["max_return"] == pytest.approx(returns[-1])
+    assert hasil["statistik"]["min_return"] == pytest.approx(returns[0])
+    assert hasil["best"]["Return (%)"].iloc[0] == pytest.approx(returns[-1], abs=0.01)
@@ -0,0 +1,42 @@
+import pytest
+
+import snapshot_cache
+from data_sintetis import buat_engine, buat_histori, buat_kumpulan
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def engine(cache_dir):
+    kumpulan = buat_kumpulan(n_saham=5)
+    return buat_engine(kumpulan, buat_histori(kumpulan, 12))
+
+
+def test_snapshot_rusak_dibaca_ulang_dari_database(engine, cache_dir):
+    df = snapshot_cache.muat_dengan_cache(engine, "histori_saham")
+    path = cache_dir / "histori_saham.arrow"
+    assert path.exists()
+
+    path.write_bytes(b"bukan file arrow")
+    assert snapshot_cache.muat_snapshot("histori_saham") is None
+
+    ulang = snapshot_cache.muat_dengan_cache(engine, "histori_saham")
+    assert len(ulang) == len(df)
+    # snapshot ditulis ulang dan bisa dibaca lagi
+    assert len(snapshot_cache.muat_snapshot("histori_saham")) == len(df)
+
+
+def test_tambah_hapus_saham_tetap_mengembalikan_delta_kalau_invalidasi_gagal(engine, monkeypatch):
+    import main
+
+    def gagal(nama_tabel):
+        raise PermissionError("cache read-only")
+
+    monkeypatch.setattr(main, "invalidasi_snapshot", gagal)
+    jawaban = iter(["2024-01-02", "ZZZZ", "Keuangan", "Publik", "1000", "5", "7000"])
+    monkeypatch.setattr("builtins.input", lambda _: next(jawaban))
+    row = main.tambah_saham(engine)
+    assert row["Nama_Saham"] == "ZZZZ"
+
+    monkeypatch.setattr("builtins.input", lambda _: "ZZZZ")
+    assert main.hapus_saham(engine) == "ZZZZ"
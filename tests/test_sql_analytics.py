@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+import main
+from data_loader import muat_tabel
+from data_sintetis import buat_engine, buat_kumpulan
+from sql_analytics import harga_awal_akhir_sql, harga_pada_tanggal_sql
+
+
+@pytest.fixture(scope="module")
+def engine(histori_dengan_spasi):
+    return buat_engine(buat_kumpulan(n_saham=8), histori_dengan_spasi)
+
+
+def histori_strip(engine):
+    histori = muat_tabel(engine, "histori_saham")
+    histori["Nama_Saham"] = histori["Nama_Saham"].str.strip()
+    return histori
+
+
+def test_harga_awal_akhir_sql_sama_dengan_pandas(engine):
+    expected = main.harga_awal_akhir(histori_strip(engine))
+    actual = harga_awal_akhir_sql(engine)
+    assert actual["Nama_Saham"].is_unique
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+
+def test_harga_awal_akhir_sql_dengan_jendela(engine):
+    histori = histori_strip(engine)
+    jendela = histori[(histori["Tanggal"] >= "2021-06-01") & (histori["Tanggal"] <= "2022-09-01")]
+    expected = main.harga_awal_akhir(jendela)
+    actual = harga_awal_akhir_sql(engine, "2021-06-01", "2022-09-01")
+    pd.testing.assert_frame_equal(expected, actual, check_dtype=False)
+
+
+def test_harga_pada_tanggal_sql(engine):
+    histori = histori_strip(engine)
+    expected = (histori[histori["Tanggal"] == "2022-03-01"][["Nama_Saham", "Tanggal", "Terakhir"]]
+                .sort_values("Nama_Saham").reset_index(drop=True))
+    pd.testing.assert_frame_equal(expected, harga_pada_tanggal_sql(engine, "2022-03-15"), check_dtype=False)
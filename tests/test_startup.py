@@ -0,0 +1,7 @@
+from benchmark import STARTUP_BUDGET_MS, ukur_startup
+
+
+def test_import_main_dalam_budget():
+    best, teratas, dilarang = ukur_startup(repeat=5)
+    assert not dilarang, f"modul berat ter-import saat start: {dilarang}"
+    assert best <= STARTUP_BUDGET_MS, f"import main {best:.0f} ms > {STARTUP_BUDGET_MS} ms; terberat: {teratas}"